@@ -1,102 +1,50 @@
 ﻿"""Prediction API endpoints."""
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
-from pydantic import BaseModel
-import json
-import os
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Optional
+from app.services.prediction_store import prediction_store
+from app.utils.http_cache import conditional_body_response
+from app.utils.pagination import predictions_list_response
 
 router = APIRouter(prefix="/api/predictions", tags=["predictions"])
 
-# 預測結果模型
-class PredictionResponse(BaseModel):
-    date: str
-    time: str
-    league: str
-    home_team: str
-    away_team: str
-    prediction: dict
-
-class PredictionListResponse(BaseModel):
-    total: int
-    predictions: List[PredictionResponse]
+def _require_snapshot():
+    """Return the current predictions snapshot or raise 404."""
+    snapshot = prediction_store.get()
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="預測資料未生成")
+    return snapshot
 
-@router.get("/", response_model=PredictionListResponse)
+# The body is encoded by predictions_list_response (snapshot records as
+# exported, or NDJSON), so there is no response_model to validate against
+@router.get("/")
 async def get_predictions(
+    request: Request,
     league: Optional[str] = Query(None, description="聯賽篩選"),
     team: Optional[str] = Query(None, description="球隊篩選"),
     date: Optional[str] = Query(None, description="日期篩選 (YYYY-MM-DD)"),
+    date_from: Optional[str] = Query(None, description="起始日期 (YYYY-MM-DD，含)"),
+    date_to: Optional[str] = Query(None, description="結束日期 (YYYY-MM-DD，含)"),
+    limit: Optional[int] = Query(None, ge=1, le=200, description="每頁筆數（不指定則回傳全部）"),
+    cursor: Optional[str] = Query(None, description="上一頁回傳的 next_cursor"),
 ):
-    """取得所有預測結果."""
-    
-    predictions_file = "data/final_predictions.json"
-    
-    if not os.path.exists(predictions_file):
-        raise HTTPException(status_code=404, detail="預測資料未生成")
-    
-    with open(predictions_file, 'r', encoding='utf-8') as f:
-        all_predictions = json.load(f)
+    """取得所有預測結果（支援 cursor 分頁；Accept: application/x-ndjson 時以串流回傳）."""
     
-    filtered = all_predictions
-    
-    if league:
-        filtered = [p for p in filtered if p['league'].lower() == league.lower()]
-    
-    if team:
-        filtered = [p for p in filtered 
-                   if team.lower() in p['home_team'].lower() 
-                   or team.lower() in p['away_team'].lower()]
-    
-    if date:
-        filtered = [p for p in filtered if p['date'] == date]
-    
-    return {
-        "total": len(filtered),
-        "predictions": filtered
-    }
+    filters = dict(league=league, team=team, date=date, date_from=date_from, date_to=date_to)
+    return predictions_list_response(request, _require_snapshot(), filters, cursor=cursor, limit=limit)
 
 @router.get("/leagues")
-async def get_leagues():
+async def get_leagues(request: Request):
     """取得所有聯賽列表."""
     
-    predictions_file = "data/final_predictions.json"
-    
-    if not os.path.exists(predictions_file):
-        raise HTTPException(status_code=404, detail="預測資料未生成")
-    
-    with open(predictions_file, 'r', encoding='utf-8') as f:
-        predictions = json.load(f)
-    
-    leagues = list(set(p['league'] for p in predictions))
-    
-    return {
-        "leagues": sorted(leagues),
-        "count": len(leagues)
-    }
+    snapshot = _require_snapshot()
+    return conditional_body_response(request, snapshot.version, snapshot.facets.leagues_body)
 
 @router.get("/teams")
-async def get_teams(league: Optional[str] = None):
+async def get_teams(request: Request, league: Optional[str] = None):
     """取得所有球隊列表."""
     
-    predictions_file = "data/final_predictions.json"
-    
-    if not os.path.exists(predictions_file):
-        raise HTTPException(status_code=404, detail="預測資料未生成")
-    
-    with open(predictions_file, 'r', encoding='utf-8') as f:
-        predictions = json.load(f)
-    
-    if league:
-        predictions = [p for p in predictions if p['league'] == league]
-    
-    teams = set()
-    for p in predictions:
-        teams.add(p['home_team'])
-        teams.add(p['away_team'])
-    
-    return {
-        "teams": sorted(list(teams)),
-        "count": len(teams)
-    }
+    snapshot = _require_snapshot()
+    return conditional_body_response(request, snapshot.version, snapshot.facets.teams_body_for(league))
 
 @router.post("/analyze")
 async def analyze_match(home_team: str, away_team: str):
@@ -1,26 +1,43 @@
 ﻿"""FastAPI main application."""
-from fastapi import FastAPI, HTTPException, Query, Depends
+import logging
+from fastapi import FastAPI, HTTPException, Query, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Optional
-import json
-import os
+from sqlalchemy import case, func
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from app.routers import matches, predictions, health
 from app.database import get_db
+from app.models.match import Match
 from app.models.prediction import Prediction
+from app.services.prediction_stats import PredictionStats
+from app.services.model_registry import model_registry
+from app.services.prediction_store import prediction_store
+from app.services.team_profiles import team_profile_store
+from app.utils.http_cache import conditional_body_response
+from app.utils.pagination import predictions_list_response
+from app.utils.route_cache import PREDICTIONS, CachedRoute, cache_route
 
 # Central logging configuration
 from app.services.logging_config import configure_logging
 configure_logging()
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Football Prediction API",
     version="1.0.0"
 )
+# Routes marked with @cache_route are served from Redis when it is available
+app.router.route_class = CachedRoute
+
+
+@app.on_event("startup")
+def warm_model_registry():
+    """Load the prediction model once, before the first request needs it."""
+    model_registry.warm()
 
 
 app.include_router(matches.router, prefix="/api/matches", tags=["Matches"])
-app.include_router(predictions.router, prefix="/api/predictions", tags=["Predictions"])
 app.include_router(health.router, prefix="/api/health", tags=["Health"])
 
 app.add_middleware(
@@ -43,121 +60,72 @@ async def root():
 async def health():
     return {"status": "healthy"}
 
+def _snapshot_version():
+    snapshot = prediction_store.get()
+    return snapshot.version if snapshot is not None else None
+
+
+def _require_snapshot(detail: str = "預測資料未生成"):
+    """Return the current predictions snapshot or raise 404."""
+    snapshot = prediction_store.get()
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=detail)
+    return snapshot
+
 @app.get("/api/predictions/")
 async def get_predictions(
+    request: Request,
     league: Optional[str] = Query(None),
     team: Optional[str] = Query(None),
     date: Optional[str] = Query(None),
+    date_from: Optional[str] = Query(None),
+    date_to: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
 ):
-    predictions_file = "data/final_predictions.json"
-    
-    if not os.path.exists(predictions_file):
-        raise HTTPException(status_code=404, detail="預測資料未生成")
-    
-    with open(predictions_file, "r", encoding="utf-8") as f:
-        all_predictions = json.load(f)
-    
-    filtered = all_predictions
-    
-    if league:
-        filtered = [p for p in filtered if p["league"].lower() == league.lower()]
-    
-    if team:
-        filtered = [p for p in filtered 
-                   if team.lower() in p["home_team"].lower() 
-                   or team.lower() in p["away_team"].lower()]
-    
-    if date:
-        filtered = [p for p in filtered if p["date"] == date]
-    
-    return {"total": len(filtered), "predictions": filtered}
+    filters = dict(league=league, team=team, date=date, date_from=date_from, date_to=date_to)
+    return predictions_list_response(request, _require_snapshot(), filters, cursor=cursor, limit=limit)
 
 @app.get("/api/predictions/leagues")
-async def get_leagues():
-    predictions_file = "data/final_predictions.json"
-    
-    if not os.path.exists(predictions_file):
-        raise HTTPException(status_code=404, detail="預測資料��生成")
-    
-    with open(predictions_file, "r", encoding="utf-8") as f:
-        predictions = json.load(f)
-    
-    leagues = list(set(p["league"] for p in predictions))
-    
-    return {"leagues": sorted(leagues), "count": len(leagues)}
+async def get_leagues(request: Request):
+    snapshot = _require_snapshot()
+    return conditional_body_response(request, snapshot.version, snapshot.facets.leagues_body)
 
 @app.get("/api/predictions/teams")
-async def get_teams(league: Optional[str] = None):
-    predictions_file = "data/final_predictions.json"
-    
-    if not os.path.exists(predictions_file):
-        raise HTTPException(status_code=404, detail="預測資料未生成")
-    
-    with open(predictions_file, "r", encoding="utf-8") as f:
-        predictions = json.load(f)
-    
-    if league:
-        predictions = [p for p in predictions if p["league"] == league]
-    
-    teams = set()
-    for p in predictions:
-        teams.add(p["home_team"])
-        teams.add(p["away_team"])
-    
-    return {"teams": sorted(list(teams)), "count": len(teams)}
+async def get_teams(request: Request, league: Optional[str] = None):
+    snapshot = _require_snapshot()
+    return conditional_body_response(request, snapshot.version, snapshot.facets.teams_body_for(league))
 
 @app.get("/api/history/")
-async def get_history(
+@cache_route(ttl=300, versions=(_snapshot_version, PREDICTIONS))
+def get_history(
     limit: int = Query(30, le=100),
     only_completed: bool = Query(False),
     db: Session = Depends(get_db)
 ):
     """取得預測歷史記錄。優先讀取 data/final_predictions.json，若不存在則從 DB 查詢 Prediction。"""
-    predictions_file = "data/final_predictions.json"
-    history_records = []
+    snapshot = prediction_store.get()
+
+    if snapshot is None:
+        return _get_history_from_db(db, limit, only_completed)
 
-    if os.path.exists(predictions_file):
-        with open(predictions_file, "r", encoding="utf-8") as f:
-            predictions = json.load(f)
-        for idx, pred in enumerate(predictions[:limit], 1):
-            record = {
-                "id": idx,
-                "date": pred.get("date"),
-                "time": pred.get("time"),
-                "league": pred.get("league"),
-                "home_team": pred.get("home_team"),
-                "away_team": pred.get("away_team"),
-                "predicted_result": pred.get("prediction", {}).get("prediction"),
-                "predicted_score": pred.get("prediction", {}).get("expected_score"),
-                "confidence": pred.get("prediction", {}).get("confidence"),
-                "actual_result": None,
-                "actual_score": None,
-                "is_correct": None
-            }
-            history_records.append(record)
-    else:
-        # Read from DB
-        preds = db.query(Prediction).order_by(Prediction.created_at.desc()).limit(limit).all()
-        for idx, p in enumerate(preds, 1):
-            # find match to get teams
-            match = db.query(__import__('app.models.match', fromlist=['Match']).Match).filter(__import__('app.models.match', fromlist=['Match']).Match.id == p.match_id).first()
-            home = match.home_team if match and match.home_team else None
-            away = match.away_team if match and match.away_team else None
-            record = {
-                "id": idx,
-                "date": getattr(p, 'created_at', None),
-                "time": None,
-                "league": getattr(match, 'league', None),
-                "home_team": home,
-                "away_team": away,
-                "predicted_result": getattr(p.predicted_result, 'value', None),
-                "predicted_score": None,
-                "confidence": p.confidence_home if p else None,
-                "actual_result": getattr(p.actual_result, 'value', None) if p.actual_result else None,
-                "actual_score": None,
-                "is_correct": p.is_correct
-            }
-            history_records.append(record)
+    history_records = []
+    for idx, pred in enumerate(snapshot.predictions[:limit], 1):
+        record = {
+            "id": idx,
+            "date": pred.get("date"),
+            "time": pred.get("time"),
+            "league": pred.get("league"),
+            "home_team": pred.get("home_team"),
+            "away_team": pred.get("away_team"),
+            "predicted_result": pred.get("prediction", {}).get("prediction"),
+            "predicted_score": pred.get("prediction", {}).get("expected_score"),
+            "confidence": pred.get("prediction", {}).get("confidence"),
+            "actual_result": None,
+            "actual_score": None,
+            "is_correct": None
+        }
+        history_records.append(record)
 
     if only_completed:
         history_records = [r for r in history_records if r["actual_result"] is not None]
@@ -173,137 +141,90 @@ async def get_history(
         "records": history_records
     }
 
-@app.get("/api/history/stats")
-async def get_history_stats():
-    """取得預測統計"""
-    predictions_file = "data/final_predictions.json"
-    
-    if not os.path.exists(predictions_file):
-        raise HTTPException(status_code=404, detail="尚無預測記錄")
-    
-    with open(predictions_file, "r", encoding="utf-8") as f:
-        predictions = json.load(f)
-    
-    total = len(predictions)
-    home_wins = sum(1 for p in predictions if p["prediction"]["prediction"] == "home_win")
-    draws = sum(1 for p in predictions if p["prediction"]["prediction"] == "draw")
-    away_wins = sum(1 for p in predictions if p["prediction"]["prediction"] == "away_win")
-    
-    avg_confidence = sum(p["prediction"]["confidence"] for p in predictions) / total if total > 0 else 0
-    
-    league_stats = {}
-    for pred in predictions:
-        league = pred["league"]
-        if league not in league_stats:
-            league_stats[league] = 0
-        league_stats[league] += 1
-    
+def _get_history_from_db(db: Session, limit: int, only_completed: bool):
+    """History page from the predictions table, joined to matches in one query."""
+    query = db.query(Prediction).outerjoin(Match, Match.id == Prediction.match_id)
+    if only_completed:
+        query = query.filter(Prediction.actual_result.isnot(None))
+    query = query.order_by(Prediction.created_at.desc()).limit(limit)
+
+    rows = query.with_entities(
+        Prediction.created_at,
+        Prediction.predicted_result,
+        Prediction.confidence_home,
+        Prediction.actual_result,
+        Prediction.is_correct,
+        Match.league,
+        Match.home_team,
+        Match.away_team,
+    ).all()
+
+    history_records = []
+    for idx, row in enumerate(rows, 1):
+        history_records.append({
+            "id": idx,
+            "date": row.created_at,
+            "time": None,
+            "league": row.league,
+            "home_team": row.home_team or None,
+            "away_team": row.away_team or None,
+            "predicted_result": getattr(row.predicted_result, 'value', None),
+            "predicted_score": None,
+            "confidence": row.confidence_home,
+            "actual_result": row.actual_result.value if row.actual_result else None,
+            "actual_score": None,
+            "is_correct": row.is_correct
+        })
+
+    # Accuracy over the same page, aggregated in SQL
+    page = query.with_entities(Prediction.is_correct.label("is_correct")).subquery()
+    total, correct = db.query(
+        func.count(),
+        func.coalesce(func.sum(case((page.c.is_correct.is_(True), 1), else_=0)), 0),
+    ).select_from(page).one()
+    accuracy = (100.0 * correct / total) if total > 0 else 0
+
     return {
-        "total_predictions": total,
-        "result_distribution": {
-            "home_wins": home_wins,
-            "draws": draws,
-            "away_wins": away_wins
-        },
-        "average_confidence": round(avg_confidence, 2),
-        "league_distribution": league_stats,
-        "accuracy_rate": None
+        "total": total,
+        "correct": correct,
+        "accuracy": accuracy,
+        "records": history_records
     }
+
+@app.get("/api/history/stats")
+@cache_route(ttl=300, versions=(_snapshot_version, PREDICTIONS))
+def get_history_stats(db: Session = Depends(get_db)):
+    """取得預測統計（讀取快照與資料庫中維護的累計值）"""
+    snapshot = prediction_store.get()
+    try:
+        settled = PredictionStats.from_db_totals(db)
+    except SQLAlchemyError as e:
+        logger.warning(f"Prediction totals unavailable: {e}")
+        settled = None
+    
+    if snapshot is None:
+        if settled is None or settled.total == 0:
+            raise HTTPException(status_code=404, detail="尚無預測記錄")
+        return settled.as_response()
+    
+    response = snapshot.stats.as_response()
+    response["accuracy_rate"] = settled.accuracy_rate() if settled is not None else None
+    return response
+
 @app.get("/api/teams/{team_name}")
-async def get_team_details(team_name: str):
+@cache_route(ttl=600, versions=(team_profile_store.version,))
+def get_team_details(team_name: str):
     """取得球隊詳細資訊"""
-    import sys
-    sys.path.insert(0, "scripts")
-    from predict_match import predict_match
-    
-    predictions_file = "data/final_predictions.json"
-    
-    if not os.path.exists(predictions_file):
+    profiles = team_profile_store.get()
+    if profiles is None:
         raise HTTPException(status_code=404, detail="預測資料未生成")
     
-    with open(predictions_file, "r", encoding="utf-8") as f:
-        all_predictions = json.load(f)
-    
-    # 找到該球隊的任一場比賽
-    team_match = None
-    opponent = None
-    league = None
-    upcoming_matches = []
-    
-    for pred in all_predictions:
-        if pred["home_team"] == team_name:
-            if not team_match:
-                team_match = pred
-                opponent = pred["away_team"]
-                league = pred["league"]
-            upcoming_matches.append(pred)
-        elif pred["away_team"] == team_name:
-            if not team_match:
-                team_match = pred
-                opponent = pred["home_team"]
-                league = pred["league"]
-            upcoming_matches.append(pred)
-    
-    if not team_match:
+    profile = profiles.get(team_name)
+    if profile is None:
         raise HTTPException(status_code=404, detail=f"找不到球隊: {team_name}")
     
-    # 主動計算主客場數據
-    home_prediction = predict_match(team_name, opponent)
-    home_analysis = home_prediction.get("analysis", {})
-    home_win_rate = home_analysis.get("home_win_rate", 0)
-    home_score = home_analysis.get("home_total_score", 0)
-    home_avg_goals = home_analysis.get("home_avg_goals", 0)
-    recent_form = home_analysis.get("home_form", "")
-    
-    away_prediction = predict_match(opponent, team_name)
-    away_analysis = away_prediction.get("analysis", {})
-    away_win_rate = away_analysis.get("away_win_rate", 0)
-    away_score = away_analysis.get("away_total_score", 0)
-    away_avg_goals = away_analysis.get("away_avg_goals", 0)
-    
-    total_score = max(home_score, away_score)
-    avg_goals = (home_avg_goals + away_avg_goals) / 2
-    
-    # 簡化排名計算（基於綜合實力分數）
-    league_teams = {}
-    
-    for pred in all_predictions:
-        if pred["league"] != league:
-            continue
-        
-        h_team = pred["home_team"]
-        a_team = pred["away_team"]
-        analysis = pred["prediction"]["analysis"]
-        
-        h_score = analysis["home_total_score"]
-        a_score = analysis["away_total_score"]
-        
-        if h_team not in league_teams or league_teams[h_team] < h_score:
-            league_teams[h_team] = h_score
-        if a_team not in league_teams or league_teams[a_team] < a_score:
-            league_teams[a_team] = a_score
-    
-    # 將當前球隊加入（確保有排名）
-    if team_name not in league_teams:
-        league_teams[team_name] = total_score
-    else:
-        league_teams[team_name] = max(league_teams[team_name], total_score)
-    
-    # 排序
-    sorted_teams = sorted(league_teams.items(), key=lambda x: x[1], reverse=True)
-    overall_ranking = next((i+1 for i, (t, _) in enumerate(sorted_teams) if t == team_name), None)
-    
-    return {
-        "team_name": team_name,
-        "league": league,
-        "recent_form": recent_form,
-        "total_score": total_score,
-        "home_win_rate": home_win_rate,
-        "away_win_rate": away_win_rate,
-        "home_score": home_score,
-        "away_score": away_score,
-        "avg_goals": round(avg_goals, 2),
-        "overall_ranking": overall_ranking,
-        "total_teams": len(league_teams),
-        "upcoming_matches": len(upcoming_matches)
-    } 
\ No newline at end of file
+    return profile
+
+# Registered after the snapshot routes above so /api/predictions/leagues and
+# /api/predictions/teams are matched before the router's /{match_id}
+app.include_router(predictions.router, prefix="/api/predictions", tags=["Predictions"])
@@ -0,0 +1,62 @@
+"""Precomputed per-match feature vectors."""
+from sqlalchemy import Column, Integer, String, DateTime, Text, event, or_
+from app.database import Base
+from app.models.team import Team
+from app.services.team_names import team_name_resolver
+from datetime import datetime, timezone
+
+
+class MatchFeatures(Base):
+    """Model input vector of one match, for one version of the feature layout."""
+
+    __tablename__ = "match_features"
+
+    match_id = Column(Integer, primary_key=True)
+    feature_version = Column(Integer, primary_key=True)
+
+    vector = Column(Text, nullable=False)  # JSON: list of floats in feature_store.FEATURE_NAMES order
+
+    # Teams rows the vector was computed from (None: the team was not found)
+    home_team_id = Column(Integer, nullable=True, index=True)
+    away_team_id = Column(Integer, nullable=True, index=True)
+    # team_names.name_key of the name stored on the match when it resolved to no team
+    home_team_key = Column(String, nullable=True, index=True)
+    away_team_key = Column(String, nullable=True, index=True)
+
+    # Match.updated_at the vector was computed from; a different value means
+    # the match changed since and the vector is recomputed on the next read
+    match_updated_at = Column(DateTime, nullable=True)
+    computed_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        """String representation."""
+        return f"<MatchFeatures(match_id={self.match_id}, version={self.feature_version})>"
+
+
+def _invalidate_team(mapper, connection, target):
+    """Drop the stored vectors computed from the changed team."""
+    table = MatchFeatures.__table__
+    connection.execute(
+        table.delete().where(or_(table.c.home_team_id == target.id, table.c.away_team_id == target.id))
+    )
+
+
+def _invalidate_unresolved(mapper, connection, target):
+    """Drop the stored vectors whose unresolved team name is a spelling of the new team."""
+    if not target.name:
+        return
+    # Keys of every alias of the new team, compared with the stored keys in
+    # one indexed DELETE; spellings only the fuzzy matcher would pair with
+    # it are picked up by scripts/build_feature_store.py
+    keys = team_name_resolver.equivalents(target.name)
+    table = MatchFeatures.__table__
+    connection.execute(
+        table.delete().where(or_(table.c.home_team_key.in_(keys), table.c.away_team_key.in_(keys)))
+    )
+
+
+# Team statistics have no timestamp of their own, so the vectors built
+# from a team are dropped when it is written and recomputed on next read
+event.listen(Team, 'after_insert', _invalidate_unresolved)
+event.listen(Team, 'after_update', _invalidate_team)
+event.listen(Team, 'after_delete', _invalidate_team)
@@ -13,6 +13,11 @@ class MatchStatus(enum.Enum):
     CANCELED = "CANCELED"
 
 
+# Status the ingest scripts store on played matches; team stats and Elo
+# ratings both count exactly the matches with this status
+FINISHED_STATUS = "finished"
+
+
 # add foreign keys to reference teams so we can relate and populate names
 
 
@@ -70,7 +75,7 @@ class Match(Base):
     
     # Timestamps
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
-    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), index=True)
     
     # 移除 predictions 關聯，避免循環導入和複雜性問題
     # 如需查詢 predictions，直接使用 db.query(Prediction).filter(Prediction.match_id == match.id)
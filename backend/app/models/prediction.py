@@ -1,8 +1,13 @@
 """Prediction model for database."""
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Enum, Boolean, event, inspect, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 from app.database import Base
 import enum
 from datetime import datetime, timezone
+from typing import Dict
 
 
 class PredictionResult(str, enum.Enum):
@@ -26,6 +31,7 @@ class Prediction(Base):
     confidence_draw = Column(Float)  # 0-1 probability
     confidence_away = Column(Float)  # 0-1 probability
     ai_score = Column(Float)  # 0-10 overall confidence score
+    model_version = Column(String, nullable=True)  # model that produced the probabilities
 
     # Betting advice
     betting_advice = Column(String)
@@ -51,4 +57,183 @@ class Prediction(Base):
         return (
             f"<Prediction(id={self.id}, match_id={self.match_id}, "
             f"predicted={self.predicted_result}, ai_score={self.ai_score})>"
-        )
\ No newline at end of file
+        )
+
+
+class PredictionStatTotal(Base):
+    """Running prediction totals per league, maintained as predictions are written or settled."""
+
+    __tablename__ = "prediction_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    league = Column(String, unique=True, index=True)  # "" when the match has no league
+
+    total = Column(Integer, default=0, nullable=False)
+    home_wins = Column(Integer, default=0, nullable=False)
+    draws = Column(Integer, default=0, nullable=False)
+    away_wins = Column(Integer, default=0, nullable=False)
+    confidence_sum = Column(Float, default=0.0, nullable=False)  # sum of max probability, in percent
+
+    settled = Column(Integer, default=0, nullable=False)  # predictions with is_correct set
+    correct = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        """String representation."""
+        return f"<PredictionStatTotal(league='{self.league}', total={self.total}, settled={self.settled})>"
+
+
+_RESULT_COLUMNS = {
+    PredictionResult.HOME_WIN.value: "home_wins",
+    PredictionResult.DRAW.value: "draws",
+    PredictionResult.AWAY_WIN.value: "away_wins",
+}
+_TRACKED_ATTRS = (
+    "match_id", "predicted_result", "confidence_home", "confidence_draw", "confidence_away", "is_correct",
+)
+_COUNTER_COLUMNS = ("total", "home_wins", "draws", "away_wins", "confidence_sum", "settled", "correct")
+# session.info key of the totals changes collected before a flush
+_PENDING_TOTALS = "prediction_stat_deltas"
+
+
+def _contribution(state):
+    """Counter values a single prediction adds to its league's totals."""
+    deltas = {"total": 1}
+    result = state["predicted_result"]
+    result = getattr(result, "value", result)
+    if result in _RESULT_COLUMNS:
+        deltas[_RESULT_COLUMNS[result]] = 1
+    confidences = [c for c in (state["confidence_home"], state["confidence_draw"], state["confidence_away"]) if c is not None]
+    if confidences:
+        deltas["confidence_sum"] = max(confidences) * 100
+    if state["is_correct"] is not None:
+        deltas["settled"] = 1
+        deltas["correct"] = 1 if state["is_correct"] else 0
+    return deltas
+
+
+def _match_leagues(connection, match_ids) -> Dict[int, str]:
+    """League of each match in ``match_ids``, in one query."""
+    match_ids = {match_id for match_id in match_ids if match_id is not None}
+    if not match_ids:
+        return {}
+    from app.models.match import Match
+    rows = connection.execute(select(Match.id, Match.league).where(Match.id.in_(match_ids)))
+    return {match_id: league or "" for match_id, league in rows}
+
+
+def _stored_states(connection, prediction_ids) -> Dict[int, Dict]:
+    """Tracked values of the rows as they are in the database, before this flush writes them."""
+    if not prediction_ids:
+        return {}
+    table = Prediction.__table__
+    rows = connection.execute(
+        select(table.c.id, *(table.c[name] for name in _TRACKED_ATTRS)).where(table.c.id.in_(prediction_ids))
+    ).mappings()
+    return {row["id"]: {name: row[name] for name in _TRACKED_ATTRS} for row in rows}
+
+
+def _current_state(target, stored=None):
+    """Tracked values of ``target``; expired attributes are taken from ``stored`` instead of reloaded."""
+    unloaded = inspect(target).unloaded
+    return {
+        name: stored[name] if stored is not None and name in unloaded else getattr(target, name)
+        for name in _TRACKED_ATTRS
+    }
+
+
+def _tracked_change(target) -> bool:
+    attrs = inspect(target).attrs
+    return any(attrs[name].history.has_changes() for name in _TRACKED_ATTRS)
+
+
+def _league_totals(connection, entries) -> Dict[str, Dict[str, float]]:
+    """Sum the (tracked state, +1/-1) ``entries`` into per-league counter changes."""
+    leagues = _match_leagues(connection, [state["match_id"] for state, _ in entries])
+    totals: Dict[str, Dict[str, float]] = {}
+    for state, sign in entries:
+        league = totals.setdefault(leagues.get(state["match_id"], ""), dict.fromkeys(_COUNTER_COLUMNS, 0))
+        for col, delta in _contribution(state).items():
+            league[col] += sign * delta
+    return totals
+
+
+def _apply_totals(connection, totals: Dict[str, Dict[str, float]]):
+    """Add per-league counter changes to prediction_stats, one row per league."""
+    rows = [dict(deltas, league=league) for league, deltas in totals.items() if any(deltas.values())]
+    if not rows:
+        return
+    table = PredictionStatTotal.__table__
+    dialect = connection.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        # A concurrent first prediction of the same league adds to the row
+        # the other session created instead of failing the whole write
+        insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=["league"],
+            set_={col: table.c[col] + statement.excluded[col] for col in _COUNTER_COLUMNS},
+        )
+        connection.execute(statement, rows)
+        return
+    for row in rows:
+        increment = table.update().where(table.c.league == row["league"]).values(
+            **{col: table.c[col] + row[col] for col in _COUNTER_COLUMNS}
+        )
+        if connection.execute(increment).rowcount:
+            continue
+        try:
+            with connection.begin_nested():
+                connection.execute(table.insert(), [row])
+        except IntegrityError:
+            connection.execute(increment)
+
+
+def _collect_flush_totals(session, flush_context, instances):
+    """Work out the per-league totals changes of the predictions this flush writes."""
+    new = [obj for obj in session.new if isinstance(obj, Prediction)]
+    changed = [obj for obj in session.dirty if isinstance(obj, Prediction) and _tracked_change(obj)]
+    deleted = [obj for obj in session.deleted if isinstance(obj, Prediction)]
+    session.info.pop(_PENDING_TOTALS, None)
+    if not (new or changed or deleted):
+        return
+
+    # Updates and deletes read the stored rows first, so expired attributes
+    # (no in-memory history) are still accounted for correctly
+    connection = session.connection()
+    stored = _stored_states(connection, [obj.id for obj in changed + deleted if obj.id is not None])
+    entries = [(_current_state(obj), 1) for obj in new]
+    for obj in changed:
+        old = stored.get(obj.id)
+        new_state = _current_state(obj, old)
+        if old is not None and old != new_state:
+            entries += [(old, -1), (new_state, 1)]
+    entries += [(stored[obj.id], -1) for obj in deleted if obj.id in stored]
+    if entries:
+        session.info[_PENDING_TOTALS] = _league_totals(connection, entries)
+
+
+def _apply_flush_totals(session, flush_context):
+    totals = session.info.pop(_PENDING_TOTALS, None)
+    if totals:
+        _apply_totals(session.connection(), totals)
+
+
+def _bulk_insert_totals(orm_execute_state):
+    """Totals of predictions added with ``session.execute(insert(Prediction), rows)``."""
+    rows = orm_execute_state.parameters
+    if not (orm_execute_state.is_insert and orm_execute_state.bind_mapper is Prediction.__mapper__ and rows):
+        return None
+    rows = [rows] if isinstance(rows, dict) else rows
+    result = orm_execute_state.invoke_statement()
+    connection = orm_execute_state.session.connection()
+    entries = [({name: row.get(name) for name in _TRACKED_ATTRS}, 1) for row in rows]
+    _apply_totals(connection, _league_totals(connection, entries))
+    return result
+
+
+# Totals are collected for the whole flush (or bulk insert) and written
+# once per league, so adding many predictions costs one league lookup
+# and one upsert on top of the inserts themselves
+event.listen(Session, 'before_flush', _collect_flush_totals)
+event.listen(Session, 'after_flush', _apply_flush_totals)
+event.listen(Session, 'do_orm_execute', _bulk_insert_totals)
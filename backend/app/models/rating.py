@@ -0,0 +1,27 @@
+"""Elo rating checkpoint model for database."""
+from sqlalchemy import Column, Integer, DateTime, Text
+from app.database import Base
+from datetime import datetime, timezone
+
+
+class EloCheckpoint(Base):
+    """Elo ratings of every team after the first ``matches_processed`` finished matches."""
+    
+    __tablename__ = "elo_checkpoints"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    matches_processed = Column(Integer, nullable=False, index=True)
+    
+    # Last match included, in (match_date, id) processing order
+    last_match_date = Column(DateTime, nullable=False, index=True)
+    last_match_id = Column(Integer, nullable=False)
+    
+    ratings = Column(Text, nullable=False)  # JSON: team name -> rating
+    
+    # When the matches table was read for this checkpoint; later changes to
+    # matches it already covers force a rewind
+    synced_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    def __repr__(self):
+        """String representation."""
+        return f"<EloCheckpoint(matches={self.matches_processed}, last_match_date={self.last_match_date})>"
@@ -8,6 +8,7 @@ from app.database import get_db
 from app.models.match import Match
 from app.models.team import Team
 from app.schemas.match import MatchResponse, MatchCreate
+from app.utils.route_cache import MATCHES, CachedRoute, cache_route
 
 
 def _serialize_match(match: Match, db: Session):
@@ -46,10 +47,11 @@ def _serialize_match(match: Match, db: Session):
         "odds_away": match.odds_away,
     }
 
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
 
 
 @router.get("/", response_model=List[MatchResponse])
+@cache_route(ttl=60, versions=(MATCHES,))
 def get_matches(
     league: Optional[str] = None,
     status: Optional[str] = None,
@@ -71,6 +73,7 @@ def get_matches(
 
 
 @router.get("/upcoming", response_model=List[MatchResponse])
+@cache_route(ttl=60, versions=(MATCHES,))  # short TTL: the window moves with the clock
 def get_upcoming_matches(
     days: int = Query(default=7, le=30),
     league: Optional[str] = None,
@@ -94,6 +97,7 @@ def get_upcoming_matches(
 
 
 @router.get("/{match_id}", response_model=MatchResponse)
+@cache_route(ttl=300, versions=(MATCHES,))
 def get_match(match_id: int, db: Session = Depends(get_db)):
     """Get a specific match."""
     match = db.query(Match).filter(Match.id == match_id).first()
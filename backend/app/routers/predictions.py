@@ -1,16 +1,23 @@
 """Predictions API endpoints."""
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.database import get_db
-from app.services.ml_service import MLService
+from app.services.feature_store import feature_store
+from app.services.model_registry import model_registry
 from app.services.llm_service import LLMService
 from app.models.match import Match
 from app.models.prediction import Prediction, PredictionResult
+from app.schemas.prediction import PredictionBatchRequest
+from app.utils.route_cache import PREDICTIONS, CachedRoute, cache_route
 
-router = APIRouter(tags=["Predictions"])
+router = APIRouter(tags=["Predictions"], route_class=CachedRoute)
 
 
 @router.get("/{match_id}")
+@cache_route(ttl=300, versions=(PREDICTIONS,))
 async def get_prediction(match_id: int, db: Session = Depends(get_db)):
     """
     取得比賽的 AI 預測分析。
@@ -33,70 +40,114 @@ async def get_prediction(match_id: int, db: Session = Depends(get_db)):
     # Check if prediction already exists
     existing_prediction = db.query(Prediction).filter(
         Prediction.match_id == match_id
-    ).first()
+    ).order_by(Prediction.id).first()
     
     if existing_prediction:
-        return {
-            "id": existing_prediction.id,
-            "match_id": existing_prediction.match_id,
-            "prediction": {
-                "result": existing_prediction.predicted_result.value,
-                "probabilities": {
-                    "home": existing_prediction.confidence_home,
-                    "draw": existing_prediction.confidence_draw,
-                    "away": existing_prediction.confidence_away
-                },
-                "ai_score": existing_prediction.ai_score
-            },
-            "betting": {
-                "advice": existing_prediction.betting_advice,
-                "value_rating": existing_prediction.value_rating
-            },
-            "analysis": {
-                "llm_analysis": existing_prediction.llm_analysis,
-                "news_sentiment": existing_prediction.news_sentiment
-            },
-            "actual_result": existing_prediction.actual_result.value if existing_prediction.actual_result else None,
-            "is_correct": existing_prediction.is_correct,
-            "created_at": existing_prediction.created_at
-        }
+        return _prediction_response(existing_prediction, settled=True)
     
-    # Generate new prediction
-    ml_service = MLService()
+    # Generate new prediction with the shared, already loaded model
+    # A changed model file is loaded off the event loop
+    ml_service = await run_in_threadpool(model_registry.get)
     llm_service = LLMService()
     
-    # ML prediction
-    ml_result = ml_service.predict_match(match)
+    # ML prediction from the stored feature vector
+    features = feature_store.vectors(db, [match])
+    ml_result = ml_service.predict_matches([match], features)[0]
     
     # LLM analysis
-    if match.home_team and match.away_team:
-        # match.home_team/away_team are stored as plain strings
-        llm_analysis = await llm_service.analyze_match(
-            match.home_team,
-            match.away_team
-        )
-    else:
-        llm_analysis = {"analysis": "球隊資訊不完整", "sentiment": 0.0}
+    llm_analysis = await _llm_analysis(llm_service, match)
     
     # Create prediction record
-    prediction = Prediction(
-        match_id=match_id,
+    prediction = Prediction(**_new_prediction(match, ml_result, llm_analysis))
+    
+    db.add(prediction)
+    db.commit()
+    db.refresh(prediction)
+    
+    return _prediction_response(prediction)
+
+
+@router.post("/batch")
+async def create_predictions_batch(request: PredictionBatchRequest, db: Session = Depends(get_db)):
+    """
+    一次取得多場比賽的 AI 預測。
+    
+    已有預測記錄的比賽以單一查詢取回；其餘比賽從特徵庫讀出一個特徵矩陣，
+    只呼叫一次模型 predict_proba，並一次寫入資料庫。
+    
+    Returns:
+        predictions: 依請求順序的預測（格式同 GET /{match_id}）
+        missing: 不存在的比賽 id
+    """
+    match_ids = list(dict.fromkeys(request.match_ids))
+    
+    existing = _first_predictions(db, match_ids)
+    to_predict = [mid for mid in match_ids if mid not in existing]
+    matches = (
+        db.query(Match).filter(Match.id.in_(to_predict)).all() if to_predict else []
+    )
+    new_match_ids = {match.id for match in matches}
+    
+    if matches:
+        features = feature_store.vectors(db, matches)
+        ml_service = await run_in_threadpool(model_registry.get)
+        ml_results = ml_service.predict_matches(matches, features)
+        llm_service = LLMService()
+        llm_results = await asyncio.gather(*(_llm_analysis(llm_service, match) for match in matches))
+        # One bulk INSERT, not a flush of one INSERT ... RETURNING per object
+        db.execute(insert(Prediction), [
+            _new_prediction(match, ml_result, llm_analysis)
+            for match, ml_result, llm_analysis in zip(matches, ml_results, llm_results)
+        ])
+        db.commit()
+        # The commit expired every loaded row; reload them together with the new ones
+        existing = _first_predictions(db, match_ids)
+    
+    return {
+        # New predictions are rendered like a fresh GET /{match_id}
+        "predictions": [
+            _prediction_response(existing[mid], settled=mid not in new_match_ids)
+            for mid in match_ids if mid in existing
+        ],
+        "missing": [mid for mid in match_ids if mid not in existing],
+    }
+
+
+def _first_predictions(db: Session, match_ids) -> dict:
+    """Oldest prediction of each match, the same one GET /{match_id} returns."""
+    first = {}
+    for prediction in db.query(Prediction).filter(Prediction.match_id.in_(match_ids)).order_by(Prediction.id):
+        first.setdefault(prediction.match_id, prediction)
+    return first
+
+
+async def _llm_analysis(llm_service: LLMService, match: Match) -> dict:
+    if match.home_team and match.away_team:
+        # match.home_team/away_team are stored as plain strings
+        return await llm_service.analyze_match(match.home_team, match.away_team)
+    return {"analysis": "球隊資訊不完整", "sentiment": 0.0}
+
+
+def _new_prediction(match: Match, ml_result: dict, llm_analysis: dict) -> dict:
+    """Column values of the prediction row for ``match``."""
+    return dict(
+        match_id=match.id,
         predicted_result=PredictionResult(ml_result['prediction']),
         confidence_home=ml_result['probabilities']['H'],
         confidence_draw=ml_result['probabilities']['D'],
         confidence_away=ml_result['probabilities']['A'],
         ai_score=ml_result['ai_score'],
+        model_version=ml_result['model_version'],
         betting_advice=ml_result['betting_advice'],
         value_rating=ml_result['value_rating'],
         llm_analysis=llm_analysis['analysis'],
         news_sentiment=llm_analysis['sentiment']
     )
-    
-    db.add(prediction)
-    db.commit()
-    db.refresh(prediction)
-    
-    return {
+
+
+def _prediction_response(prediction: Prediction, settled: bool = False) -> dict:
+    """API body of one prediction; ``settled`` adds the actual result fields."""
+    body = {
         "id": prediction.id,
         "match_id": prediction.match_id,
         "prediction": {
@@ -106,7 +157,8 @@ async def get_prediction(match_id: int, db: Session = Depends(get_db)):
                 "draw": prediction.confidence_draw,
                 "away": prediction.confidence_away
             },
-            "ai_score": prediction.ai_score
+            "ai_score": prediction.ai_score,
+            "model_version": prediction.model_version
         },
         "betting": {
             "advice": prediction.betting_advice,
@@ -116,5 +168,9 @@ async def get_prediction(match_id: int, db: Session = Depends(get_db)):
             "llm_analysis": prediction.llm_analysis,
             "news_sentiment": prediction.news_sentiment
         },
-        "created_at": prediction.created_at
     }
+    if settled:
+        body["actual_result"] = prediction.actual_result.value if prediction.actual_result else None
+        body["is_correct"] = prediction.is_correct
+    body["created_at"] = prediction.created_at
+    return body
@@ -1,7 +1,10 @@
 """Prediction schemas for API."""
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+
+# Most match ids accepted by one POST /api/predictions/batch request
+MAX_BATCH_SIZE = 200
 
 
 class PredictionBase(BaseModel):
@@ -30,3 +33,8 @@ class PredictionDetail(PredictionBase):
     
     class Config:
         from_attributes = True
+
+
+class PredictionBatchRequest(BaseModel):
+    """Match ids to predict in one request."""
+    match_ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
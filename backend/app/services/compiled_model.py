@@ -0,0 +1,288 @@
+"""Array-based copies of trained models, evaluated with NumPy only."""
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Bumped when the layout of the exported arrays changes
+FORMAT_VERSION = 1
+# Compiled models are one .npz file: a bundle of .npy arrays plus a JSON spec
+COMPILED_SUFFIX = ".npz"
+_SPEC_KEY = "spec"
+
+
+def _expit(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    x = x - x.max(axis=1, keepdims=True)
+    np.exp(x, out=x)
+    return x / x.sum(axis=1, keepdims=True)
+
+
+class CompiledModel:
+    """
+    A trained classifier compiled into plain arrays.
+
+    ``compile_model`` reads the fitted attributes of a scikit-learn model
+    (linear coefficients, tree node arrays, voting weights, scaler
+    statistics) into a JSON spec plus named arrays; ``predict_proba``
+    evaluates them with NumPy and returns the same probabilities as the
+    original model. Loading and predicting never imports scikit-learn,
+    so API workers only pay for NumPy.
+    """
+
+    def __init__(self, spec: Dict, arrays: Dict[str, np.ndarray]):
+        self.spec = spec
+        self.arrays = arrays
+        self.classes_ = np.asarray(spec["classes"])
+        self.n_features_in_ = spec["n_features"]
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledModel":
+        """
+        Read a model written by ``save``.
+
+        Raises:
+            ValueError: If the file was written by another format version
+        """
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+        spec = json.loads(str(arrays.pop(_SPEC_KEY)))
+        if spec.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled model format: {spec.get('format')}")
+        return cls(spec, arrays)
+
+    def save(self, path: str) -> None:
+        """Write the model to ``path`` atomically (readers never see half a file)."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **{_SPEC_KEY: np.array(json.dumps(self.spec))}, **self.arrays)
+        os.replace(tmp_path, path)
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Class probabilities, shape (n_samples, n_classes), in ``classes_`` order."""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has shape {X.shape}, expected (n_samples, {self.n_features_in_})")
+        return self._proba(self.spec["model"], X)
+
+    # -----------------------------
+    # Evaluation
+    # -----------------------------
+    def _proba(self, node: Dict, X: np.ndarray) -> np.ndarray:
+        kind = node["kind"]
+        if kind == "pipeline":
+            for step in node["transforms"]:
+                X = self._transform(step, X)
+            return self._proba(node["final"], X)
+        if kind == "linear":
+            return self._linear_proba(node, X)
+        if kind == "forest":
+            leaves = self._leaf_values(node["trees"], X)
+            return leaves.sum(axis=0) / leaves.shape[0]
+        if kind == "gradient_boosting":
+            return self._gradient_boosting_proba(node, X)
+        if kind == "voting":
+            probas = np.asarray([self._proba(member, X) for member in node["estimators"]])
+            weights = self.arrays[node["weights"]] if node["weights"] else None
+            return np.average(probas, axis=0, weights=weights)
+        raise ValueError(f"Unknown compiled model node: {kind}")
+
+    def _transform(self, step: Dict, X: np.ndarray) -> np.ndarray:
+        kind = step["kind"]
+        if kind == "impute":
+            statistics = self.arrays[step["statistics"]]
+            return np.where(np.isnan(X), statistics, X)
+        if kind == "standard_scaler":
+            if step["mean"]:
+                X = X - self.arrays[step["mean"]]
+            if step["scale"]:
+                X = X / self.arrays[step["scale"]]
+            return X
+        if kind == "minmax_scaler":
+            return X * self.arrays[step["scale"]] + self.arrays[step["min"]]
+        raise ValueError(f"Unknown compiled transform: {kind}")
+
+    def _linear_proba(self, node: Dict, X: np.ndarray) -> np.ndarray:
+        decision = X @ self.arrays[node["coef"]].T + self.arrays[node["intercept"]]
+        if decision.shape[1] == 1:
+            decision = decision[:, 0]
+            if node["ovr"]:
+                prob = _expit(decision)
+                return np.column_stack([1 - prob, prob])
+            return _softmax(np.column_stack([-decision, decision]))
+        if node["ovr"]:
+            prob = _expit(decision)
+            return prob / prob.sum(axis=1, keepdims=True)
+        return _softmax(decision)
+
+    def _leaf_values(self, trees: Dict, X: np.ndarray) -> np.ndarray:
+        """Value of the leaf each sample reaches in each tree, shape (n_trees, n_samples, n_values)."""
+        feature = self.arrays[trees["feature"]]
+        threshold = self.arrays[trees["threshold"]]
+        left = self.arrays[trees["left"]]
+        right = self.arrays[trees["right"]]
+        # Trees compare float32 features against float64 thresholds, like scikit-learn
+        X = X.astype(np.float32).astype(np.float64)
+        samples = np.arange(X.shape[0])
+        node = np.repeat(self.arrays[trees["roots"]][:, None], X.shape[0], axis=1)
+        # Leaves point to themselves, so every sample stops at its leaf
+        for _ in range(trees["max_depth"]):
+            go_left = X[samples, feature[node]] <= threshold[node]
+            node = np.where(go_left, left[node], right[node])
+        return self.arrays[trees["value"]][node]
+
+    def _gradient_boosting_proba(self, node: Dict, X: np.ndarray) -> np.ndarray:
+        leaves = self._leaf_values(node["trees"], X)[:, :, 0]
+        raw = np.tile(self.arrays[node["init"]], (X.shape[0], 1))
+        tree_class = self.arrays[node["tree_class"]]
+        for k in range(raw.shape[1]):
+            raw[:, k] += node["learning_rate"] * leaves[tree_class == k].sum(axis=0)
+        if raw.shape[1] == 1:
+            prob = _expit(raw[:, 0])
+            return np.column_stack([1 - prob, prob])
+        return _softmax(raw)
+
+
+class _Compiler:
+    """Collect the arrays of a fitted model while building its spec."""
+
+    def __init__(self):
+        self.arrays: Dict[str, np.ndarray] = {}
+
+    def add(self, array) -> str:
+        name = f"a{len(self.arrays)}"
+        self.arrays[name] = np.ascontiguousarray(array)
+        return name
+
+    def estimator(self, model) -> Dict:
+        name = type(model).__name__
+        if name == "Pipeline":
+            steps = [step for _, step in model.steps if step not in (None, "passthrough")]
+            return {
+                "kind": "pipeline",
+                "transforms": [self.transform(step) for step in steps[:-1]],
+                "final": self.estimator(steps[-1]),
+            }
+        if name == "LogisticRegression":
+            # Same rule as LogisticRegression.predict_proba
+            ovr = model.multi_class in ("ovr", "warn") or (
+                model.multi_class == "auto" and (model.classes_.size <= 2 or model.solver == "liblinear")
+            )
+            return {
+                "kind": "linear",
+                "coef": self.add(np.asarray(model.coef_, dtype=np.float64)),
+                "intercept": self.add(np.asarray(model.intercept_, dtype=np.float64)),
+                "ovr": bool(ovr),
+            }
+        if name == "DecisionTreeClassifier":
+            return {"kind": "forest", "trees": self.trees([model.tree_], normalize=True)}
+        if name in ("RandomForestClassifier", "ExtraTreesClassifier"):
+            return {"kind": "forest", "trees": self.trees([tree.tree_ for tree in model.estimators_], normalize=True)}
+        if name == "GradientBoostingClassifier":
+            return self.gradient_boosting(model)
+        if name == "VotingClassifier":
+            if model.voting != "soft":
+                raise TypeError("Only soft-voting VotingClassifier has predict_proba")
+            weights = model._weights_not_none
+            return {
+                "kind": "voting",
+                "estimators": [self.estimator(member) for member in model.estimators_],
+                "weights": self.add(np.asarray(weights, dtype=np.float64)) if weights is not None else None,
+            }
+        raise TypeError(f"Cannot compile model type {name}")
+
+    def transform(self, step) -> Dict:
+        name = type(step).__name__
+        if name == "SimpleImputer":
+            missing = step.missing_values
+            if not (isinstance(missing, float) and np.isnan(missing)) or getattr(step, "add_indicator", False):
+                raise TypeError("Only SimpleImputer(missing_values=np.nan) without indicator can be compiled")
+            return {"kind": "impute", "statistics": self.add(np.asarray(step.statistics_, dtype=np.float64))}
+        if name == "StandardScaler":
+            return {
+                "kind": "standard_scaler",
+                "mean": self.add(step.mean_) if step.mean_ is not None and step.with_mean else None,
+                "scale": self.add(step.scale_) if step.scale_ is not None and step.with_std else None,
+            }
+        if name == "MinMaxScaler":
+            if step.clip:
+                raise TypeError("MinMaxScaler(clip=True) cannot be compiled")
+            return {"kind": "minmax_scaler", "scale": self.add(step.scale_), "min": self.add(step.min_)}
+        raise TypeError(f"Cannot compile transform type {name}")
+
+    def trees(self, trees: List, normalize: bool) -> Dict:
+        """Concatenate the node arrays of several fitted ``tree_`` objects."""
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            n_nodes = tree.node_count
+            nodes = np.arange(n_nodes)
+            is_leaf = tree.children_left == -1
+            lefts.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            value = np.asarray(tree.value[:, 0, :], dtype=np.float64)
+            if normalize:
+                # Same normalization as DecisionTreeClassifier.predict_proba
+                normalizer = value.sum(axis=1, keepdims=True)
+                normalizer[normalizer == 0.0] = 1.0
+                value = value / normalizer
+            values.append(value)
+            roots.append(offset)
+            offset += n_nodes
+        return {
+            "feature": self.add(np.concatenate(features).astype(np.int32)),
+            "threshold": self.add(np.concatenate(thresholds).astype(np.float64)),
+            "left": self.add(np.concatenate(lefts).astype(np.int32)),
+            "right": self.add(np.concatenate(rights).astype(np.int32)),
+            "value": self.add(np.concatenate(values)),
+            "roots": self.add(np.asarray(roots, dtype=np.int32)),
+            "max_depth": int(max(tree.max_depth for tree in trees)),
+        }
+
+    def gradient_boosting(self, model) -> Dict:
+        init = model.init_
+        if not (init == "zero" or (type(init).__name__ == "DummyClassifier" and init.strategy == "prior")):
+            raise TypeError("Only GradientBoostingClassifier with the default (prior) or 'zero' init can be compiled")
+        # The prior init is the same for every sample
+        raw_init = model._raw_predict_init(np.zeros((1, model.n_features_in_)))[0]
+        n_stages, n_columns = model.estimators_.shape
+        return {
+            "kind": "gradient_boosting",
+            "trees": self.trees([tree.tree_ for tree in model.estimators_.ravel()], normalize=False),
+            "tree_class": self.add(np.tile(np.arange(n_columns), n_stages).astype(np.int32)),
+            "init": self.add(np.asarray(raw_init, dtype=np.float64)),
+            "learning_rate": float(model.learning_rate),
+        }
+
+
+def compile_model(model, n_features: Optional[int] = None) -> CompiledModel:
+    """
+    Compile a fitted scikit-learn classifier into a ``CompiledModel``.
+
+    Supported: LogisticRegression, DecisionTree / RandomForest / ExtraTrees
+    and GradientBoosting classifiers, soft VotingClassifier ensembles of
+    them, and Pipelines ending in one of them after SimpleImputer /
+    StandardScaler / MinMaxScaler steps.
+
+    Raises:
+        TypeError: If the model (or one of its parts) is not supported
+    """
+    compiler = _Compiler()
+    root = compiler.estimator(model)
+    n_features = n_features if n_features is not None else getattr(model, "n_features_in_", None)
+    if n_features is None:
+        raise TypeError(f"Cannot tell how many features {type(model).__name__} expects")
+    spec = {
+        "format": FORMAT_VERSION,
+        "source": type(model).__name__,
+        "classes": np.asarray(model.classes_).tolist(),
+        "n_features": int(n_features),
+        "model": root,
+    }
+    return CompiledModel(spec, compiler.arrays)
@@ -0,0 +1,177 @@
+"""Streaming Elo ratings over the matches table."""
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, true
+from sqlalchemy.orm import Session
+
+from app.models.match import FINISHED_STATUS, Match
+from app.models.rating import EloCheckpoint
+
+logger = logging.getLogger(__name__)
+
+INITIAL_RATING = 1500.0
+K_FACTOR = 20.0
+HOME_ADVANTAGE = 60.0
+CHECKPOINT_EVERY = 500
+# Rows read from the database per round trip while replaying
+FETCH_SIZE = 2000
+
+
+def goal_multiplier(goal_diff: int) -> float:
+    """Margin-of-victory weight used by the World Football Elo ratings."""
+    goal_diff = abs(goal_diff)
+    if goal_diff <= 1:
+        return 1.0
+    if goal_diff == 2:
+        return 1.5
+    return (11 + goal_diff) / 8
+
+
+class EloEngine:
+    """
+    Elo ratings updated one match at a time.
+
+    Each ``update`` touches only the two teams involved, so processing a
+    season is linear in the number of matches.
+    """
+
+    def __init__(self, ratings: Optional[Dict[str, float]] = None, k: float = K_FACTOR,
+                 home_advantage: float = HOME_ADVANTAGE):
+        self.ratings: Dict[str, float] = dict(ratings or {})
+        self.k = k
+        self.home_advantage = home_advantage
+
+    def rating(self, team: str) -> float:
+        return self.ratings.get(team, INITIAL_RATING)
+
+    def expected_home(self, home: str, away: str) -> float:
+        """Expected score (win = 1, draw = 0.5) of the home team."""
+        diff = self.rating(away) - self.rating(home) - self.home_advantage
+        return 1 / (1 + 10 ** (diff / 400))
+
+    def update(self, home: str, away: str, home_score: int, away_score: int):
+        """Apply one result."""
+        actual = 1.0 if home_score > away_score else 0.5 if home_score == away_score else 0.0
+        delta = self.k * goal_multiplier(home_score - away_score) * (actual - self.expected_home(home, away))
+        self.ratings[home] = self.rating(home) + delta
+        self.ratings[away] = self.rating(away) - delta
+
+
+def _finished(query):
+    return query.filter(
+        Match.status == FINISHED_STATUS,
+        Match.home_score.isnot(None),
+        Match.away_score.isnot(None),
+        Match.match_date.isnot(None),
+        Match.home_team.isnot(None),
+        Match.away_team.isnot(None),
+    )
+
+
+def _after(key: Optional[Tuple[datetime, int]]):
+    """Filter for matches strictly after ``key`` in (match_date, id) order."""
+    if key is None:
+        return true()
+    date, match_id = key
+    return or_(Match.match_date > date, and_(Match.match_date == date, Match.id > match_id))
+
+
+def _stream(db: Session, after: Optional[Tuple[datetime, int]], until: Optional[datetime] = None) -> Iterable:
+    """Finished matches after ``after`` (and on or before ``until``) in processing order."""
+    query = _finished(db.query(
+        Match.id, Match.match_date, Match.home_team, Match.away_team, Match.home_score, Match.away_score
+    )).filter(_after(after))
+    if until is not None:
+        query = query.filter(Match.match_date <= until)
+    return query.order_by(Match.match_date, Match.id).yield_per(FETCH_SIZE)
+
+
+def _key(checkpoint: Optional[EloCheckpoint]) -> Optional[Tuple[datetime, int]]:
+    if checkpoint is None:
+        return None
+    return checkpoint.last_match_date, checkpoint.last_match_id
+
+
+class EloRatingStore:
+    """
+    Elo ratings kept current incrementally, with checkpoints for past dates.
+
+    Every ``checkpoint_every`` processed matches the full rating table is
+    saved to ``elo_checkpoints``. ``update`` resumes from the latest
+    checkpoint and only replays what came after it; ``ratings_as_of``
+    starts from the latest checkpoint before the requested date, so at
+    most ``checkpoint_every`` matches are replayed either way.
+
+    A finished match that is added or corrected after a checkpoint covering
+    its date was written invalidates that checkpoint and every later one.
+    """
+
+    def __init__(self, checkpoint_every: int = CHECKPOINT_EVERY):
+        self.checkpoint_every = checkpoint_every
+
+    def _latest_checkpoint(self, db: Session, until: Optional[datetime] = None) -> Optional[EloCheckpoint]:
+        query = db.query(EloCheckpoint)
+        if until is not None:
+            query = query.filter(EloCheckpoint.last_match_date <= until)
+        return query.order_by(EloCheckpoint.matches_processed.desc()).first()
+
+    def _rewind_for_late_changes(self, db: Session, checkpoint: Optional[EloCheckpoint]) -> Optional[EloCheckpoint]:
+        """Drop checkpoints covering matches changed since the latest one was written."""
+        if checkpoint is None or checkpoint.synced_at is None:
+            return checkpoint
+        earliest = _finished(db.query(func.min(Match.match_date))).filter(
+            Match.updated_at >= checkpoint.synced_at,
+            ~_after(_key(checkpoint)),
+        ).scalar()
+        if earliest is None:
+            return checkpoint
+        dropped = db.query(EloCheckpoint).filter(EloCheckpoint.last_match_date >= earliest).delete()
+        db.commit()
+        logger.info(f"[EloRatingStore] Matches changed on/after {earliest}; dropped {dropped} checkpoints")
+        return self._latest_checkpoint(db)
+
+    def update(self, db: Session) -> EloEngine:
+        """
+        Bring the ratings up to date with the matches table.
+
+        Returns:
+            EloEngine holding the current ratings
+        """
+        synced_at = datetime.now(timezone.utc)
+        checkpoint = self._rewind_for_late_changes(db, self._latest_checkpoint(db))
+        engine = EloEngine(json.loads(checkpoint.ratings) if checkpoint else None)
+        processed = checkpoint.matches_processed if checkpoint else 0
+
+        saved = 0
+        for row in _stream(db, _key(checkpoint)):
+            engine.update(row.home_team, row.away_team, row.home_score, row.away_score)
+            processed += 1
+            if processed % self.checkpoint_every == 0:
+                db.add(EloCheckpoint(
+                    matches_processed=processed,
+                    last_match_date=row.match_date,
+                    last_match_id=row.id,
+                    ratings=json.dumps(engine.ratings),
+                    synced_at=synced_at,
+                ))
+                saved += 1
+        if saved:
+            db.commit()
+            logger.info(f"[EloRatingStore] Saved {saved} checkpoints ({processed} matches processed)")
+        return engine
+
+    def ratings_as_of(self, db: Session, when: datetime) -> Dict[str, float]:
+        """Ratings after every finished match played on or before ``when``."""
+        self._rewind_for_late_changes(db, self._latest_checkpoint(db))
+        checkpoint = self._latest_checkpoint(db, until=when)
+        engine = EloEngine(json.loads(checkpoint.ratings) if checkpoint else None)
+        for row in _stream(db, _key(checkpoint), until=when):
+            engine.update(row.home_team, row.away_team, row.home_score, row.away_score)
+        return engine.ratings
+
+
+# Global Elo rating store
+elo_store = EloRatingStore()
@@ -0,0 +1,228 @@
+"""Versioned store of per-match model input vectors."""
+import json
+import logging
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.feature import MatchFeatures
+from app.models.match import Match
+from app.models.team import Team
+from app.services.team_names import name_key, team_name_resolver
+
+logger = logging.getLogger(__name__)
+
+# Layout written and read by default; bump it (and add a builder below)
+# when the model is retrained on different features
+FEATURE_VERSION = 1
+FETCH_SIZE = 2000
+
+FEATURE_NAMES: Dict[int, Tuple[str, ...]] = {
+    1: (
+        "odds_home", "odds_draw", "odds_away",
+        "home_points", "away_points",
+        "home_gd", "away_gd",
+        "home_home_win_rate", "away_away_win_rate",
+    ),
+}
+
+
+def _number(value) -> float:
+    return float(value) if value is not None else 0.0
+
+
+def _features_v1(match, home: Optional[Team], away: Optional[Team]) -> List[float]:
+    return [
+        _number(getattr(match, "odds_home", None)),
+        _number(getattr(match, "odds_draw", None)),
+        _number(getattr(match, "odds_away", None)),
+        _number(home.current_points) if home is not None else 0.0,
+        _number(away.current_points) if away is not None else 0.0,
+        _number(home.current_gd) if home is not None else 0.0,
+        _number(away.current_gd) if away is not None else 0.0,
+        _number(home.home_win_rate) if home is not None else 0.0,
+        _number(away.away_win_rate) if away is not None else 0.0,
+    ]
+
+
+FEATURE_BUILDERS: Dict[int, Callable[..., List[float]]] = {1: _features_v1}
+
+
+def match_feature_vector(match, home: Optional[Team] = None, away: Optional[Team] = None,
+                         version: int = FEATURE_VERSION) -> List[float]:
+    """Feature vector of one match given its teams (None: team fields are 0)."""
+    return FEATURE_BUILDERS[version](match, home, away)
+
+
+class TeamIndex:
+    """Teams table resolved by id or by (any spelling of) the name stored on the match."""
+
+    def __init__(self, teams: Sequence[Team]):
+        self.by_id = {team.id: team for team in teams}
+        self.by_name = {team.name: team for team in teams if team.name}
+        self._names = team_name_resolver.matcher(self.by_name)
+
+    @classmethod
+    def load(cls, db: Session) -> "TeamIndex":
+        return cls(db.query(Team).all())
+
+    def team(self, team_id: Optional[int], name: Optional[str]) -> Optional[Team]:
+        team = self.by_id.get(team_id) if team_id is not None else None
+        if team is None and name:
+            # match.home_team / away_team are plain team names
+            resolved = self._names.resolve(name)
+            team = self.by_name.get(resolved) if resolved else None
+        return team
+
+    def row(self, match, version: int = FEATURE_VERSION) -> Dict:
+        """match_features column values of ``match``."""
+        home = self.team(match.home_team_id, match.home_team)
+        away = self.team(match.away_team_id, match.away_team)
+        return {
+            "match_id": match.id,
+            "feature_version": version,
+            "vector": json.dumps(match_feature_vector(match, home, away, version)),
+            "home_team_id": home.id if home is not None else None,
+            "away_team_id": away.id if away is not None else None,
+            "home_team_key": name_key(match.home_team) if home is None and match.home_team else None,
+            "away_team_key": name_key(match.away_team) if away is None and match.away_team else None,
+            "match_updated_at": match.updated_at,
+        }
+
+
+class FeatureStore:
+    """
+    Feature vectors in the match_features table, keyed by (match_id, feature_version).
+
+    ``vectors()`` is what inference reads: one query for the stored rows,
+    and the missing or stale ones (the match's ``updated_at`` moved on)
+    computed together with a single teams query and written back in the
+    caller's transaction. ``refresh()`` fills or rebuilds the table in
+    bulk; run it (scripts/build_feature_store.py) after writes that bypass
+    the ORM. Each row records the teams it was computed from, and team
+    writes through the ORM drop those rows (see app.models.feature).
+    """
+
+    def __init__(self, version: int = FEATURE_VERSION):
+        if version not in FEATURE_BUILDERS:
+            raise ValueError(f"Unknown feature version: {version}")
+        self.version = version
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        return FEATURE_NAMES[self.version]
+
+    def vectors(self, db: Session, matches: Sequence[Match]) -> np.ndarray:
+        """
+        Feature matrix of ``matches``, shape (len(matches), n_features), in order.
+
+        New vectors are written in the caller's transaction but not
+        committed; the caller's commit stores them.
+        """
+        if not matches:
+            return np.zeros((0, len(self.names)))
+        ids = list({match.id for match in matches})
+        stored = {
+            row.match_id: row
+            for row in db.query(MatchFeatures).filter(
+                MatchFeatures.feature_version == self.version,
+                MatchFeatures.match_id.in_(ids),
+            )
+        }
+
+        vectors: Dict[int, List[float]] = {}
+        pending = []
+        for match in matches:
+            row = stored.get(match.id)
+            if row is not None and row.match_updated_at == match.updated_at:
+                vectors[match.id] = json.loads(row.vector)
+            elif match.id not in vectors:
+                pending.append(match)
+                vectors[match.id] = None
+
+        if pending:
+            teams = TeamIndex.load(db)
+            created = []
+            for match in pending:
+                values = teams.row(match, self.version)
+                vectors[match.id] = json.loads(values["vector"])
+                row = stored.get(match.id)
+                if row is None:
+                    created.append(values)
+                else:
+                    for name, value in values.items():
+                        setattr(row, name, value)
+            self._insert_new(db, created)
+
+        return np.asarray([vectors[match.id] for match in matches], dtype=float)
+
+    @staticmethod
+    def _insert_new(db: Session, rows: List[Dict]):
+        """
+        Insert new rows, skipping any a concurrent request stored first.
+
+        A conflict only skips its own row, so the rest of the batch is
+        still stored.
+        """
+        if not rows:
+            return
+        table = MatchFeatures.__table__
+        dialect = db.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+            statement = insert(table).on_conflict_do_nothing(index_elements=["match_id", "feature_version"])
+            db.execute(statement, rows)
+            return
+        for row in rows:
+            try:
+                with db.begin_nested():
+                    db.execute(table.insert(), [row])
+            except IntegrityError:
+                logger.info(f"[FeatureStore] Vector of match {row['match_id']} already stored by another session")
+
+    def refresh(self, db: Session, match_ids: Optional[Sequence[int]] = None) -> int:
+        """
+        Recompute and store the vectors of ``match_ids`` (default: every match) in bulk.
+
+        Returns:
+            Number of vectors written
+        """
+        table = MatchFeatures.__table__
+        teams = TeamIndex.load(db)
+        query = db.query(Match)
+        stale = table.delete().where(table.c.feature_version == self.version)
+        if match_ids is not None:
+            query = query.filter(Match.id.in_(match_ids))
+            stale = stale.where(table.c.match_id.in_(match_ids))
+
+        rows = [teams.row(match, self.version) for match in query.order_by(Match.id).yield_per(FETCH_SIZE)]
+        db.execute(stale)
+        for start in range(0, len(rows), FETCH_SIZE):
+            db.execute(table.insert(), rows[start:start + FETCH_SIZE])
+        db.commit()
+        return len(rows)
+
+    def training_set(self, db: Session) -> Tuple[List[int], np.ndarray, np.ndarray]:
+        """
+        (match ids, feature matrix, H/D/A labels) of every finished match, oldest first.
+
+        Reads the stored vectors; any that are missing are computed and
+        committed first.
+        """
+        matches = (
+            db.query(Match)
+            .filter(Match.home_score.isnot(None), Match.away_score.isnot(None))
+            .order_by(Match.match_date, Match.id)
+            .all()
+        )
+        X = self.vectors(db, matches)
+        db.commit()
+        return [match.id for match in matches], X, np.asarray([match.result for match in matches])
+
+
+# Global feature store for the current feature version
+feature_store = FeatureStore()
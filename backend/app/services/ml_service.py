@@ -5,18 +5,42 @@ import numpy as np
 import pandas as pd
 import logging
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.services.compiled_model import COMPILED_SUFFIX, CompiledModel
+from app.services.feature_store import match_feature_vector
 
 logger = logging.getLogger(__name__)
 
+# Version reported when predictions come from the odds instead of a model
+FALLBACK_VERSION = "odds-fallback"
+# [P(H), P(D), P(A)] used when a match has no usable odds
+UNIFORM_PROBS = np.array([0.33, 0.34, 0.33])
+# Odds columns accepted by predict_from_dataframe, in order of preference
+ODDS_COLUMNS = (
+    ("odds_home", "home_odds", "home_price"),
+    ("odds_draw", "draw_odds"),
+    ("odds_away", "away_odds"),
+)
+
 
 class MLService:
     """ML service for predicting match outcomes."""
 
-    def __init__(self, model_path: Optional[str] = None):
-        """Initialize ML service and load model if available."""
+    def __init__(self, model_path: Optional[str] = None, model=None, version: Optional[str] = None):
+        """
+        Initialize ML service and load model if available.
+
+        Args:
+            model_path: Model file to load when ``model`` is not given
+            model: Already loaded model (used by the model registry)
+            version: Version reported with every prediction
+        """
         self.model_path = model_path or "models/ensemble_model.pkl"
-        self.model = self._load_model(self.model_path)
+        self.model = model if model is not None else self._load_model(self.model_path)
+        self.version = version or (
+            type(self.model).__name__ if self.model is not None else FALLBACK_VERSION
+        )
 
     def _load_model(self, model_path: str):
         """
@@ -28,6 +52,8 @@ class MLService:
         model_path = Path(model_path)
         if model_path.exists():
             try:
+                if model_path.suffix == COMPILED_SUFFIX:
+                    return CompiledModel.load(str(model_path))
                 return joblib.load(model_path)
             except Exception as e:
                 logger.exception(f"[MLService] Error loading model: {e}")
@@ -48,69 +74,84 @@ class MLService:
                 - ai_score: AI confidence score (0-10)
                 - betting_advice: Human-readable betting recommendation
                 - value_rating: Value bet rating (0-10)
+                - model_version: Version of the model that produced the probabilities
+        """
+        return self.predict_matches([match])[0]
+
+    def predict_matches(self, matches: Sequence, features=None) -> List[Dict]:
+        """
+        Predict many matches with a single ``predict_proba`` call.
+
+        Args:
+            matches: Match objects
+            features: Their feature vectors, one row per match (normally
+                from the feature store); built from the matches when omitted
+
+        Returns:
+            One ``predict_match`` result per match, in order
         """
-        # Extract features from match
-        features = self._extract_features(match)
+        if not matches:
+            return []
+
+        # One feature matrix for every match
+        if features is None:
+            features = [self._extract_features(match) for match in matches]
+        features = np.asarray(features, dtype=float)
 
         # Get probabilities
+        probs = None
+        version = self.version
         if self.model is not None:
             try:
-                probs = self.model.predict_proba([features])[0]
+                probs = np.asarray(self.model.predict_proba(features), dtype=float)
             except Exception as e:
                 logger.error(f"[MLService] Model predict_proba failed: {e} - falling back to odds")
-                probs = self._odds_to_probs(
-                    match.odds_home,
-                    match.odds_draw,
-                    match.odds_away
-                )
-        else:
-            probs = self._odds_to_probs(
-                match.odds_home,
-                match.odds_draw,
-                match.odds_away
+        if probs is None:
+            probs = np.vstack([
+                self._odds_to_probs(match.odds_home, match.odds_draw, match.odds_away)
+                for match in matches
+            ])
+            version = FALLBACK_VERSION
+
+        results = []
+        for match, row_features, row_probs in zip(matches, features, probs):
+            # Determine prediction
+            prediction = ["H", "D", "A"][int(np.argmax(row_probs))]
+            confidence = float(max(row_probs))
+
+            # Calculate AI score (0-10)
+            ai_score = self._calculate_ai_score(confidence, row_features)
+
+            # Generate betting advice
+            betting_advice, value_rating = self._generate_betting_advice(
+                prediction, row_probs, match
             )
 
-        # Determine prediction
-        prediction = ["H", "D", "A"][int(np.argmax(probs))]
-        confidence = float(max(probs))
-
-        # Calculate AI score (0-10)
-        ai_score = self._calculate_ai_score(confidence, features)
-
-        # Generate betting advice
-        betting_advice, value_rating = self._generate_betting_advice(
-            prediction, probs, match
-        )
-
-        return {
-            "prediction": prediction,
-            "probabilities": {"H": float(probs[0]), "D": float(probs[1]), "A": float(probs[2])},
-            "ai_score": ai_score,
-            "betting_advice": betting_advice,
-            "value_rating": value_rating,
-        }
+            results.append({
+                "prediction": prediction,
+                "probabilities": {"H": float(row_probs[0]), "D": float(row_probs[1]), "A": float(row_probs[2])},
+                "ai_score": ai_score,
+                "betting_advice": betting_advice,
+                "value_rating": value_rating,
+                "model_version": version,
+            })
+        return results
 
     def _extract_features(self, match) -> List[float]:
         """
         Extract features from match for ML model.
 
+        The match alone has no team statistics (``home_team`` is just a
+        name), so the team fields are 0; use the feature store's vectors
+        for real predictions.
+
         Args:
             match: Match object
 
         Returns:
             List of feature values
         """
-        return [
-            match.odds_home if hasattr(match, "odds_home") else 0.0,
-            match.odds_draw if hasattr(match, "odds_draw") else 0.0,
-            match.odds_away if hasattr(match, "odds_away") else 0.0,
-            match.home_team.current_points if getattr(match, "home_team", None) else 0,
-            match.away_team.current_points if getattr(match, "away_team", None) else 0,
-            match.home_team.current_gd if getattr(match, "home_team", None) else 0,
-            match.away_team.current_gd if getattr(match, "away_team", None) else 0,
-            match.home_team.home_win_rate if getattr(match, "home_team", None) else 0.0,
-            match.away_team.away_win_rate if getattr(match, "away_team", None) else 0.0,
-        ]
+        return match_feature_vector(match)
 
     def _odds_to_probs(self, odds_h: float, odds_d: float, odds_a: float) -> np.ndarray:
         """
@@ -135,7 +176,7 @@ class MLService:
         total = prob_h + prob_d + prob_a
         if total <= 0:
             # fallback to uniform distribution
-            return np.array([0.33, 0.34, 0.33])
+            return UNIFORM_PROBS.copy()
         # Normalize to sum to 1
         return np.array([prob_h / total, prob_d / total, prob_a / total])
 
@@ -260,34 +301,58 @@ class MLService:
         else:
             probs = None
 
-        # If probs not produced by model, fallback to odds->probs per-row
+        if probs is not None:
+            probs = np.asarray(probs, dtype=float)
+            if probs.shape != (out_df.shape[0], 3):
+                logger.error(f"[MLService] model.predict_proba returned shape {probs.shape} - falling back to odds")
+                probs = None
+
+        # If probs not produced by model, fallback to odds->probs for all rows at once
+        from_model = probs is not None
         if probs is None:
-            probs_list = []
-            for _, row in features_df.iterrows():
-                odds_h = row.get("odds_home") or row.get("home_odds") or row.get("home_price") or None
-                odds_d = row.get("odds_draw") or row.get("draw_odds") or None
-                odds_a = row.get("odds_away") or row.get("away_odds") or None
-                p = self._odds_to_probs(odds_h or 0.0, odds_d or 0.0, odds_a or 0.0)
-                probs_list.append(p)
-            probs = np.vstack(probs_list) if len(probs_list) > 0 else np.array([])
-
-        # Ensure shape match
-        if probs.shape[0] != out_df.shape[0]:
-            # if mismatch, truncate or pad
-            n_rows = out_df.shape[0]
-            if probs.shape[0] > n_rows:
-                probs = probs[:n_rows, :]
-            else:
-                # pad with uniform probabilities
-                pad = np.tile(np.array([0.33, 0.34, 0.33]), (n_rows - probs.shape[0], 1))
-                probs = np.vstack([probs, pad])
+            probs = self._odds_frame_to_probs(features_df)
 
         out_df["predicted_home_win_prob"] = probs[:, 0].astype(float)
         out_df["predicted_draw_prob"] = probs[:, 1].astype(float)
         out_df["predicted_away_win_prob"] = probs[:, 2].astype(float)
-        out_df["model_version"] = model_name or (getattr(self.model, "__class__", None).__name__ if self.model is not None else "odds-fallback")
+        out_df["model_version"] = model_name or (self.version if from_model else FALLBACK_VERSION)
         out_df["pred_timestamp"] = pd.Timestamp.now()
 
         # Reorder columns
         cols = ["match_id", "predicted_home_win_prob", "predicted_draw_prob", "predicted_away_win_prob", "model_version", "pred_timestamp"]
-        return out_df[cols]
\ No newline at end of file
+        return out_df[cols]
+
+    @staticmethod
+    def _odds_frame_to_probs(features_df: pd.DataFrame) -> np.ndarray:
+        """
+        Column-wise ``_odds_to_probs`` for a whole DataFrame.
+
+        For each outcome the first usable value among its ``ODDS_COLUMNS``
+        is taken (missing, non-numeric and non-positive odds are skipped);
+        rows without any usable odds get ``UNIFORM_PROBS``.
+
+        Returns:
+            Array of shape (len(features_df), 3) with [P(H), P(D), P(A)] per row
+        """
+        n_rows = len(features_df)
+        inverse = np.zeros((n_rows, 3))
+        for outcome, names in enumerate(ODDS_COLUMNS):
+            columns = [name for name in names if name in features_df.columns]
+            if not columns:
+                continue
+            odds = np.column_stack([
+                pd.to_numeric(features_df[name], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+                for name in columns
+            ])
+            with np.errstate(invalid="ignore"):
+                usable = np.isfinite(odds) & (odds > 0)
+            first = usable.argmax(axis=1)
+            rows = np.arange(n_rows)
+            found = usable[rows, first]
+            inverse[found, outcome] = 1.0 / odds[rows[found], first[found]]
+
+        total = inverse.sum(axis=1, keepdims=True)
+        valid = total[:, 0] > 0
+        probs = np.tile(UNIFORM_PROBS, (n_rows, 1))
+        probs[valid] = inverse[valid] / total[valid]
+        return probs
@@ -0,0 +1,178 @@
+"""Process-wide registry of loaded prediction models."""
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+import joblib
+
+from app.services.compiled_model import COMPILED_SUFFIX, CompiledModel
+from app.services.ml_service import FALLBACK_VERSION, MLService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_FILE = "models/ensemble_model.pkl"
+# Written by scripts/export_model.py; served without importing scikit-learn
+COMPILED_MODEL_FILE = "models/ensemble_model.npz"
+# Loaded versions kept in memory, so switching back to a recent one is free
+KEEP_VERSIONS = 3
+
+Stat = Optional[Tuple[int, int, str]]
+
+
+class ModelRegistry:
+    """
+    Load each model version once and share one MLService across requests.
+
+    ``get()`` returns the active service. Like the snapshot stores it
+    stats the model file and, when the file changed, loads the new version
+    off to the side and swaps the reference in a single assignment; a
+    request either uses the old model or the new one for its whole
+    prediction. ``activate(path)`` switches to another model file the
+    same way. A file that cannot be loaded keeps the previous version
+    serving.
+
+    Files ending in ``.npz`` are compiled models (see compiled_model);
+    anything else is unpickled. By default both the compiled model and the
+    pickle it is exported from are watched and the newer one is served, so
+    a retrained pickle is not shadowed by a stale export.
+
+    The shared services are read-only: callers must not modify ``model``.
+    """
+
+    def __init__(self, path: Optional[str] = None, keep: int = KEEP_VERSIONS):
+        """Initialize the registry; nothing is loaded until ``warm()`` or the first ``get()``."""
+        # Candidate files, compiled first: it wins when both are as new
+        self.paths = (path,) if path is not None else (COMPILED_MODEL_FILE, DEFAULT_MODEL_FILE)
+        self.path = self.paths[-1]
+        self.keep = keep
+        self._active: Optional[Tuple[Stat, MLService]] = None
+        # Stats of a pickle found newer than its compiled export, already warned about
+        self._stale_export: Optional[Tuple[Stat, Stat]] = None
+        self._loaded: "OrderedDict[str, MLService]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _stat(path: str) -> Stat:
+        """(mtime_ns, size, absolute path) of a model file, or None if it does not exist."""
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size, path
+
+    def _select(self) -> Tuple[str, Stat]:
+        """The model file to serve and its stat: the newest candidate that exists."""
+        found = [(path, self._stat(path)) for path in self.paths]
+        existing = [f for f in found if f[1] is not None]
+        if not existing:
+            return found[-1]
+        path, stat = max(existing, key=lambda f: f[1][0])
+        compiled = found[0]
+        if len(self.paths) > 1 and path != compiled[0] and compiled[1] is not None:
+            stale = (compiled[1], stat)
+            if stale != self._stale_export:
+                self._stale_export = stale
+                logger.warning(
+                    f"[ModelRegistry] {path} is newer than {compiled[0]}; serving the pickle. "
+                    f"Run scripts/export_model.py to serve the compiled model again"
+                )
+        return path, stat
+
+    @staticmethod
+    def version_for(path: str, stat: Stat) -> str:
+        """Version label of a model file: its name plus mtime and size."""
+        if stat is None:
+            return FALLBACK_VERSION
+        mtime_ns, size, _ = stat
+        return f"{Path(path).stem}-{mtime_ns:x}-{size:x}"
+
+    def _load(self, path: str, stat: Stat) -> MLService:
+        """MLService for one model file version (must hold the lock)."""
+        version = self.version_for(path, stat)
+        service = self._loaded.get(version)
+        if service is not None:
+            self._loaded.move_to_end(version)
+            return service
+        if stat is None:
+            service = MLService(model_path=path, version=version)
+        else:
+            if stat[2].endswith(COMPILED_SUFFIX):
+                model = CompiledModel.load(stat[2])
+            else:
+                model = joblib.load(stat[2])
+            service = MLService(model_path=path, model=model, version=version)
+            logger.info(f"[ModelRegistry] Loaded {path} (version {version})")
+        self._loaded[version] = service
+        while len(self._loaded) > self.keep:
+            self._loaded.popitem(last=False)
+        return service
+
+    def _refresh(self, path: str, stat: Stat) -> MLService:
+        """Load ``path`` if it is not the active version and make it active (must hold the lock)."""
+        active = self._active
+        if active is not None and active[0] == stat:
+            return active[1]
+        try:
+            service = self._load(path, stat)
+        except Exception as e:
+            # The file may still be in the middle of being written
+            if active is None:
+                logger.exception(f"[ModelRegistry] Cannot load {path}, using odds fallback: {e}")
+                service = MLService(model_path=path, version=FALLBACK_VERSION)
+            else:
+                logger.warning(f"[ModelRegistry] Loading {path} failed, keeping version {active[1].version}: {e}")
+                service = active[1]
+        # Not retried until the file changes again
+        self.path = path
+        self._active = (stat, service)
+        return service
+
+    def get(self) -> MLService:
+        """
+        Return the active MLService, loading a changed model file first.
+
+        A load can take seconds; async handlers call this through
+        ``run_in_threadpool`` so it does not block the event loop.
+        """
+        active = self._active
+        if active is not None and active[0] == self._select()[1]:
+            return active[1]
+        with self._lock:
+            return self._refresh(*self._select())
+
+    def activate(self, path: str) -> MLService:
+        """
+        Switch to another model file without a restart.
+
+        Raises:
+            FileNotFoundError: If ``path`` does not exist
+            Exception: If the model cannot be loaded; the current version keeps serving
+        """
+        with self._lock:
+            stat = self._stat(path)
+            if stat is None:
+                raise FileNotFoundError(path)
+            service = self._load(path, stat)
+            self.paths = (path,)
+            self.path = path
+            self._active = (stat, service)
+        logger.info(f"[ModelRegistry] Active model is now {service.version}")
+        return service
+
+    def warm(self) -> MLService:
+        """Load the active model ahead of the first request."""
+        return self.get()
+
+    @property
+    def version(self) -> Optional[str]:
+        """Version of the active model, or None before the first load."""
+        active = self._active
+        return active[1].version if active is not None else None
+
+
+# Global model registry shared by every request
+model_registry = ModelRegistry()
@@ -0,0 +1,121 @@
+"""Running prediction statistics behind /api/history/stats."""
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.models.match import Match
+from app.models.prediction import Prediction, PredictionResult, PredictionStatTotal
+
+RESULT_KEYS = {
+    "home_win": "home_wins", "H": "home_wins",
+    "draw": "draws", "D": "draws",
+    "away_win": "away_wins", "A": "away_wins",
+}
+
+
+class PredictionStats:
+    """Result distribution, confidence, league counts and accuracy as running totals."""
+
+    def __init__(self):
+        self.total = 0
+        self.results = {"home_wins": 0, "draws": 0, "away_wins": 0}
+        self.confidence_sum = 0.0
+        self.leagues: Dict[str, int] = {}
+        self.settled = 0
+        self.correct = 0
+
+    def add(self, league: Optional[str], result: Optional[str], confidence: Optional[float], count: int = 1):
+        """Account for ``count`` predictions (negative to remove them)."""
+        self.total += count
+        key = RESULT_KEYS.get(result)
+        if key:
+            self.results[key] += count
+        if confidence is not None:
+            self.confidence_sum += confidence * count
+        self.leagues[league] = self.leagues.get(league, 0) + count
+
+    def settle(self, is_correct: bool, count: int = 1):
+        """Account for ``count`` predictions whose actual result is now known."""
+        self.settled += count
+        if is_correct:
+            self.correct += count
+
+    def accuracy_rate(self) -> Optional[float]:
+        """Realized accuracy in percent, or None before any prediction is settled."""
+        if self.settled <= 0:
+            return None
+        return round(100.0 * self.correct / self.settled, 2)
+
+    def as_response(self) -> Dict:
+        avg_confidence = self.confidence_sum / self.total if self.total > 0 else 0
+        return {
+            "total_predictions": self.total,
+            "result_distribution": dict(self.results),
+            "average_confidence": round(avg_confidence, 2),
+            "league_distribution": {k: v for k, v in self.leagues.items() if v},
+            "accuracy_rate": self.accuracy_rate(),
+        }
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[Optional[str], Optional[str], Optional[float]]]) -> "PredictionStats":
+        """Build totals from (league, predicted result, confidence) rows in one pass."""
+        stats = cls()
+        for league, result, confidence in rows:
+            stats.add(league, result, confidence)
+        return stats
+
+    @classmethod
+    def from_db_totals(cls, db: Session) -> "PredictionStats":
+        """Read the per-league running totals kept in the prediction_stats table."""
+        stats = cls()
+        for row in db.query(PredictionStatTotal).order_by(PredictionStatTotal.id).all():
+            stats.total += row.total
+            stats.results["home_wins"] += row.home_wins
+            stats.results["draws"] += row.draws
+            stats.results["away_wins"] += row.away_wins
+            stats.confidence_sum += row.confidence_sum
+            stats.leagues[row.league] = row.total
+            stats.settled += row.settled
+            stats.correct += row.correct
+        return stats
+
+
+def rebuild_db_totals(db: Session):
+    """
+    Recompute the prediction_stats table from scratch with grouped SQL.
+
+    Only needed after writes that bypass the ORM (bulk updates, manual SQL);
+    ORM inserts/updates/deletes of Prediction keep the totals current.
+    """
+    league = func.coalesce(Match.league, "")
+    # Multi-argument max() is SQLite's spelling of greatest()
+    greatest = func.max if db.get_bind().dialect.name == "sqlite" else func.greatest
+    confidence = greatest(Prediction.confidence_home, Prediction.confidence_draw, Prediction.confidence_away)
+
+    def count_if(condition):
+        return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+    rows = (
+        db.query(
+            league.label("league"),
+            func.count(Prediction.id),
+            count_if(Prediction.predicted_result == PredictionResult.HOME_WIN),
+            count_if(Prediction.predicted_result == PredictionResult.DRAW),
+            count_if(Prediction.predicted_result == PredictionResult.AWAY_WIN),
+            func.coalesce(func.sum(confidence), 0.0) * 100,
+            count_if(Prediction.is_correct.isnot(None)),
+            count_if(Prediction.is_correct.is_(True)),
+        )
+        .outerjoin(Match, Match.id == Prediction.match_id)
+        .group_by(league)
+        .all()
+    )
+
+    db.query(PredictionStatTotal).delete()
+    for name, total, home_wins, draws, away_wins, confidence_sum, settled, correct in rows:
+        db.add(PredictionStatTotal(
+            league=name, total=total, home_wins=home_wins, draws=draws, away_wins=away_wins,
+            confidence_sum=confidence_sum, settled=settled, correct=correct,
+        ))
+    db.commit()
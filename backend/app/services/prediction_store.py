@@ -0,0 +1,315 @@
+"""Process-wide snapshot store for data/final_predictions.json (or its .bin form)."""
+import json
+import logging
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from app.services.prediction_stats import PredictionStats
+from app.services.snapshot_format import MappedPredictions
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREDICTIONS_FILE = "data/final_predictions.json"
+
+
+def _index_rows(predictions) -> Iterable[Tuple]:
+    """(league, home_team, away_team, date) for every prediction, in order."""
+    if isinstance(predictions, MappedPredictions):
+        return predictions.index_rows()
+    return ((p.get("league"), p.get("home_team"), p.get("away_team"), p.get("date")) for p in predictions)
+
+
+def _stats_rows(predictions) -> Iterable[Tuple]:
+    """(league, predicted result, confidence) for every prediction, in order."""
+    if isinstance(predictions, MappedPredictions):
+        yield from predictions.stats_rows()
+        return
+    for p in predictions:
+        pred = p.get("prediction") or {}
+        yield p.get("league"), pred.get("prediction"), pred.get("confidence")
+
+
+class PredictionIndex:
+    """
+    Secondary indexes over a list of predictions.
+
+    Positions refer to the original list, so filtered results can be
+    returned in file order.
+    """
+
+    def __init__(self, predictions: Sequence[Dict]):
+        by_league = defaultdict(set)
+        by_team = defaultdict(set)
+        dated = []
+        for pos, (league, home, away, date) in enumerate(_index_rows(predictions)):
+            if league:
+                by_league[league.lower()].add(pos)
+            for team in (home, away):
+                if team:
+                    by_team[team.lower()].add(pos)
+            if date:
+                dated.append((date, pos))
+        dated.sort()
+
+        self.by_league: Dict[str, FrozenSet[int]] = {k: frozenset(v) for k, v in by_league.items()}
+        self.by_team: Dict[str, FrozenSet[int]] = {k: frozenset(v) for k, v in by_team.items()}
+        self.dates: List[str] = [d for d, _ in dated]
+        self.date_positions: List[int] = [pos for _, pos in dated]
+
+    def league(self, league: str) -> FrozenSet[int]:
+        """Positions whose league matches case-insensitively."""
+        return self.by_league.get(league.lower(), frozenset())
+
+    def team(self, team: str) -> FrozenSet[int]:
+        """Positions where the home or away team contains ``team`` (case-insensitive)."""
+        needle = team.lower()
+        # Scan distinct team names rather than every record
+        return frozenset().union(*(positions for name, positions in self.by_team.items() if needle in name))
+
+    def date_range(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> FrozenSet[int]:
+        """Positions with ``date_from <= date <= date_to`` (ISO date strings, inclusive)."""
+        lo = bisect_left(self.dates, date_from) if date_from else 0
+        hi = bisect_right(self.dates, date_to) if date_to else len(self.dates)
+        return frozenset(self.date_positions[lo:hi])
+
+
+def render_json(payload) -> bytes:
+    """Encode a response body the same way FastAPI's JSONResponse does."""
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class PredictionFacets:
+    """
+    League and team listings materialized once per snapshot.
+
+    Bodies are stored already encoded so the listing endpoints only have to
+    pick one and send it.
+    """
+
+    def __init__(self, predictions: Sequence[Dict]):
+        all_teams = set()
+        league_teams = defaultdict(set)
+        for league, home, away, _ in _index_rows(predictions):
+            teams = league_teams[league]
+            for team in (home, away):
+                if team:
+                    teams.add(team)
+                    all_teams.add(team)
+
+        leagues = sorted(league for league in league_teams if league)
+        self.leagues = {"leagues": leagues, "count": len(leagues)}
+        self.teams = {"teams": sorted(all_teams), "count": len(all_teams)}
+        self.teams_by_league = {
+            league: {"teams": sorted(teams), "count": len(teams)}
+            for league, teams in league_teams.items()
+        }
+        self._empty_teams = {"teams": [], "count": 0}
+
+        self.leagues_body = render_json(self.leagues)
+        self.teams_body = render_json(self.teams)
+        self.teams_by_league_body = {league: render_json(v) for league, v in self.teams_by_league.items()}
+        self._empty_teams_body = render_json(self._empty_teams)
+
+    def teams_body_for(self, league: Optional[str] = None) -> bytes:
+        """Encoded team listing, optionally restricted to one league (exact name)."""
+        if not league:
+            return self.teams_body
+        return self.teams_by_league_body.get(league, self._empty_teams_body)
+
+
+class PredictionSnapshot:
+    """
+    Immutable view of one version of the predictions file.
+
+    ``predictions`` is a list parsed from JSON, or a ``MappedPredictions``
+    sequence that decodes records from the binary snapshot on access.
+    """
+
+    def __init__(
+        self, predictions: Sequence[Dict], version: str, mtime_ns: int, size: int, source: Optional[str] = None
+    ):
+        self.predictions = predictions
+        self.version = version
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.source = source
+        self.index = PredictionIndex(predictions)
+        self.facets = PredictionFacets(predictions)
+        self.stats = PredictionStats.from_rows(_stats_rows(predictions))
+        # Encoded response bodies filled lazily by the HTTP layer, keyed by view
+        self.encoded_views: Dict = {}
+
+    def __len__(self):
+        return len(self.predictions)
+
+    def query_positions(
+        self,
+        league: Optional[str] = None,
+        team: Optional[str] = None,
+        date: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> Sequence[int]:
+        """
+        Filter predictions using the secondary indexes.
+
+        Args:
+            league: League name (case-insensitive exact match)
+            team: Substring of the home or away team name (case-insensitive)
+            date: Exact match date (YYYY-MM-DD)
+            date_from: Earliest match date, inclusive (YYYY-MM-DD)
+            date_to: Latest match date, inclusive (YYYY-MM-DD)
+
+        Returns:
+            Ascending positions of the matching predictions
+        """
+        candidates = []
+        if league:
+            candidates.append(self.index.league(league))
+        if team:
+            candidates.append(self.index.team(team))
+        if date:
+            candidates.append(self.index.date_range(date, date))
+        if date_from or date_to:
+            candidates.append(self.index.date_range(date_from, date_to))
+
+        if not candidates:
+            return range(len(self.predictions))
+
+        candidates.sort(key=len)
+        return sorted(candidates[0].intersection(*candidates[1:]))
+
+    def query(self, **filters) -> List[Dict]:
+        """Matching predictions in file order; see ``query_positions`` for filters."""
+        positions = self.query_positions(**filters)
+        if isinstance(positions, range) and isinstance(self.predictions, list):
+            return self.predictions
+        return [self.predictions[pos] for pos in positions]
+
+    def page(
+        self, positions: Sequence[int], after: Optional[int] = None, limit: Optional[int] = None
+    ) -> Tuple[List[Dict], Optional[int]]:
+        """
+        Slice one page out of ``query_positions`` results.
+
+        Args:
+            positions: Ascending positions from ``query_positions``
+            after: Resume after this position (exclusive)
+            limit: Maximum records to return; None returns the rest
+
+        Returns:
+            Tuple of (records, last position returned if more records follow)
+        """
+        start = bisect_right(positions, after) if after is not None else 0
+        end = len(positions) if limit is None else min(start + limit, len(positions))
+        records = [self.predictions[pos] for pos in positions[start:end]]
+        next_after = positions[end - 1] if end < len(positions) and end > start else None
+        return records, next_after
+
+
+class PredictionSnapshotStore:
+    """
+    Load the predictions file once and reload it only when it changes.
+
+    Readers call ``get()`` and receive a fully built ``PredictionSnapshot``.
+    A reload builds the new snapshot off to the side and then replaces the
+    reference in a single assignment, so concurrent readers either see the
+    old snapshot or the new one, never a partially loaded one.
+
+    When the binary snapshot (``final_predictions.bin``) exists and is at
+    least as new as the JSON export, it is memory-mapped instead of parsing
+    the JSON.
+    """
+
+    def __init__(self, path: str = DEFAULT_PREDICTIONS_FILE, binary_path: Optional[str] = None):
+        """Initialize the store; nothing is read until the first ``get()``."""
+        self.path = path
+        self.binary_path = binary_path or os.path.splitext(path)[0] + ".bin"
+        self._snapshot: Optional[PredictionSnapshot] = None
+        # Stat of a file version that failed to load; not retried until the file changes
+        self._failed_stat = None
+        self._lock = threading.Lock()
+
+    def _stat(self):
+        """(mtime_ns, size, path) of the file to serve, or None if neither exists."""
+        found = []
+        for path in (self.binary_path, self.path):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            found.append((st.st_mtime_ns, st.st_size, path))
+        if not found:
+            return None
+        # Prefer the binary file unless the JSON export was written after it
+        return max(found, key=lambda f: (f[0], f[2] == self.binary_path))
+
+    def _is_current(self, snapshot: Optional[PredictionSnapshot], stat) -> bool:
+        return (
+            snapshot is not None
+            and stat is not None
+            and snapshot.mtime_ns == stat[0]
+            and snapshot.size == stat[1]
+            and snapshot.source == stat[2]
+        )
+
+    def _load(self, stat) -> PredictionSnapshot:
+        mtime_ns, size, path = stat
+        if path == self.binary_path:
+            predictions = MappedPredictions(path)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                predictions = json.load(f)
+        version = f"{mtime_ns:x}-{size:x}"
+        logger.info(f"[PredictionSnapshotStore] Loaded {len(predictions)} predictions from {path} (version {version})")
+        return PredictionSnapshot(predictions, version, mtime_ns, size, source=path)
+
+    def get(self) -> Optional[PredictionSnapshot]:
+        """
+        Return the current snapshot, reloading it if the file changed.
+
+        Returns:
+            PredictionSnapshot or None if the predictions file does not exist
+        """
+        stat = self._stat()
+        if stat is None:
+            self._snapshot = None
+            return None
+
+        snapshot = self._snapshot
+        if self._is_current(snapshot, stat) or stat == self._failed_stat:
+            return snapshot
+
+        with self._lock:
+            # Another thread may have reloaded while we waited for the lock
+            stat = self._stat()
+            if stat is None:
+                self._snapshot = None
+                return None
+            snapshot = self._snapshot
+            if self._is_current(snapshot, stat) or stat == self._failed_stat:
+                return snapshot
+            try:
+                snapshot = self._load(stat)
+            except (OSError, ValueError) as e:
+                # The writer may still be in the middle of rewriting the file;
+                # keep serving the previous snapshot until it changes again.
+                logger.warning(f"[PredictionSnapshotStore] Reload failed, keeping previous snapshot: {e}")
+                self._failed_stat = stat
+                return self._snapshot
+            self._failed_stat = None
+            self._snapshot = snapshot
+            return snapshot
+
+    def invalidate(self):
+        """Drop the cached snapshot so the next ``get()`` reloads from disk."""
+        with self._lock:
+            self._snapshot = None
+            self._failed_stat = None
+
+
+# Global prediction snapshot store
+prediction_store = PredictionSnapshotStore()
@@ -0,0 +1,357 @@
+"""
+Compact, memory-mappable storage format for prediction snapshots.
+
+Layout (little-endian)::
+
+    header      64 bytes: magic, format version, record count, string count,
+                and the byte offsets of the sections below
+    strings     (n_strings + 1) uint64 offsets, then one UTF-8 blob; every
+                repeated short string (dates, leagues, teams, forms, labels)
+                is stored once and referenced by id
+    records     n_records fixed-width rows (RECORD_DTYPE): string ids,
+                float64 numeric fields, an int mask and the offset/length
+                of the record's analysis text; format version 2 adds the
+                score markets (scripts/score_grid.py) after them
+    text        concatenated UTF-8 ai_analysis texts
+
+Readers map the file and decode a record only when it is accessed, so the
+long analysis texts are never parsed for records nobody asks for.
+data/final_predictions.json remains the export format; this file sits next
+to it as data/final_predictions.bin.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"FPSNAP01"
+# Version written for records with score markets; records without them are
+# still written (and read) as version 1
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<8sIIII4Q8x")
+NONE_ID = 0xFFFFFFFF
+
+# (field in record, path in the JSON prediction)
+STRING_FIELDS = (
+    ("date", ("date",)),
+    ("time", ("time",)),
+    ("league", ("league",)),
+    ("home_team", ("home_team",)),
+    ("away_team", ("away_team",)),
+    ("prediction", ("prediction", "prediction")),
+    ("expected_score", ("prediction", "expected_score")),
+    ("a_home_team", ("prediction", "analysis", "home_team")),
+    ("a_away_team", ("prediction", "analysis", "away_team")),
+    ("home_form", ("prediction", "analysis", "home_form")),
+    ("away_form", ("prediction", "analysis", "away_form")),
+)
+NUMERIC_FIELDS = (
+    ("confidence", ("prediction", "confidence")),
+    ("p_home_win", ("prediction", "probabilities", "home_win")),
+    ("p_draw", ("prediction", "probabilities", "draw")),
+    ("p_away_win", ("prediction", "probabilities", "away_win")),
+    ("home_form_score", ("prediction", "analysis", "home_form_score")),
+    ("away_form_score", ("prediction", "analysis", "away_form_score")),
+    ("home_win_rate", ("prediction", "analysis", "home_win_rate")),
+    ("away_win_rate", ("prediction", "analysis", "away_win_rate")),
+    ("home_avg_goals", ("prediction", "analysis", "home_avg_goals")),
+    ("away_avg_goals", ("prediction", "analysis", "away_avg_goals")),
+    ("home_total_score", ("prediction", "analysis", "home_total_score")),
+    ("away_total_score", ("prediction", "analysis", "away_total_score")),
+)
+
+# Score markets of version 2 records; all floats (no int mask)
+MARKET_STRING_FIELDS = (
+    ("most_likely_score", ("markets", "most_likely_score")),
+)
+MARKET_NUMERIC_FIELDS = (
+    ("m_home_xg", ("markets", "home_xg")),
+    ("m_away_xg", ("markets", "away_xg")),
+    ("m_most_likely_prob", ("markets", "most_likely_prob")),
+    ("m_btts", ("markets", "btts")),
+    ("m_over_1_5", ("markets", "over_1.5")),
+    ("m_over_2_5", ("markets", "over_2.5")),
+    ("m_over_3_5", ("markets", "over_3.5")),
+)
+
+RECORD_DTYPE = np.dtype(
+    [(name, "<u4") for name, _ in STRING_FIELDS]
+    + [(name, "<f8") for name, _ in NUMERIC_FIELDS]
+    + [("int_mask", "<u4"), ("text_len", "<u4"), ("text_off", "<u8")]
+)
+RECORD_DTYPES = {
+    1: RECORD_DTYPE,
+    2: np.dtype(
+        RECORD_DTYPE.descr
+        + [(name, "<u4") for name, _ in MARKET_STRING_FIELDS]
+        + [(name, "<f8") for name, _ in MARKET_NUMERIC_FIELDS]
+    ),
+}
+
+# Exact key layout of a record written by scripts/predict_real_fixtures.py
+_RECORD_KEYS = {
+    1: ("date", "time", "league", "home_team", "away_team", "prediction", "ai_analysis"),
+    2: ("date", "time", "league", "home_team", "away_team", "prediction", "markets", "ai_analysis"),
+}
+_PREDICTION_KEYS = ("prediction", "confidence", "probabilities", "expected_score", "analysis")
+_PROBABILITY_KEYS = ("home_win", "draw", "away_win")
+_ANALYSIS_KEYS = (
+    "home_team", "away_team", "home_form", "away_form", "home_form_score", "away_form_score",
+    "home_win_rate", "away_win_rate", "home_avg_goals", "away_avg_goals",
+    "home_total_score", "away_total_score",
+)
+_MARKET_KEYS = (
+    "home_xg", "away_xg", "most_likely_score", "most_likely_prob", "btts", "over_1.5", "over_2.5", "over_3.5",
+)
+
+
+def _dig(record: Dict, path: Tuple[str, ...]):
+    for key in path:
+        record = record[key]
+    return record
+
+
+def _check_shape(record: Dict, version: int):
+    """Raise ValueError unless the record has exactly the layout this format version stores."""
+    try:
+        shapes = [
+            (record, _RECORD_KEYS[version]),
+            (record["prediction"], _PREDICTION_KEYS),
+            (record["prediction"]["probabilities"], _PROBABILITY_KEYS),
+            (record["prediction"]["analysis"], _ANALYSIS_KEYS),
+        ]
+        if version >= 2:
+            shapes.append((record["markets"], _MARKET_KEYS))
+    except (KeyError, TypeError):
+        raise ValueError("unsupported prediction record layout")
+    for obj, keys in shapes:
+        if not isinstance(obj, dict) or tuple(obj.keys()) != keys:
+            raise ValueError(f"unsupported prediction record layout: {list(obj)}")
+
+
+def encode_snapshot(predictions: List[Dict]) -> bytes:
+    """
+    Encode a list of predictions into the binary snapshot format.
+
+    Raises:
+        ValueError: If a record does not have the layout written by
+            predict_real_fixtures.py (the JSON export should be used instead)
+    """
+    string_ids: Dict[str, int] = {}
+    strings: List[bytes] = []
+
+    def intern(value) -> int:
+        if value is None:
+            return NONE_ID
+        if not isinstance(value, str):
+            raise ValueError(f"expected a string, got {value!r}")
+        sid = string_ids.get(value)
+        if sid is None:
+            sid = string_ids[value] = len(strings)
+            strings.append(value.encode("utf-8"))
+        return sid
+
+    version = FORMAT_VERSION if predictions and "markets" in predictions[0] else 1
+    string_fields = STRING_FIELDS + (MARKET_STRING_FIELDS if version >= 2 else ())
+    records = np.zeros(len(predictions), dtype=RECORD_DTYPES[version])
+    texts: List[bytes] = []
+    text_off = 0
+    for i, pred in enumerate(predictions):
+        _check_shape(pred, version)
+        row = records[i]
+        for name, path in string_fields:
+            row[name] = intern(_dig(pred, path))
+        mask = 0
+        for bit, (name, path) in enumerate(NUMERIC_FIELDS):
+            value = _dig(pred, path)
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"expected a number for {name}, got {value!r}")
+            if isinstance(value, int):
+                mask |= 1 << bit
+            row[name] = value
+        row["int_mask"] = mask
+        if version >= 2:
+            for name, path in MARKET_NUMERIC_FIELDS:
+                value = _dig(pred, path)
+                if not isinstance(value, float):
+                    raise ValueError(f"expected a float for {name}, got {value!r}")
+                row[name] = value
+        text = pred["ai_analysis"]
+        if text is None:
+            row["text_len"] = NONE_ID
+        else:
+            data = text.encode("utf-8")
+            texts.append(data)
+            row["text_off"] = text_off
+            row["text_len"] = len(data)
+            text_off += len(data)
+
+    string_offsets = np.zeros(len(strings) + 1, dtype="<u8")
+    if strings:
+        string_offsets[1:] = np.cumsum([len(s) for s in strings])
+    string_blob = b"".join(strings)
+
+    offsets_off = HEADER.size
+    blob_off = offsets_off + string_offsets.nbytes
+    records_off = blob_off + len(string_blob)
+    text_section = records_off + records.nbytes
+    header = HEADER.pack(
+        MAGIC, version, len(predictions), len(strings), 0,
+        offsets_off, blob_off, records_off, text_section,
+    )
+    return b"".join([header, string_offsets.tobytes(), string_blob, records.tobytes()] + texts)
+
+
+def write_snapshot(path: str, predictions: List[Dict]):
+    """Encode ``predictions`` and atomically replace ``path`` with the result."""
+    data = encode_snapshot(predictions)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class MappedPredictions:
+    """
+    Read-only sequence of prediction dicts backed by a memory-mapped file.
+
+    ``predictions[i]`` decodes record ``i`` into the same dict the JSON
+    export holds; nothing is decoded ahead of time.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < HEADER.size:
+            raise ValueError("snapshot file truncated")
+        (magic, version, n_records, n_strings, _, offsets_off,
+         blob_off, records_off, text_off) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version not in RECORD_DTYPES:
+            raise ValueError("not a prediction snapshot file")
+        dtype = RECORD_DTYPES[version]
+        if text_off > len(self._mm) or records_off + n_records * dtype.itemsize != text_off:
+            raise ValueError("snapshot file truncated")
+        self.version = version
+
+        self._string_offsets = np.frombuffer(self._mm, dtype="<u8", count=n_strings + 1, offset=offsets_off)
+        self._blob_off = blob_off
+        self._strings: List[Optional[str]] = [None] * n_strings
+        self.records = np.frombuffer(self._mm, dtype=dtype, count=n_records, offset=records_off)
+        self._text_off = text_off
+
+    def __len__(self):
+        return len(self.records)
+
+    def string(self, sid: int) -> Optional[str]:
+        """Decode (and memoize) one entry of the string table."""
+        if sid == NONE_ID:
+            return None
+        value = self._strings[sid]
+        if value is None:
+            start = self._blob_off + int(self._string_offsets[sid])
+            end = self._blob_off + int(self._string_offsets[sid + 1])
+            value = self._strings[sid] = self._mm[start:end].decode("utf-8")
+        return value
+
+    def text(self, i: int) -> Optional[str]:
+        """Decode the ai_analysis text of record ``i``."""
+        row = self.records[i]
+        length = int(row["text_len"])
+        if length == NONE_ID:
+            return None
+        start = self._text_off + int(row["text_off"])
+        return self._mm[start:start + length].decode("utf-8")
+
+    def _record(self, i: int) -> Dict:
+        row = self.records[i]
+        s = {name: self.string(int(row[name])) for name, _ in STRING_FIELDS}
+        mask = int(row["int_mask"])
+        n = {}
+        for bit, (name, _) in enumerate(NUMERIC_FIELDS):
+            value = float(row[name])
+            n[name] = int(value) if mask & (1 << bit) else value
+        record = {
+            "date": s["date"],
+            "time": s["time"],
+            "league": s["league"],
+            "home_team": s["home_team"],
+            "away_team": s["away_team"],
+            "prediction": {
+                "prediction": s["prediction"],
+                "confidence": n["confidence"],
+                "probabilities": {
+                    "home_win": n["p_home_win"],
+                    "draw": n["p_draw"],
+                    "away_win": n["p_away_win"],
+                },
+                "expected_score": s["expected_score"],
+                "analysis": {
+                    "home_team": s["a_home_team"],
+                    "away_team": s["a_away_team"],
+                    "home_form": s["home_form"],
+                    "away_form": s["away_form"],
+                    "home_form_score": n["home_form_score"],
+                    "away_form_score": n["away_form_score"],
+                    "home_win_rate": n["home_win_rate"],
+                    "away_win_rate": n["away_win_rate"],
+                    "home_avg_goals": n["home_avg_goals"],
+                    "away_avg_goals": n["away_avg_goals"],
+                    "home_total_score": n["home_total_score"],
+                    "away_total_score": n["away_total_score"],
+                },
+            },
+        }
+        if self.version >= 2:
+            m = {name: float(row[name]) for name, _ in MARKET_NUMERIC_FIELDS}
+            record["markets"] = {
+                "home_xg": m["m_home_xg"],
+                "away_xg": m["m_away_xg"],
+                "most_likely_score": self.string(int(row["most_likely_score"])),
+                "most_likely_prob": m["m_most_likely_prob"],
+                "btts": m["m_btts"],
+                "over_1.5": m["m_over_1_5"],
+                "over_2.5": m["m_over_2_5"],
+                "over_3.5": m["m_over_3_5"],
+            }
+        record["ai_analysis"] = self.text(i)
+        return record
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._record(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("prediction index out of range")
+        return self._record(i)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(len(self)):
+            yield self._record(i)
+
+    def index_rows(self) -> Iterator[Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]]:
+        """(league, home_team, away_team, date) per record, without decoding the rest."""
+        r = self.records
+        for league, home, away, date in zip(r["league"].tolist(), r["home_team"].tolist(),
+                                            r["away_team"].tolist(), r["date"].tolist()):
+            yield self.string(league), self.string(home), self.string(away), self.string(date)
+
+    def stats_rows(self) -> Iterator[Tuple[Optional[str], Optional[str], float]]:
+        """(league, predicted result, confidence) per record, without decoding the rest."""
+        r = self.records
+        for league, prediction, confidence in zip(r["league"].tolist(), r["prediction"].tolist(),
+                                                  r["confidence"].tolist()):
+            yield self.string(league), self.string(prediction), confidence
+
+
+if __name__ == "__main__":
+    # python -m app.services.snapshot_format [data/final_predictions.json]
+    source = sys.argv[1] if len(sys.argv) > 1 else "data/final_predictions.json"
+    target = os.path.splitext(source)[0] + ".bin"
+    with open(source, "r", encoding="utf-8") as f:
+        write_snapshot(target, json.load(f))
+    sys.stdout.write(f"{source} -> {target}\n")
@@ -0,0 +1,201 @@
+"""One team-name resolver shared by the ingest scripts, the stats and the predictors."""
+import difflib
+import json
+import logging
+import re
+import unicodedata
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, Mapping, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+TEAM_NAME_MAP_FILE = Path(__file__).resolve().parents[2] / "data" / "team_name_map.json"
+
+# 簡稱 → 資料庫 / team_stats.json 使用的名稱（football-data 命名）
+# 合併自 predict_match、import_excel_data 與 fix_team_names 原本各自的對照表
+TEAM_ALIASES = {
+    'Man City': 'Manchester City',
+    'Man United': 'Manchester United',
+    'Man Utd': 'Manchester United',
+    "Nott'm Forest": 'Nottm Forest',
+    'AC Milan': 'Milan',
+    'AS Roma': 'Roma',
+    'Paris Saint Germain': 'Paris SG',
+    'PSG': 'Paris SG',
+    'Stade Brestois 29': 'Brest',
+    'Ath Madrid': 'Atletico Madrid',
+    'Ath Bilbao': 'Athletic Bilbao',
+}
+
+# Letters NFKD does not decompose into a base letter plus an accent
+_FOLD = str.maketrans({
+    'ø': 'o', 'Ø': 'O', 'ß': 'ss', 'æ': 'ae', 'Æ': 'AE', 'œ': 'oe', 'Œ': 'OE',
+    'ł': 'l', 'Ł': 'L', 'đ': 'd', 'Đ': 'D', 'ı': 'i',
+})
+_DROPPED = re.compile(r"['’`.]")
+_SEPARATORS = re.compile(r"[^0-9a-z]+")
+# Tokens too generic to identify a team in the fuzzy fallback
+_GENERIC_TOKENS = frozenset({
+    'fc', 'afc', 'cf', 'sc', 'ac', 'as', 'ud', 'cd', 'sv', 'vfl', 'vfb', 'tsg', 'ssc', 'rc', 'club', 'de', 'la', 'le',
+})
+FUZZY_CUTOFF = 0.85
+# Distinct raw names remembered per matcher before the memo is reset
+MEMO_LIMIT = 10_000
+
+
+def fold_name(name: Optional[str]) -> str:
+    """轉小寫 + 去空白 + 去 accent（重音），不依賴 unidecode."""
+    decomposed = unicodedata.normalize('NFKD', ('' if name is None else str(name)).translate(_FOLD))
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.lower().split())
+
+
+def name_key(name: Optional[str]) -> str:
+    """Comparison key of a team name: accents, case and punctuation ignored ("Nott'm Forest" == "Nottm Forest")."""
+    return ' '.join(_SEPARATORS.split(_DROPPED.sub('', fold_name(name)))).strip()
+
+
+def load_team_name_map(path: Path = TEAM_NAME_MAP_FILE) -> Dict[str, str]:
+    """Sportsgambler → Sofascore names from data/team_name_map.json ("_" keys are comments)."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"[TeamNameResolver] Cannot read {path}: {e}")
+        return {}
+    return {k: v for k, v in raw.items() if not k.startswith('_') and isinstance(v, str)}
+
+
+class TeamNameMatcher:
+    """
+    Resolve raw names to one fixed set of known names.
+
+    Every spelling of a known team (its aliases from any source, compared
+    by ``name_key``) is compiled into a dict up front; names that still
+    miss go through a fuzzy fallback whose answer is memoized, so each
+    distinct raw name is worked out once.
+    """
+
+    def __init__(self, resolver: 'TeamNameResolver', known: Iterable[str]):
+        self.known = list(dict.fromkeys(known))
+        self._by_key: Dict[str, str] = {}
+        for name in self.known:
+            self._by_key.setdefault(name_key(name), name)
+        for name in self.known:
+            for member in resolver.equivalents(name):
+                self._by_key.setdefault(member, name)
+        self._keys = list(self._by_key)
+        self._token_sets = [set(k.split()) for k in self._keys]
+        self._memo: Dict[str, Optional[str]] = {name: name for name in self.known}
+
+    def _fuzzy(self, key: str) -> Optional[str]:
+        tokens = set(key.split()) - _GENERIC_TOKENS
+        if tokens:
+            # 名稱是唯一一支球隊全名的一部分（"Wolfsburg" → "VfL Wolfsburg"）
+            containing = {self._by_key[k] for k, ts in zip(self._keys, self._token_sets) if tokens <= ts}
+            if len(containing) == 1:
+                return containing.pop()
+        # 數字不可被拼錯（"Team 4" 不是 "Team 40"）
+        numbers = {t for t in key.split() if t.isdigit()}
+        candidates = [k for k, ts in zip(self._keys, self._token_sets) if numbers <= ts]
+        close = difflib.get_close_matches(key, candidates, n=1, cutoff=FUZZY_CUTOFF)
+        return self._by_key[close[0]] if close else None
+
+    def resolve(self, name: Optional[str]) -> Optional[str]:
+        """Known name for ``name``, or None."""
+        try:
+            return self._memo[name]
+        except KeyError:
+            pass
+        key = name_key(name)
+        result = self._by_key.get(key)
+        if result is None and key:
+            result = self._fuzzy(key)
+        if len(self._memo) >= MEMO_LIMIT:
+            self._memo = {n: n for n in self.known}
+        self._memo[name] = result
+        return result
+
+
+class TeamNameResolver:
+    """
+    Team aliases from every source, merged into groups of equivalent names.
+
+    ``aliases`` map to the names used in the database and team_stats.json
+    and decide ``canonical``; ``extra_sources`` (like the Sportsgambler →
+    Sofascore map) only add equivalences. Matchers compiled for a set of
+    known names resolve any member of a group to the known name in it.
+    """
+
+    def __init__(self, aliases: Mapping[str, str], extra_sources: Sequence[Mapping[str, str]] = ()):
+        parent: Dict[str, str] = {}
+
+        def find(key):
+            parent.setdefault(key, key)
+            while parent[key] != key:
+                parent[key] = parent[parent[key]]
+                key = parent[key]
+            return key
+
+        for source in (aliases, *extra_sources):
+            for alias, target in source.items():
+                root_a, root_b = find(name_key(alias)), find(name_key(target))
+                if root_a != root_b:
+                    parent[root_a] = root_b
+
+        groups = defaultdict(list)
+        for key in parent:
+            groups[find(key)].append(key)
+        self._group: Dict[str, tuple] = {}
+        for members in groups.values():
+            for key in members:
+                self._group[key] = tuple(members)
+
+        self._canonical: Dict[str, str] = {}
+        for target in aliases.values():
+            for key in self._group[name_key(target)]:
+                self._canonical.setdefault(key, target)
+
+        self._canonical_memo: Dict[str, str] = {}
+        self.standard_names = list(dict.fromkeys(v for source in extra_sources for v in source.values()))
+        self._standard: Optional[TeamNameMatcher] = None
+
+    @classmethod
+    def from_sources(cls, map_file: Path = TEAM_NAME_MAP_FILE) -> 'TeamNameResolver':
+        return cls(TEAM_ALIASES, [load_team_name_map(map_file)])
+
+    def equivalents(self, name: str) -> Sequence[str]:
+        """Keys of every spelling equivalent to ``name`` (including its own)."""
+        key = name_key(name)
+        return self._group.get(key, (key,))
+
+    def canonical(self, name) -> str:
+        """資料庫 / team_stats.json 使用的名稱；不在對照表中的名稱原樣回傳（去頭尾空白）."""
+        try:
+            return self._canonical_memo[name]
+        except (KeyError, TypeError):
+            pass
+        result = str(name).strip()
+        result = self._canonical.get(name_key(result), result)
+        if isinstance(name, str):
+            if len(self._canonical_memo) >= MEMO_LIMIT:
+                self._canonical_memo = {}
+            self._canonical_memo[name] = result
+        return result
+
+    def matcher(self, known: Iterable[str]) -> TeamNameMatcher:
+        """Compile a matcher for a set of known names (build once, reuse for every row)."""
+        return TeamNameMatcher(self, known)
+
+    def standardize(self, name) -> str:
+        """Sofascore 標準名稱（team_name_map.json 的對照），找不到則原樣回傳."""
+        if self._standard is None:
+            self._standard = self.matcher(self.standard_names)
+        return self._standard.resolve(name) or name
+
+
+# Global resolver shared by every script and the API
+team_name_resolver = TeamNameResolver.from_sources()
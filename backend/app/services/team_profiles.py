@@ -0,0 +1,155 @@
+"""Precomputed team profiles behind /api/teams/{team_name}."""
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+from app.services.prediction_store import PredictionSnapshot, PredictionSnapshotStore, prediction_store
+from app.services.team_stats_store import TeamStats, TeamStatsStore, team_stats_store
+from scripts.predict_match import calculate_team_strength
+
+logger = logging.getLogger(__name__)
+
+
+def _empty_profile_scores() -> Dict:
+    return {
+        "recent_form": "",
+        "home_win_rate": 0,
+        "away_win_rate": 0,
+        "home_score": 0,
+        "away_score": 0,
+        "avg_goals": 0,
+    }
+
+
+def _profile_scores(stats) -> Dict:
+    """Home/away strength figures for one team, as predict_match reports them."""
+    if stats is None:
+        return _empty_profile_scores()
+    home = calculate_team_strength(stats, is_home=True)
+    away = calculate_team_strength(stats, is_home=False)
+    return {
+        "recent_form": stats.get("recent_form", "N/A"),
+        "home_win_rate": home["win_rate"],
+        "away_win_rate": away["win_rate"],
+        "home_score": home["total"],
+        "away_score": away["total"],
+        "avg_goals": (home["avg_goals_scored"] + away["avg_goals_scored"]) / 2,
+    }
+
+
+def build_team_profiles(snapshot: PredictionSnapshot, team_stats: Optional[TeamStats]) -> Dict[str, Dict]:
+    """
+    Build the profile of every team that appears in the snapshot.
+
+    Args:
+        snapshot: Current predictions snapshot
+        team_stats: Current team stats, or None if the stats file is missing
+
+    Returns:
+        Dict mapping team name (as written in the snapshot) to its response body
+    """
+    league_of = {}
+    upcoming = {}
+    # Best strength score seen per team in each league's fixtures, in fixture order
+    league_scores: Dict[str, Dict[str, float]] = {}
+
+    for pred in snapshot.predictions:
+        league = pred["league"]
+        analysis = pred["prediction"]["analysis"]
+        scores = league_scores.setdefault(league, {})
+        for team, score in (
+            (pred["home_team"], analysis["home_total_score"]),
+            (pred["away_team"], analysis["away_total_score"]),
+        ):
+            league_of.setdefault(team, league)
+            upcoming[team] = upcoming.get(team, 0) + 1
+            if team not in scores or scores[team] < score:
+                scores[team] = score
+
+    team_scores = {
+        team: _profile_scores(team_stats.resolve(team) if team_stats is not None else None)
+        for team in league_of
+    }
+
+    # A team is ranked within the league of its first listed fixture
+    for team, league in league_of.items():
+        scores = league_scores[league]
+        own = max(team_scores[team]["home_score"], team_scores[team]["away_score"])
+        scores[team] = max(scores.get(team, own), own)
+
+    rankings = {}
+    for league, scores in league_scores.items():
+        ordered = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        rankings[league] = {team: i for i, (team, _) in enumerate(ordered, 1)}
+
+    profiles = {}
+    for team, league in league_of.items():
+        s = team_scores[team]
+        profiles[team] = {
+            "team_name": team,
+            "league": league,
+            "recent_form": s["recent_form"],
+            "total_score": max(s["home_score"], s["away_score"]),
+            "home_win_rate": s["home_win_rate"],
+            "away_win_rate": s["away_win_rate"],
+            "home_score": s["home_score"],
+            "away_score": s["away_score"],
+            "avg_goals": round(s["avg_goals"], 2),
+            "overall_ranking": rankings[league].get(team),
+            "total_teams": len(league_scores[league]),
+            "upcoming_matches": upcoming[team],
+        }
+    return profiles
+
+
+class TeamProfileStore:
+    """
+    Team profile table rebuilt only when the predictions snapshot or
+    data/team_stats.json changes.
+    """
+
+    def __init__(self, snapshots: PredictionSnapshotStore = prediction_store, stats: TeamStatsStore = team_stats_store):
+        """Initialize the store; the table is built lazily on first use."""
+        self.snapshots = snapshots
+        self.stats = stats
+        # (version key, profiles) swapped as one reference
+        self._table: Optional[Tuple[Tuple, Dict[str, Dict]]] = None
+        self._lock = threading.Lock()
+
+    def version(self) -> Optional[str]:
+        """Token that changes whenever the profile table would be rebuilt."""
+        snapshot = self.snapshots.get()
+        if snapshot is None:
+            return None
+        team_stats = self.stats.get()
+        return f"{snapshot.version}-{team_stats.version}" if team_stats is not None else snapshot.version
+
+    def get(self) -> Optional[Dict[str, Dict]]:
+        """
+        Return the team profile table for the current data.
+
+        Returns:
+            Dict of team name to profile, or None if no predictions exist
+        """
+        snapshot = self.snapshots.get()
+        if snapshot is None:
+            return None
+        team_stats = self.stats.get()
+
+        key = (snapshot.version, team_stats.version if team_stats is not None else None)
+        table = self._table
+        if table is not None and table[0] == key:
+            return table[1]
+
+        with self._lock:
+            table = self._table
+            if table is not None and table[0] == key:
+                return table[1]
+            profiles = build_team_profiles(snapshot, team_stats)
+            logger.info(f"[TeamProfileStore] Built {len(profiles)} team profiles")
+            self._table = (key, profiles)
+            return profiles
+
+
+# Global team profile store
+team_profile_store = TeamProfileStore()
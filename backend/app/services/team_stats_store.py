@@ -0,0 +1,223 @@
+"""Shared, reload-on-change view of data/team_stats.json for scripts and the API."""
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterator, Optional
+
+from app.services.team_names import team_name_resolver
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATS_FILE = "data/team_stats.json"
+
+# Fields written by scripts/calculate_team_stats.py; anything else is kept in ``_extra``
+STAT_FIELDS = (
+    "total_matches", "wins", "draws", "losses", "points",
+    "home_matches", "home_wins", "home_draws", "home_losses",
+    "away_matches", "away_wins", "away_draws", "away_losses",
+    "goals_scored", "goals_conceded", "goal_difference",
+    "goals_scored_home", "goals_conceded_home", "goals_scored_away", "goals_conceded_away",
+    "avg_goals_scored", "avg_goals_conceded",
+    "avg_goals_scored_home", "avg_goals_conceded_home",
+    "avg_goals_scored_away", "avg_goals_conceded_away",
+    "win_rate", "home_win_rate", "away_win_rate",
+    "recent_form",
+)
+_FIELD_SET = frozenset(STAT_FIELDS)
+_MISSING = object()
+
+
+class TeamRecord:
+    """
+    One team's stats in a fixed slot layout.
+
+    Supports ``get(key, default)`` like the dict it replaces, so
+    calculate_team_strength and other callers work unchanged.
+    """
+
+    __slots__ = ("name", "_extra") + STAT_FIELDS
+
+    def __init__(self, name: str, stats: Dict):
+        self.name = name
+        extra = None
+        for field in STAT_FIELDS:
+            setattr(self, field, stats.get(field, _MISSING))
+        for key, value in stats.items():
+            if key not in _FIELD_SET:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        self._extra = extra
+
+    def get(self, key: str, default=None):
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+        elif self._extra is not None:
+            value = self._extra.get(key, _MISSING)
+        else:
+            value = _MISSING
+        return default if value is _MISSING else value
+
+    def __getitem__(self, key: str):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def to_dict(self) -> Dict:
+        """The record as the dict it was loaded from (field order may differ)."""
+        data = {f: getattr(self, f) for f in STAT_FIELDS if getattr(self, f) is not _MISSING}
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+
+class TeamStats:
+    """
+    One loaded version of the team stats file.
+
+    ``records`` maps canonical team names to TeamRecord. ``resolve`` takes
+    a raw name and returns the record predict_match would use for it; the
+    shared team-name matcher is compiled once per load, so a lookup is a
+    memoized dict access.
+    """
+
+    def __init__(self, raw: Dict[str, Dict], version: str, mtime_ns: int, size: int, source: str):
+        self.records: Dict[str, TeamRecord] = {name: TeamRecord(name, stats) for name, stats in raw.items()}
+        self.version = version
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.source = source
+        self._names = team_name_resolver.matcher(self.records)
+        # Built on first use from this version of the stats
+        self._strength_table = None
+        self._matchup_matrix = None
+        self._derived_lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.records
+
+    def __getitem__(self, name: str) -> TeamRecord:
+        return self.records[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.records)
+
+    def get(self, name: str, default=None) -> Optional[TeamRecord]:
+        return self.records.get(name, default)
+
+    def resolve(self, name: str) -> Optional[TeamRecord]:
+        """Record for a raw (possibly aliased, accented or misspelled) team name, or None."""
+        name = self._names.resolve(name)
+        return self.records[name] if name is not None else None
+
+    def _derived(self, attr: str, build):
+        value = getattr(self, attr)
+        if value is None:
+            with self._derived_lock:
+                value = getattr(self, attr)
+                if value is None:
+                    value = build()
+                    setattr(self, attr, value)
+        return value
+
+    def strength_table(self):
+        """TeamStrengthTable for batch prediction, built once per loaded version."""
+        from scripts.predict_batch import TeamStrengthTable
+        return self._derived("_strength_table", lambda: TeamStrengthTable(self.records))
+
+    def matchup_matrix(self):
+        """MatchupMatrix of every home/away pairing, built once per loaded version."""
+        from scripts.predict_batch import MatchupMatrix
+        return self._derived("_matchup_matrix", lambda: MatchupMatrix(self.strength_table()))
+
+
+class TeamStatsStore:
+    """
+    Load data/team_stats.json once and reload it only when it changes.
+
+    Same contract as PredictionSnapshotStore: ``get()`` stats the file and
+    returns the current TeamStats, swapping in a fully built new version
+    when the file changed and keeping the previous one if a rewrite is not
+    readable yet.
+    """
+
+    def __init__(self, path: str = DEFAULT_STATS_FILE):
+        """Initialize the store; nothing is read until the first ``get()``."""
+        self.path = path
+        self._stats: Optional[TeamStats] = None
+        # Stat of a file version that failed to load; not retried until the file changes
+        self._failed_stat = None
+        self._lock = threading.Lock()
+
+    def _stat(self):
+        """(mtime_ns, size, absolute path) of the stats file, or None if it does not exist."""
+        path = os.path.abspath(self.path)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size, path
+
+    @staticmethod
+    def _is_current(stats: Optional[TeamStats], stat) -> bool:
+        return stats is not None and (stats.mtime_ns, stats.size, stats.source) == stat
+
+    def _load(self, stat) -> TeamStats:
+        mtime_ns, size, path = stat
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        stats = TeamStats(raw, f"{mtime_ns:x}-{size:x}", mtime_ns, size, path)
+        logger.info(f"[TeamStatsStore] Loaded {len(stats)} teams from {path} (version {stats.version})")
+        return stats
+
+    def get(self) -> Optional[TeamStats]:
+        """
+        Return the current team stats, reloading them if the file changed.
+
+        Returns:
+            TeamStats or None if the stats file does not exist
+        """
+        stat = self._stat()
+        if stat is None:
+            self._stats = None
+            return None
+
+        stats = self._stats
+        if self._is_current(stats, stat) or stat == self._failed_stat:
+            return stats
+
+        with self._lock:
+            stat = self._stat()
+            if stat is None:
+                self._stats = None
+                return None
+            stats = self._stats
+            if self._is_current(stats, stat) or stat == self._failed_stat:
+                return stats
+            try:
+                stats = self._load(stat)
+            except (OSError, ValueError) as e:
+                logger.warning(f"[TeamStatsStore] Reload failed, keeping previous stats: {e}")
+                self._failed_stat = stat
+                return self._stats
+            self._failed_stat = None
+            self._stats = stats
+            return stats
+
+    def invalidate(self):
+        """Drop the loaded stats so the next ``get()`` reads the file again."""
+        with self._lock:
+            self._stats = None
+            self._failed_stat = None
+
+
+# Global team stats store shared by the API and the prediction scripts
+team_stats_store = TeamStatsStore()
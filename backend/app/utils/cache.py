@@ -73,6 +73,66 @@ class CacheService:
             print(f"Cache set error: {e}")
             return False
     
+    def get_raw(self, key: str) -> Optional[bytes]:
+        """
+        Get an already-encoded value from cache, without JSON decoding.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached bytes or None if not found
+        """
+        if not self.enabled:
+            return None
+        
+        try:
+            return self.client.get(key)
+        except Exception as e:
+            print(f"Cache get error: {e}")
+            return None
+    
+    def set_raw(self, key: str, value: bytes, expire: int = 300) -> bool:
+        """
+        Set an already-encoded value in cache, without JSON encoding.
+        
+        Args:
+            key: Cache key
+            value: Bytes to cache
+            expire: Expiration time in seconds (default: 5 minutes)
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.enabled:
+            return False
+        
+        try:
+            self.client.setex(key, expire, value)
+            return True
+        except Exception as e:
+            print(f"Cache set error: {e}")
+            return False
+    
+    def incr(self, key: str) -> Optional[int]:
+        """
+        Atomically increment an integer counter.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            New counter value, or None if the cache is unavailable
+        """
+        if not self.enabled:
+            return None
+        
+        try:
+            return self.client.incr(key)
+        except Exception as e:
+            print(f"Cache incr error: {e}")
+            return None
+    
     def delete(self, key: str) -> bool:
         """
         Delete key from cache.
@@ -0,0 +1,111 @@
+"""ETag / conditional GET and precompressed bodies for snapshot-backed responses."""
+import gzip
+import hashlib
+from typing import Dict, Iterable, Optional
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Revalidate on every poll; a matching ETag turns it into a 304
+CACHE_CONTROL = "no-cache"
+
+
+class EncodedBody:
+    """One response body with its gzip (and brotli, if available) encodings."""
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+        self.encodings: Dict[str, bytes] = {"gzip": gzip.compress(raw, compresslevel=6)}
+        if brotli is not None:
+            self.encodings["br"] = brotli.compress(raw, quality=5)
+
+    def get(self, encoding: Optional[str]) -> bytes:
+        if encoding is None:
+            return self.raw
+        return self.encodings[encoding]
+
+
+def accepted_encodings(request: Request) -> set:
+    """Content codings the client accepts (ignoring ``q=0`` entries)."""
+    accepted = set()
+    for item in request.headers.get("accept-encoding", "").split(","):
+        token, _, params = item.strip().partition(";")
+        params = params.replace(" ", "")
+        if token and params not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(token.lower())
+    return accepted
+
+
+def negotiate_encoding(request: Request, available: Iterable[str]) -> Optional[str]:
+    """Pick brotli over gzip when both are accepted; None means identity."""
+    accepted = accepted_encodings(request)
+    for encoding in ("br", "gzip"):
+        if encoding in available and encoding in accepted:
+            return encoding
+    return None
+
+
+def make_etag(version: str, request: Request, *parts: str) -> str:
+    """
+    Strong ETag for a snapshot version and one representation of a resource.
+
+    The path, normalized query string and any extra ``parts`` (media type,
+    content coding) are hashed so every distinct body gets its own tag.
+    """
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    digest = hashlib.sha1("|".join((request.url.path, query) + parts).encode("utf-8")).hexdigest()[:16]
+    return f'"{version}-{digest}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match already names ``etag``."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    tags = {t.strip().removeprefix("W/") for t in header.split(",")}
+    return etag in tags
+
+
+def cache_headers(etag: str, encoding: Optional[str] = None, vary_encoding: bool = False) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if vary_encoding:
+        headers["Vary"] = "Accept-Encoding"
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return headers
+
+
+def not_modified_response(etag: str, vary_encoding: bool = False) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag, vary_encoding=vary_encoding))
+
+
+def conditional_body_response(
+    request: Request, version: str, body: bytes, media_type: str = "application/json"
+) -> Response:
+    """Serve an already-encoded body with an ETag, or 304 if the client has it."""
+    etag = make_etag(version, request, media_type)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    return Response(content=body, media_type=media_type, headers=cache_headers(etag))
+
+
+def precompressed_response(
+    request: Request, version: str, body: EncodedBody, media_type: str = "application/json"
+) -> Response:
+    """Serve a precompressed body in the best coding the client accepts, or 304."""
+    encoding = negotiate_encoding(request, body.encodings)
+    etag = make_etag(version, request, media_type, encoding or "identity")
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, vary_encoding=True)
+    return Response(
+        content=body.get(encoding),
+        media_type=media_type,
+        headers=cache_headers(etag, encoding, vary_encoding=True),
+    )
@@ -0,0 +1,135 @@
+"""Cursor pagination, NDJSON streaming and cached bodies for the predictions list."""
+import base64
+import json
+from typing import Dict, Iterable, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.services.prediction_store import PredictionSnapshot, render_json
+from app.utils.http_cache import (
+    EncodedBody,
+    cache_headers,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+    precompressed_response,
+)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def encode_cursor(version: str, position: int) -> str:
+    """
+    Build an opaque cursor pointing just after ``position``.
+
+    Args:
+        version: Snapshot version the position belongs to
+        position: Position of the last record already returned
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps({"v": version, "p": position}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, version: str) -> int:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed or was issued for
+            another snapshot version
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        cursor_version, position = data["v"], int(data["p"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="無效的 cursor")
+    if cursor_version != version:
+        raise HTTPException(status_code=400, detail="預測資料已更新，cursor 已失效，請重新查詢")
+    return position
+
+
+def wants_ndjson(request: Request) -> bool:
+    """True if the client asked for newline-delimited JSON."""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _ndjson_lines(records: Iterable[Dict]):
+    for record in records:
+        yield render_json(record) + b"\n"
+
+
+def _list_view_body(snapshot: PredictionSnapshot, league: Optional[str]) -> Optional[EncodedBody]:
+    """
+    Precompressed body of the unfiltered list or one league's list.
+
+    Built on first use and kept on the snapshot, so each view is serialized
+    and compressed once per snapshot version. Unknown leagues are not cached.
+    """
+    key = league.lower() if league else None
+    if key is not None and key not in snapshot.index.by_league:
+        return None
+    body = snapshot.encoded_views.get(key)
+    if body is None:
+        positions = snapshot.query_positions(league=league)
+        records = [snapshot.predictions[pos] for pos in positions]
+        body = EncodedBody(render_json({"total": len(records), "predictions": records, "next_cursor": None}))
+        snapshot.encoded_views[key] = body
+    return body
+
+
+def predictions_list_response(
+    request: Request,
+    snapshot: PredictionSnapshot,
+    filters: Dict[str, Optional[str]],
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+):
+    """
+    Build the /api/predictions/ response for one page of matching records.
+
+    Unpaginated requests for the whole list or a single league are served
+    from a precompressed body. Every response carries a strong ETag derived
+    from the snapshot version, and a matching If-None-Match yields 304.
+    NDJSON is streamed one record per line, with ``X-Total-Count`` and
+    ``X-Next-Cursor`` headers.
+
+    Args:
+        request: Incoming request (Accept, Accept-Encoding, If-None-Match)
+        snapshot: Current predictions snapshot
+        filters: Keyword filters for ``PredictionSnapshot.query_positions``
+        cursor: Cursor from a previous page's ``next_cursor``
+        limit: Page size; None returns every remaining record
+    """
+    ndjson = wants_ndjson(request)
+    other_filters = any(v for k, v in filters.items() if k != "league")
+    if not (ndjson or other_filters or cursor or limit):
+        body = _list_view_body(snapshot, filters.get("league"))
+        if body is not None:
+            return precompressed_response(request, snapshot.version, body)
+
+    media_type = NDJSON_MEDIA_TYPE if ndjson else "application/json"
+    etag = make_etag(snapshot.version, request, media_type)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    positions = snapshot.query_positions(**filters)
+    after = decode_cursor(cursor, snapshot.version) if cursor else None
+    records, next_after = snapshot.page(positions, after, limit)
+    next_cursor = encode_cursor(snapshot.version, next_after) if next_after is not None else None
+    headers = cache_headers(etag)
+
+    if ndjson:
+        headers["X-Total-Count"] = str(len(positions))
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        return StreamingResponse(_ndjson_lines(records), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+    return JSONResponse(
+        content={"total": len(positions), "predictions": records, "next_cursor": next_cursor},
+        headers=headers,
+    )
@@ -0,0 +1,156 @@
+"""
+Declarative response caching for FastAPI routes on top of CacheService.
+
+Routes opt in with ``@cache_route(ttl, versions)`` under the router
+decorator; the router (or app) must use ``CachedRoute`` as its route class.
+A cached entry is the final JSON body, so a hit skips the database, the
+response model and JSON encoding entirely.
+
+Cache keys are built from the path, the sorted query parameters and the
+route's current data versions. A version is either a callable returning
+an in-process token (e.g. the predictions snapshot version) or the name of
+a database namespace whose counter in Redis is bumped after every commit
+that touches it. Bumping a version makes the old keys unreachable; they
+expire on their own after ``ttl``.
+"""
+import hashlib
+from typing import Callable, Iterable, Optional, Sequence, Union
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.utils import cache as cache_module
+from app.utils.cache import CacheService
+
+KEY_PREFIX = "route-cache"
+JSON_MEDIA_TYPE = "application/json"
+
+# Database namespaces and the models whose writes invalidate them
+MATCHES = "matches"
+PREDICTIONS = "predictions"
+_NAMESPACES_BY_MODEL = {
+    "Match": (MATCHES, PREDICTIONS),  # history rows carry match teams/league
+    "Team": (MATCHES,),  # match responses resolve team names
+    "Prediction": (PREDICTIONS,),
+}
+
+Version = Union[str, Callable[[], Optional[str]]]
+
+
+class CachePolicy:
+    """How one route is cached: TTL and the versions its response depends on."""
+
+    def __init__(self, ttl: int, versions: Sequence[Version] = ()):
+        self.ttl = ttl
+        self.versions = tuple(versions)
+
+
+def cache_route(ttl: int = 300, versions: Iterable[Version] = ()):
+    """
+    Mark a route endpoint as cacheable.
+
+    Args:
+        ttl: Seconds an entry is kept
+        versions: Database namespaces (str) and/or callables returning the
+            version token of in-process data the response is built from
+    """
+    policy = CachePolicy(ttl, list(versions))
+
+    def decorator(func):
+        func.__cache_policy__ = policy
+        return func
+    return decorator
+
+
+def version_key(namespace: str) -> str:
+    return f"{KEY_PREFIX}:version:{namespace}"
+
+
+def normalized_query(request: Request) -> str:
+    """Query string with parameters sorted, so their order does not matter."""
+    return "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+
+
+def route_cache_key(request: Request, versions: Sequence[str]) -> str:
+    """Cache key for a request given its resolved version tokens."""
+    raw = "|".join([request.url.path, normalized_query(request)] + list(versions))
+    digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    return f"{KEY_PREFIX}:{request.url.path}:{digest}"
+
+
+def _lookup(store: CacheService, request: Request, policy: CachePolicy):
+    """Resolve the route's versions, then fetch the cached body (runs in a worker thread)."""
+    tokens = []
+    for version in policy.versions:
+        if isinstance(version, str):
+            value = store.get_raw(version_key(version))
+            tokens.append(value.decode("ascii") if value else "0")
+        else:
+            tokens.append(str(version()))
+    key = route_cache_key(request, tokens)
+    return key, store.get_raw(key)
+
+
+class CachedRoute(APIRoute):
+    """APIRoute that serves endpoints marked with ``cache_route`` from the cache."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        policy: Optional[CachePolicy] = getattr(self.endpoint, "__cache_policy__", None)
+        if policy is None:
+            return handler
+
+        async def cached_handler(request: Request) -> Response:
+            store = cache_module.cache
+            if request.method != "GET" or not store.enabled:
+                return await handler(request)
+
+            key, body = await run_in_threadpool(_lookup, store, request, policy)
+            if body is not None:
+                return Response(content=body, media_type=JSON_MEDIA_TYPE, headers={"X-Cache": "HIT"})
+
+            response = await handler(request)
+            if (
+                response.status_code == 200
+                and response.media_type == JSON_MEDIA_TYPE
+                and "etag" not in response.headers
+                and isinstance(getattr(response, "body", None), bytes)
+            ):
+                await run_in_threadpool(store.set_raw, key, response.body, policy.ttl)
+                response.headers["X-Cache"] = "MISS"
+            return response
+
+        return cached_handler
+
+
+def bump_versions(namespaces: Iterable[str], store: Optional[CacheService] = None):
+    """Invalidate every cached response depending on ``namespaces``."""
+    store = store or cache_module.cache
+    for namespace in namespaces:
+        store.incr(version_key(namespace))
+
+
+def _collect_dirty_namespaces(session, flush_context):
+    dirty = session.info.setdefault("route_cache_dirty", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        dirty.update(_NAMESPACES_BY_MODEL.get(type(obj).__name__, ()))
+
+
+def _bump_after_commit(session):
+    dirty = session.info.pop("route_cache_dirty", None)
+    if dirty:
+        bump_versions(dirty)
+
+
+def _discard_after_rollback(session):
+    session.info.pop("route_cache_dirty", None)
+
+
+# Versions are bumped only once the write is committed, so a concurrent
+# request can never cache pre-commit data under the new version
+event.listen(Session, "after_flush", _collect_dirty_namespaces)
+event.listen(Session, "after_commit", _bump_after_commit)
+event.listen(Session, "after_rollback", _discard_after_rollback)
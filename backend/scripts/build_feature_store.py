@@ -0,0 +1,32 @@
+"""Fill the match_features table in bulk."""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+
+from app.database import SessionLocal, engine
+from app.models.feature import MatchFeatures
+from app.services.feature_store import FEATURE_BUILDERS, FEATURE_VERSION, FeatureStore
+
+
+def build_feature_store(version: int = FEATURE_VERSION, match_ids=None) -> int:
+    """Recompute the feature vectors of ``match_ids`` (default: every match); returns how many were written."""
+    MatchFeatures.__table__.create(bind=engine, checkfirst=True)
+    db = SessionLocal()
+    try:
+        return FeatureStore(version).refresh(db, match_ids)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="重新計算每場比賽的模型特徵向量")
+    parser.add_argument("--version", type=int, choices=sorted(FEATURE_BUILDERS), default=FEATURE_VERSION,
+                        help="特徵版本")
+    parser.add_argument("--match-ids", type=int, nargs="+", help="只重新計算這些比賽（預設全部）")
+    args = parser.parse_args()
+
+    print(f"🧮 計算特徵向量（版本 {args.version}）")
+    count = build_feature_store(args.version, args.match_ids)
+    print(f"✅ 已寫入 {count} 筆特徵向量")
@@ -0,0 +1,35 @@
+"""Update Elo ratings from finished matches (incremental, resumes from the last checkpoint)."""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+from app.database import SessionLocal, Base, engine
+from app.models.rating import EloCheckpoint
+from app.services.elo import elo_store
+
+
+def update_elo_ratings():
+    """更新 Elo 評分並輸出排名."""
+    
+    Base.metadata.create_all(bind=engine, tables=[EloCheckpoint.__table__])
+    db = SessionLocal()
+    try:
+        ratings = elo_store.update(db).ratings
+    finally:
+        db.close()
+    
+    ranked = sorted(ratings.items(), key=lambda x: x[1], reverse=True)
+    print(f"📊 Elo 評分（共 {len(ranked)} 隊）\n")
+    for i, (team, rating) in enumerate(ranked[:20], 1):
+        print(f"{i:2d}. {team:<28} {rating:7.1f}")
+    
+    os.makedirs('data', exist_ok=True)
+    with open('data/elo_ratings.json', 'w', encoding='utf-8') as f:
+        json.dump(dict(ranked), f, ensure_ascii=False, indent=2)
+    
+    print("\n📁 已儲存到 data/elo_ratings.json")
+
+
+if __name__ == "__main__":
+    update_elo_ratings()
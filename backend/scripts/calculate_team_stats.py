@@ -3,30 +3,35 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import argparse
 import json
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 from collections import defaultdict
+import numpy as np
+from sqlalchemy import and_, case, func, literal, or_, select, union_all
 from app.database import SessionLocal
-from app.models.match import Match
+from app.models.match import FINISHED_STATUS, Match
 
-def calculate_current_season_stats():
-    """只計算當前賽季 (2025/26) 的統計."""
-    
-    db = SessionLocal()
-    
-    # 當前賽季起始日期：2025年8月1日
-    season_start = datetime(2025, 8, 1)
-    
-    matches = db.query(Match).filter(
-        Match.match_date >= season_start,
-        Match.status == 'finished'
-    ).all()
-    
-    print(f"📊 分析 2025/26 賽季比賽")
-    print(f"   起始日期: {season_start.date()}")
-    print(f"   總比賽數: {len(matches)}\n")
-    
-    team_stats = defaultdict(lambda: {
+# 當前賽季起始日期：2025年8月1日
+SEASON_START = datetime(2025, 8, 1)
+STATS_FILE = 'data/team_stats.json'
+# 增量模式的狀態：每隊累計計數、已計入的比賽與高水位
+STATE_FILE = 'data/team_stats_state.json'
+# 近期狀態取最近幾場
+RECENT_FORM_MATCHES = 5
+# 多視窗統計：最近 N 場、最近 N 天（以最後一場已完賽比賽為準）與整個賽季
+MATCH_WINDOWS = (5, 10, 20)
+DAY_WINDOWS = (30,)
+WINDOWS = tuple(f'last_{n}' for n in MATCH_WINDOWS) + tuple(f'last_{d}_days' for d in DAY_WINDOWS) + ('season',)
+# Rows updated this long before the high-water mark are read again, so a
+# transaction that committed late with an older updated_at is not missed.
+# Re-applying a match is idempotent.
+HIGH_WATER_OVERLAP = timedelta(minutes=5)
+
+
+def _new_counters():
+    return {
         'total_matches': 0,
         'home_matches': 0,
         'away_matches': 0,
@@ -46,141 +51,610 @@ def calculate_current_season_stats():
         'goals_scored_away': 0,
         'goals_conceded_away': 0,
         'recent_matches': [],
+    }
+
+
+COUNTER_FIELDS = tuple(k for k in _new_counters() if k != 'recent_matches')
+
+
+def match_entry(match):
+    """[id, home, away, home_score, away_score, date] if the match counts toward the season, else None."""
+    if (
+        match.status != FINISHED_STATUS
+        or match.match_date is None
+        or match.match_date < SEASON_START
+        or match.home_score is None
+        or match.away_score is None
+        or match.home_team is None
+        or match.away_team is None
+    ):
+        return None
+    return [match.id, match.home_team, match.away_team,
+            match.home_score, match.away_score, match.match_date.isoformat()]
+
+
+def apply_match(team_stats, entry, sign=1):
+    """Add (sign=1) or remove (sign=-1) one match from the per-team counters."""
+    match_id, home, away, home_score, away_score, date = entry
+
+    # 主隊統計
+    team_stats[home]['total_matches'] += sign
+    team_stats[home]['home_matches'] += sign
+    team_stats[home]['goals_scored'] += sign * home_score
+    team_stats[home]['goals_conceded'] += sign * away_score
+    team_stats[home]['goals_scored_home'] += sign * home_score
+    team_stats[home]['goals_conceded_home'] += sign * away_score
+
+    # 客隊統計
+    team_stats[away]['total_matches'] += sign
+    team_stats[away]['away_matches'] += sign
+    team_stats[away]['goals_scored'] += sign * away_score
+    team_stats[away]['goals_conceded'] += sign * home_score
+    team_stats[away]['goals_scored_away'] += sign * away_score
+    team_stats[away]['goals_conceded_away'] += sign * home_score
+
+    # 勝負統計
+    if home_score > away_score:
+        team_stats[home]['wins'] += sign
+        team_stats[home]['home_wins'] += sign
+        team_stats[away]['losses'] += sign
+        team_stats[away]['away_losses'] += sign
+        home_result = 'W'
+        away_result = 'L'
+    elif home_score < away_score:
+        team_stats[home]['losses'] += sign
+        team_stats[home]['home_losses'] += sign
+        team_stats[away]['wins'] += sign
+        team_stats[away]['away_wins'] += sign
+        home_result = 'L'
+        away_result = 'W'
+    else:
+        team_stats[home]['draws'] += sign
+        team_stats[home]['home_draws'] += sign
+        team_stats[away]['draws'] += sign
+        team_stats[away]['away_draws'] += sign
+        home_result = 'D'
+        away_result = 'D'
+
+    # 記錄最近比賽
+    if sign < 0:
+        for team in (home, away):
+            recent = team_stats[team]['recent_matches']
+            recent[:] = [m for m in recent if m['match_id'] != match_id]
+        return
+    team_stats[home]['recent_matches'].append({
+        'match_id': match_id,
+        'date': date,
+        'result': home_result,
+        'opponent': away,
+        'home': True,
+    })
+    team_stats[away]['recent_matches'].append({
+        'match_id': match_id,
+        'date': date,
+        'result': away_result,
+        'opponent': home,
+        'home': False,
+    })
+
+
+def summarize_team(stats):
+    """One team's entry of team_stats.json from its counters."""
+    # 排序最近比賽（同日期依比賽 id）
+    stats['recent_matches'].sort(key=lambda x: (x['date'], -x['match_id']), reverse=True)
+    recent_5 = stats['recent_matches'][:RECENT_FORM_MATCHES]
+    return summarize_counters(stats, ''.join([m['result'] for m in recent_5]))
+
+
+def summarize_counters(stats, recent_form):
+    """Stats entry (points, averages, rates) from counters and a recent-form string."""
+    # 計算積分 (W=3, D=1, L=0)
+    points = stats['wins'] * 3 + stats['draws'] * 1
+
+    return {
+        # 基本數據
+        'total_matches': stats['total_matches'],
+        'wins': stats['wins'],
+        'draws': stats['draws'],
+        'losses': stats['losses'],
+        'points': points,
+
+        # 主場數據
+        'home_matches': stats['home_matches'],
+        'home_wins': stats['home_wins'],
+        'home_draws': stats['home_draws'],
+        'home_losses': stats['home_losses'],
+
+        # 客場數據
+        'away_matches': stats['away_matches'],
+        'away_wins': stats['away_wins'],
+        'away_draws': stats['away_draws'],
+        'away_losses': stats['away_losses'],
+
+        # 進球數據
+        'goals_scored': stats['goals_scored'],
+        'goals_conceded': stats['goals_conceded'],
+        'goal_difference': stats['goals_scored'] - stats['goals_conceded'],
+        'goals_scored_home': stats['goals_scored_home'],
+        'goals_conceded_home': stats['goals_conceded_home'],
+        'goals_scored_away': stats['goals_scored_away'],
+        'goals_conceded_away': stats['goals_conceded_away'],
+
+        # 平均數據
+        'avg_goals_scored': round(stats['goals_scored'] / max(1, stats['total_matches']), 2),
+        'avg_goals_conceded': round(stats['goals_conceded'] / max(1, stats['total_matches']), 2),
+        'avg_goals_scored_home': round(stats['goals_scored_home'] / max(1, stats['home_matches']), 2),
+        'avg_goals_conceded_home': round(stats['goals_conceded_home'] / max(1, stats['home_matches']), 2),
+        'avg_goals_scored_away': round(stats['goals_scored_away'] / max(1, stats['away_matches']), 2),
+        'avg_goals_conceded_away': round(stats['goals_conceded_away'] / max(1, stats['away_matches']), 2),
+
+        # 勝率
+        'win_rate': round(stats['wins'] / max(1, stats['total_matches']), 3),
+        'home_win_rate': round(stats['home_wins'] / max(1, stats['home_matches']), 3),
+        'away_win_rate': round(stats['away_wins'] / max(1, stats['away_matches']), 3),
+
+        # 近期狀態
+        'recent_form': recent_form,
+    }
+
+
+def rolling_windows(entries, as_of=None):
+    """
+    Every window of WINDOWS for every team, in one pass over the matches.
+
+    Each team's matches are laid out contiguously in date order and the
+    counters are accumulated into one prefix-sum array, so any window is
+    the difference of two prefix rows: last N matches ends at the team's
+    last row, last N days starts at the first row after the cutoff.
+
+    Args:
+        entries: Match entries as produced by ``match_entry``
+        as_of: Only matches up to this date count; defaults to the latest match
+
+    Returns:
+        Dict of team to {window name: stats entry like summarize_team's}
+    """
+    entries = list(entries)
+    if not entries:
+        return {}
+    names = {}
+    home = [names.setdefault(e[1], len(names)) for e in entries]
+    away = [names.setdefault(e[2], len(names)) for e in entries]
+    match_id = np.array([e[0] for e in entries], dtype=np.int64)
+    home_score = np.array([e[3] for e in entries], dtype=np.int64)
+    away_score = np.array([e[4] for e in entries], dtype=np.int64)
+    dates = np.array([e[5] for e in entries], dtype='datetime64[us]')
+
+    # 每場比賽拆成主、客隊各一列，依球隊、日期（同日期依比賽 id 由大到小）排序
+    team = np.array(home + away, dtype=np.int64)
+    is_home = np.repeat([True, False], len(entries))
+    scored = np.concatenate([home_score, away_score])
+    conceded = np.concatenate([away_score, home_score])
+    date = np.concatenate([dates, dates])
+    order = np.lexsort((-np.concatenate([match_id, match_id]), date, team))
+    team, is_home, scored, conceded, date = team[order], is_home[order], scored[order], conceded[order], date[order]
+
+    won, drew, lost = scored > conceded, scored == conceded, scored < conceded
+    columns = {
+        'total_matches': np.ones_like(scored),
+        'home_matches': is_home,
+        'away_matches': ~is_home,
+        'wins': won,
+        'draws': drew,
+        'losses': lost,
+        'home_wins': is_home & won,
+        'home_draws': is_home & drew,
+        'home_losses': is_home & lost,
+        'away_wins': ~is_home & won,
+        'away_draws': ~is_home & drew,
+        'away_losses': ~is_home & lost,
+        'goals_scored': scored,
+        'goals_conceded': conceded,
+        'goals_scored_home': scored * is_home,
+        'goals_conceded_home': conceded * is_home,
+        'goals_scored_away': scored * ~is_home,
+        'goals_conceded_away': conceded * ~is_home,
+    }
+    counters = np.column_stack([columns[f] for f in COUNTER_FIELDS]).astype(np.int64)
+    prefix = np.vstack([np.zeros((1, len(COUNTER_FIELDS)), dtype=np.int64), np.cumsum(counters, axis=0)])
+    results = np.select([won, drew], ['W', 'D'], 'L')
+
+    starts = np.flatnonzero(np.r_[True, team[1:] != team[:-1]])
+    if as_of is None:
+        as_of = date.max()
+    as_of = np.datetime64(as_of, 'us')
+
+    def rows_until(cutoff):
+        """Per team, the first row after ``cutoff``."""
+        return starts + np.add.reduceat((date <= cutoff).astype(np.int64), starts)
+
+    ends = rows_until(as_of)
+    bounds = {f'last_{n}': np.maximum(starts, ends - n) for n in MATCH_WINDOWS}
+    for d in DAY_WINDOWS:
+        bounds[f'last_{d}_days'] = rows_until(as_of - np.timedelta64(d, 'D'))
+    bounds['season'] = starts
+
+    team_names = list(names)
+    windows = {team_names[t]: {} for t in team[starts].tolist()}
+    for window in WINDOWS:
+        begin = bounds[window]
+        totals = (prefix[ends] - prefix[begin]).tolist()
+        for i, t in enumerate(team[starts].tolist()):
+            form_start = max(begin[i], ends[i] - RECENT_FORM_MATCHES)
+            recent_form = ''.join(results[form_start:ends[i]][::-1].tolist())
+            windows[team_names[t]][window] = summarize_counters(dict(zip(COUNTER_FIELDS, totals[i])), recent_form)
+    return windows
+
+
+def _add_windows(final_stats, entries):
+    for team, windows in rolling_windows(entries).items():
+        if team in final_stats:
+            final_stats[team]['windows'] = windows
+
+
+def _write_json(path, data, indent=None):
+    """Write to a temporary file and rename it, so readers never see a partial file."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+    os.replace(tmp_path, path)
+
+
+def _high_water(high_water, match):
+    """Advance the high-water mark: latest updated_at and highest id seen."""
+    updated_at = match.updated_at.isoformat() if match.updated_at is not None else None
+    if high_water is None:
+        return {'updated_at': updated_at, 'id': match.id}
+    latest = [v for v in (high_water['updated_at'], updated_at) if v is not None]
+    return {'updated_at': max(latest, default=None), 'id': max(high_water['id'], match.id)}
+
+
+def _save(final_stats, team_stats, matches, high_water, stats_path, state_path):
+    _write_json(stats_path, final_stats, indent=2)
+    # 狀態在統計檔之後寫入：中途失敗時下次會從舊狀態重新套用
+    _write_json(state_path, {
+        'season_start': SEASON_START.isoformat(),
+        'high_water': high_water,
+        'matches': matches,
+        'teams': team_stats,
     })
-    
+
+
+def _load_state(state_path, stats_path):
+    if not (os.path.exists(state_path) and os.path.exists(stats_path)):
+        return None
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        with open(stats_path, 'r', encoding='utf-8') as f:
+            final_stats = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get('season_start') != SEASON_START.isoformat():
+        return None
+    return state, final_stats
+
+
+def calculate_current_season_stats(db=None, stats_path=STATS_FILE, state_path=STATE_FILE):
+    """只計算當前賽季 (2025/26) 的統計."""
+
+    own_session = db is None
+    db = db or SessionLocal()
+
+    matches = db.query(Match).filter(
+        Match.match_date >= SEASON_START,
+        Match.status == FINISHED_STATUS
+    ).order_by(Match.id).yield_per(2000)
+
+    team_stats = defaultdict(_new_counters)
+    counted = {}
+    high_water = None
     for match in matches:
-        if match.home_score is None or match.away_score is None:
+        high_water = _high_water(high_water, match)
+        entry = match_entry(match)
+        if entry is None:
             continue
-        
-        home = match.home_team
-        away = match.away_team
-        
-        # 主隊統計
-        team_stats[home]['total_matches'] += 1
-        team_stats[home]['home_matches'] += 1
-        team_stats[home]['goals_scored'] += match.home_score
-        team_stats[home]['goals_conceded'] += match.away_score
-        team_stats[home]['goals_scored_home'] += match.home_score
-        team_stats[home]['goals_conceded_home'] += match.away_score
-        
-        # 客隊統計
-        team_stats[away]['total_matches'] += 1
-        team_stats[away]['away_matches'] += 1
-        team_stats[away]['goals_scored'] += match.away_score
-        team_stats[away]['goals_conceded'] += match.home_score
-        team_stats[away]['goals_scored_away'] += match.away_score
-        team_stats[away]['goals_conceded_away'] += match.home_score
-        
-        # 勝負統計
-        if match.home_score > match.away_score:
-            team_stats[home]['wins'] += 1
-            team_stats[home]['home_wins'] += 1
-            team_stats[away]['losses'] += 1
-            team_stats[away]['away_losses'] += 1
-            home_result = 'W'
-            away_result = 'L'
-        elif match.home_score < match.away_score:
-            team_stats[home]['losses'] += 1
-            team_stats[home]['home_losses'] += 1
-            team_stats[away]['wins'] += 1
-            team_stats[away]['away_wins'] += 1
-            home_result = 'L'
-            away_result = 'W'
-        else:
-            team_stats[home]['draws'] += 1
-            team_stats[home]['home_draws'] += 1
-            team_stats[away]['draws'] += 1
-            team_stats[away]['away_draws'] += 1
-            home_result = 'D'
-            away_result = 'D'
-        
-        # 記錄最近比賽
-        team_stats[home]['recent_matches'].append({
-            'date': match.match_date.isoformat(),
-            'result': home_result,
-            'opponent': away,
-            'home': True,
-        })
-        team_stats[away]['recent_matches'].append({
-            'date': match.match_date.isoformat(),
-            'result': away_result,
-            'opponent': home,
-            'home': False,
-        })
-    
+        apply_match(team_stats, entry)
+        counted[str(match.id)] = entry
+
+    print(f"📊 分析 2025/26 賽季比賽")
+    print(f"   起始日期: {SEASON_START.date()}")
+    print(f"   總比賽數: {len(counted)}\n")
+
     # 計算衍生指標
     final_stats = {}
     for team, stats in team_stats.items():
         if stats['total_matches'] == 0:
             continue
-        
-        # 排序最近比賽
-        stats['recent_matches'].sort(key=lambda x: x['date'], reverse=True)
-        recent_5 = stats['recent_matches'][:5]
-        recent_form = ''.join([m['result'] for m in recent_5])
-        
-        # 計算積分 (W=3, D=1, L=0)
-        points = stats['wins'] * 3 + stats['draws'] * 1
-        
-        final_stats[team] = {
-            # 基本數據
-            'total_matches': stats['total_matches'],
-            'wins': stats['wins'],
-            'draws': stats['draws'],
-            'losses': stats['losses'],
-            'points': points,
-            
-            # 主場數據
-            'home_matches': stats['home_matches'],
-            'home_wins': stats['home_wins'],
-            'home_draws': stats['home_draws'],
-            'home_losses': stats['home_losses'],
-            
-            # 客場數據
-            'away_matches': stats['away_matches'],
-            'away_wins': stats['away_wins'],
-            'away_draws': stats['away_draws'],
-            'away_losses': stats['away_losses'],
-            
-            # 進球數據
-            'goals_scored': stats['goals_scored'],
-            'goals_conceded': stats['goals_conceded'],
-            'goal_difference': stats['goals_scored'] - stats['goals_conceded'],
-            'goals_scored_home': stats['goals_scored_home'],
-            'goals_conceded_home': stats['goals_conceded_home'],
-            'goals_scored_away': stats['goals_scored_away'],
-            'goals_conceded_away': stats['goals_conceded_away'],
-            
-            # 平均數據
-            'avg_goals_scored': round(stats['goals_scored'] / stats['total_matches'], 2),
-            'avg_goals_conceded': round(stats['goals_conceded'] / stats['total_matches'], 2),
-            'avg_goals_scored_home': round(stats['goals_scored_home'] / max(1, stats['home_matches']), 2),
-            'avg_goals_conceded_home': round(stats['goals_conceded_home'] / max(1, stats['home_matches']), 2),
-            'avg_goals_scored_away': round(stats['goals_scored_away'] / max(1, stats['away_matches']), 2),
-            'avg_goals_conceded_away': round(stats['goals_conceded_away'] / max(1, stats['away_matches']), 2),
-            
-            # 勝率
-            'win_rate': round(stats['wins'] / stats['total_matches'], 3),
-            'home_win_rate': round(stats['home_wins'] / max(1, stats['home_matches']), 3),
-            'away_win_rate': round(stats['away_wins'] / max(1, stats['away_matches']), 3),
-            
-            # 近期狀態
-            'recent_form': recent_form,
-        }
-    
+        final_stats[team] = summarize_team(stats)
+    _add_windows(final_stats, counted.values())
+
     # 儲存
-    os.makedirs('data', exist_ok=True)
-    with open('data/team_stats.json', 'w', encoding='utf-8') as f:
-        json.dump(final_stats, f, ensure_ascii=False, indent=2)
-    
+    _save(final_stats, team_stats, counted, high_water, stats_path, state_path)
+
+    print(f"✅ 計算完成！共 {len(final_stats)} 支球隊")
+    print(f"📁 已儲存到 {stats_path}\n")
+
+    if own_session:
+        db.close()
+    return final_stats
+
+
+def _counted_conditions():
+    """SQL version of ``match_entry``'s checks."""
+    return (
+        Match.status == FINISHED_STATUS,
+        Match.match_date >= SEASON_START,
+        Match.home_score.isnot(None),
+        Match.away_score.isnot(None),
+        Match.home_team.isnot(None),
+        Match.away_team.isnot(None),
+    )
+
+
+def _team_sides():
+    """One row per (match, team) of every counted match: the team's side, goals for and against."""
+    counted = _counted_conditions()
+    home = select(
+        Match.id.label('match_id'), Match.match_date.label('match_date'), Match.home_team.label('team'),
+        literal(1).label('is_home'), Match.home_score.label('scored'), Match.away_score.label('conceded'),
+    ).where(*counted)
+    away = select(
+        Match.id, Match.match_date, Match.away_team,
+        literal(0), Match.away_score, Match.home_score,
+    ).where(*counted)
+    return union_all(home, away).subquery('sides')
+
+
+def _counter_columns(rows):
+    """Aggregates of every COUNTER_FIELDS counter over (team, is_home, scored, conceded) rows."""
+    is_home = rows.c.is_home == 1
+    won = rows.c.scored > rows.c.conceded
+    drew = rows.c.scored == rows.c.conceded
+    lost = rows.c.scored < rows.c.conceded
+
+    def count(condition):
+        return func.sum(case((condition, 1), else_=0))
+
+    def total(value, condition):
+        return func.sum(case((condition, value), else_=0))
+
+    return (
+        func.count().label('total_matches'),
+        count(is_home).label('home_matches'),
+        count(~is_home).label('away_matches'),
+        count(won).label('wins'),
+        count(drew).label('draws'),
+        count(lost).label('losses'),
+        count(and_(is_home, won)).label('home_wins'),
+        count(and_(is_home, drew)).label('home_draws'),
+        count(and_(is_home, lost)).label('home_losses'),
+        count(and_(~is_home, won)).label('away_wins'),
+        count(and_(~is_home, drew)).label('away_draws'),
+        count(and_(~is_home, lost)).label('away_losses'),
+        func.sum(rows.c.scored).label('goals_scored'),
+        func.sum(rows.c.conceded).label('goals_conceded'),
+        total(rows.c.scored, is_home).label('goals_scored_home'),
+        total(rows.c.conceded, is_home).label('goals_conceded_home'),
+        total(rows.c.scored, ~is_home).label('goals_scored_away'),
+        total(rows.c.conceded, ~is_home).label('goals_conceded_away'),
+    )
+
+
+def _ranked_sides(sides, as_of=None):
+    """``sides`` numbered per team from the most recent match (same-day matches by id, like summarize_team)."""
+    won = sides.c.scored > sides.c.conceded
+    drew = sides.c.scored == sides.c.conceded
+    query = select(
+        *sides.c,
+        case((won, 'W'), (drew, 'D'), else_='L').label('result'),
+        func.row_number().over(
+            partition_by=sides.c.team, order_by=(sides.c.match_date.desc(), sides.c.match_id)
+        ).label('rank'),
+    )
+    if as_of is not None:
+        query = query.where(sides.c.match_date <= as_of)
+    return query.subquery('ranked')
+
+
+def aggregate_team_counters_sql(db):
+    """
+    Per-team counters computed by the database.
+
+    Two queries over ``matches``: one GROUP BY team for every counter, and
+    one ROW_NUMBER() window for each team's most recent results. Returns
+    counters in the form ``summarize_team`` takes, with ``recent_matches``
+    holding only the matches recent_form needs.
+    """
+    sides = _team_sides()
+    counters = select(sides.c.team, *_counter_columns(sides)).group_by(sides.c.team)
+
+    team_stats = {}
+    for row in db.execute(counters).mappings():
+        stats = {k: int(v) for k, v in row.items() if k != 'team'}
+        stats['recent_matches'] = []
+        team_stats[row['team']] = stats
+
+    # 最近比賽：同日期依比賽 id，與 summarize_team 的排序一致
+    ranked = _ranked_sides(sides)
+    recent = select(ranked.c.team, ranked.c.match_id, ranked.c.match_date, ranked.c.result).where(
+        ranked.c.rank <= RECENT_FORM_MATCHES
+    )
+    for team, match_id, match_date, result in db.execute(recent):
+        team_stats[team]['recent_matches'].append({
+            'match_id': match_id,
+            'date': match_date.isoformat(),
+            'result': result,
+        })
+    return team_stats
+
+
+def rolling_windows_sql(db, as_of=None):
+    """
+    ``rolling_windows`` computed by the database.
+
+    Each team's matches are numbered from the most recent with the same
+    ROW_NUMBER() window as the recent form; last N matches is rank <= N,
+    last N days is a date cutoff. One UNION ALL query aggregates every
+    window per team and one more reads the few most recent results each
+    window's form needs, so no per-match rows are transferred.
+    """
+    if as_of is None:
+        as_of = db.scalar(select(func.max(Match.match_date)).where(*_counted_conditions()))
+        if as_of is None:
+            return {}
+    ranked = _ranked_sides(_team_sides(), as_of)
+    conditions = {f'last_{n}': ranked.c.rank <= n for n in MATCH_WINDOWS}
+    for d in DAY_WINDOWS:
+        conditions[f'last_{d}_days'] = ranked.c.match_date > as_of - timedelta(days=d)
+    conditions['season'] = None
+
+    parts = []
+    for window, condition in conditions.items():
+        part = select(literal(window).label('window'), ranked.c.team, *_counter_columns(ranked))
+        if condition is not None:
+            part = part.where(condition)
+        parts.append(part.group_by(ranked.c.team))
+
+    counters = defaultdict(dict)
+    for row in db.execute(union_all(*parts)).mappings():
+        counters[row['team']][row['window']] = {f: int(row[f]) for f in COUNTER_FIELDS}
+
+    # 每個視窗的近期狀態：視窗內最近的幾場
+    recent = defaultdict(list)
+    form_rows = select(ranked.c.team, ranked.c.rank, ranked.c.match_date, ranked.c.result).where(
+        ranked.c.rank <= RECENT_FORM_MATCHES
+    ).order_by(ranked.c.team, ranked.c.rank)
+    for team, rank, match_date, result in db.execute(form_rows):
+        recent[team].append((rank, match_date, result))
+
+    cutoffs = {f'last_{d}_days': as_of - timedelta(days=d) for d in DAY_WINDOWS}
+    empty = {f: 0 for f in COUNTER_FIELDS}
+    windows = {}
+    for team, team_counters in counters.items():
+        windows[team] = {}
+        for window in WINDOWS:
+            if window in cutoffs:
+                form = [r for rank, date, r in recent[team] if date > cutoffs[window]]
+            elif window == 'season':
+                form = [r for rank, date, r in recent[team]]
+            else:
+                form = [r for rank, date, r in recent[team] if rank <= int(window.split('_')[1])]
+            windows[team][window] = summarize_counters(team_counters.get(window, empty), ''.join(form))
+    return windows
+
+
+def calculate_current_season_stats_sql(db=None, stats_path=STATS_FILE):
+    """
+    與 calculate_current_season_stats 相同的統計，由資料庫彙總.
+
+    No Match objects or per-match rows are loaded: the season counters and
+    every rolling window come from grouped queries. The incremental state
+    file is left as it is.
+    """
+    own_session = db is None
+    db = db or SessionLocal()
+
+    team_stats = aggregate_team_counters_sql(db)
+    final_stats = {team: summarize_team(stats) for team, stats in team_stats.items()}
+    for team, windows in rolling_windows_sql(db).items():
+        if team in final_stats:
+            final_stats[team]['windows'] = windows
+
+    print(f"📊 分析 2025/26 賽季比賽（SQL 彙總）")
+    print(f"   起始日期: {SEASON_START.date()}")
+    print(f"   總比賽數: {sum(s['home_matches'] for s in team_stats.values())}\n")
+
+    _write_json(stats_path, final_stats, indent=2)
+
     print(f"✅ 計算完成！共 {len(final_stats)} 支球隊")
-    print(f"📁 已儲存到 data/team_stats.json\n")
-    
+    print(f"📁 已儲存到 {stats_path}\n")
+
+    if own_session:
+        db.close()
+    return final_stats
+
+
+def update_team_stats_incremental(db=None, stats_path=STATS_FILE, state_path=STATE_FILE):
+    """
+    只套用上次計算後新增或修正的比賽.
+
+    Reads the matches whose updated_at is at or after the stored high-water
+    mark, removes each one's previously counted result from the per-team
+    counters, adds its current result if it still counts, and recomputes
+    only the teams whose counters changed. Without a usable state file it
+    falls back to a full calculation.
+    """
+    loaded = _load_state(state_path, stats_path)
+    if loaded is None:
+        print("⚠️  找不到增量狀態，改為完整計算")
+        return calculate_current_season_stats(db, stats_path, state_path)
+    state, final_stats = loaded
+
+    own_session = db is None
+    db = db or SessionLocal()
+    started = time.time()
+
+    team_stats = defaultdict(_new_counters, state['teams'])
+    counted = state['matches']
+    high_water = state['high_water']
+
+    query = db.query(Match)
+    if high_water is not None:
+        # 沒有 updated_at 的舊資料只能依 id 判斷是否為新比賽
+        changed_rows = and_(Match.updated_at.is_(None), Match.id > high_water['id'])
+        if high_water['updated_at'] is not None:
+            since = datetime.fromisoformat(high_water['updated_at']) - HIGH_WATER_OVERLAP
+            changed_rows = or_(Match.updated_at >= since, changed_rows)
+        query = query.filter(changed_rows)
+
+    affected = set()
+    changed = 0
+    for match in query.order_by(Match.id):
+        high_water = _high_water(high_water, match)
+        key = str(match.id)
+        old, new = counted.get(key), match_entry(match)
+        if old == new:
+            continue
+        changed += 1
+        if old is not None:
+            apply_match(team_stats, old, sign=-1)
+            affected.update(old[1:3])
+            del counted[key]
+        if new is not None:
+            apply_match(team_stats, new)
+            affected.update(new[1:3])
+            counted[key] = new
+
+    for team in affected:
+        stats = team_stats[team]
+        if stats['total_matches'] == 0:
+            team_stats.pop(team)
+            final_stats.pop(team, None)
+        else:
+            final_stats[team] = summarize_team(stats)
+    if changed:
+        # 「最近 N 天」以最後一場比賽為準，新比賽會移動所有球隊的視窗
+        _add_windows(final_stats, counted.values())
+
+    if changed or high_water != state['high_water']:
+        _save(final_stats, team_stats, counted, high_water, stats_path, state_path)
+
+    print(f"⚡ 增量更新：{changed} 場比賽變動，{len(affected)} 支球隊重新計算"
+          f"（{(time.time() - started) * 1000:.0f} ms）")
+
+    if own_session:
+        db.close()
+    return final_stats
+
+
+def print_summary(final_stats):
     # 顯示範例
     print("="*70)
     print("📊 主要球隊統計 (2025/26 賽季)")
     print("="*70)
-    
+
     sample_teams = ['Barcelona', 'Real Madrid', 'Manchester City', 'Liverpool', 'Bayern Munich', 'Arsenal']
     for team in sample_teams:
         if team in final_stats:
@@ -190,14 +664,27 @@ def calculate_current_season_stats():
             print(f"   積分: {s['points']} | 進球: {s['goals_scored']} | 失球: {s['goals_conceded']} | 淨勝球: {s['goal_difference']:+d}")
             print(f"   主場: {s['home_wins']}W {s['home_draws']}D {s['home_losses']}L | 客場: {s['away_wins']}W {s['away_draws']}D {s['away_losses']}L")
             print(f"   近5場: {s['recent_form']}")
-    
+
     print("\n" + "="*70)
-    
-    db.close()
-    return final_stats
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="計算 2025/26 賽季球隊統計")
+    parser.add_argument("--incremental", action="store_true", help="只套用上次計算後新增或修正的比賽")
+    parser.add_argument("--backend", choices=("python", "sql"), default="python",
+                        help="完整計算的方式：python 逐場累計，sql 由資料庫彙總")
+    args = parser.parse_args()
+
     print("🚀 計算 2025/26 賽季球隊統計")
     print("="*70)
-    calculate_current_season_stats()
+    if args.incremental:
+        # 尚未重新執行 init_db 的舊資料庫可能缺少 updated_at 索引
+        from scripts.init_db import add_missing_indexes
+        add_missing_indexes([Match.__table__])
+        final_stats = update_team_stats_incremental()
+    elif args.backend == "sql":
+        final_stats = calculate_current_season_stats_sql()
+    else:
+        final_stats = calculate_current_season_stats()
+    print_summary(final_stats)
     print("\n✅ 完成")
@@ -0,0 +1,60 @@
+"""Compile the trained ensemble into a NumPy-only model file for the API."""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+
+import joblib
+import numpy as np
+
+from app.services.compiled_model import CompiledModel, compile_model
+from app.services.model_registry import COMPILED_MODEL_FILE, DEFAULT_MODEL_FILE
+
+# Random rows used to check the compiled model against the original
+CHECK_ROWS = 5000
+MAX_DIFF = 1e-9
+
+
+def export_model(model_path: str = DEFAULT_MODEL_FILE, out_path: str = COMPILED_MODEL_FILE,
+                 check_rows: int = CHECK_ROWS) -> float:
+    """
+    Compile ``model_path`` and write it to ``out_path``.
+
+    The compiled model is checked against the original on random inputs
+    before it is written, so a serving worker never picks up a file that
+    disagrees with the trained model.
+
+    Returns:
+        Largest probability difference seen in the check
+
+    Raises:
+        TypeError: If the model type cannot be compiled
+        ValueError: If the compiled probabilities differ from the original
+    """
+    model = joblib.load(model_path)
+    compiled = compile_model(model)
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(scale=3.0, size=(check_rows, compiled.n_features_in_))
+    diff = float(np.abs(compiled.predict_proba(X) - model.predict_proba(X)).max())
+    if diff > MAX_DIFF:
+        raise ValueError(f"編譯後模型與原模型機率差異過大: {diff:.3g}")
+
+    # Written to the side and renamed, so the model registry never reads half a file
+    compiled.save(out_path)
+    # Read back what the API will load
+    CompiledModel.load(out_path)
+    return diff
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="將訓練好的模型編譯為 NumPy 陣列格式（API 不需載入 scikit-learn）")
+    parser.add_argument("--model", default=DEFAULT_MODEL_FILE, help="訓練好的模型檔（joblib）")
+    parser.add_argument("--out", default=COMPILED_MODEL_FILE, help="輸出的編譯模型檔（.npz）")
+    args = parser.parse_args()
+
+    print(f"📦 編譯模型: {args.model}")
+    max_diff = export_model(args.model, args.out)
+    print(f"   最大機率差異: {max_diff:.3g}")
+    print(f"✅ 已輸出: {args.out}（{os.path.getsize(args.out) / 1024:.1f} KB）")
@@ -1,8 +1,12 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import requests
 from bs4 import BeautifulSoup
 import csv
 from pathlib import Path
-import json
+from app.services.team_names import team_name_resolver
 
 LEAGUES = [
     {"key": "epl", "url": "https://www.sportsgambler.com/injuries/football/", "top_players_csv": "epl_team_top_players_sofascore_std.csv"},
@@ -25,15 +29,9 @@ def main():
     out_dir = Path(__file__).resolve().parents[1] / "data"
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    _map_file = out_dir / "team_name_map.json"
-    if _map_file.exists():
-        with open(_map_file, "r", encoding="utf-8") as f:
-            team_name_map = json.load(f)
-    else:
-        team_name_map = {}
-
     def map_team_name(team_name):
-        return team_name_map.get(team_name, team_name)
+        # data/team_name_map.json 與其他別名來源合併後的標準名稱
+        return team_name_resolver.standardize(team_name)
 
     headers = {
         "User-Agent": (
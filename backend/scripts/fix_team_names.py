@@ -1,31 +1,23 @@
 ﻿"""Fix team names in fixtures."""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import json
+from app.services.team_names import team_name_resolver
 
 with open('data/real_fixtures.json', 'r', encoding='utf-8') as f:
     fixtures = json.load(f)
 
-# 修正球隊名稱
-fixes = {
-    'Man City': 'Manchester City',
-    'Man United': 'Manchester United',
-    'Stade Brestois 29': 'Brest',
-    'Paris Saint Germain': 'Paris SG',
-    'Ath Madrid': 'Atletico Madrid',
-    'Ath Bilbao': 'Athletic Bilbao',
-    'AS Roma': 'Roma',
-    'AC Milan': 'Milan',
-}
-
+# 修正球隊名稱（對照表見 app/services/team_names.py）
 count = 0
 for f in fixtures:
-    if f['home_team'] in fixes:
-        print(f"修正: {f['home_team']} → {fixes[f['home_team']]}")
-        f['home_team'] = fixes[f['home_team']]
-        count += 1
-    if f['away_team'] in fixes:
-        print(f"修正: {f['away_team']} → {fixes[f['away_team']]}")
-        f['away_team'] = fixes[f['away_team']]
-        count += 1
+    for side in ('home_team', 'away_team'):
+        fixed = team_name_resolver.canonical(f[side])
+        if fixed != f[side]:
+            print(f"修正: {f[side]} → {fixed}")
+            f[side] = fixed
+            count += 1
 
 # 儲存
 with open('data/real_fixtures.json', 'w', encoding='utf-8') as f:
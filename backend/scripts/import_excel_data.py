@@ -7,6 +7,7 @@ import pandas as pd
 from datetime import datetime
 from app.database import SessionLocal
 from app.models.match import Match
+from app.services.team_names import team_name_resolver
 
 # 聯賽映射
 LEAGUE_MAPPING = {
@@ -18,22 +19,9 @@ LEAGUE_MAPPING = {
     'F1': 'Ligue 1',
 }
 
-# 球隊名稱映射（CSV 中的簡稱 → 資料庫完整名稱）
-TEAM_MAPPING = {
-    'Man United': 'Manchester United',
-    'Man City': 'Manchester City',
-    "Nott'm Forest": 'Nottm Forest',
-    'Nottm Forest': 'Nottm Forest',
-    'Newcastle': 'Newcastle',
-    'West Ham': 'West Ham',
-    'Ath Madrid': 'Atletico Madrid',
-    'Ath Bilbao': 'Athletic Bilbao',
-}
-
 def normalize_team_name(name):
-    """標準化球隊名稱."""
-    name = str(name).strip()
-    return TEAM_MAPPING.get(name, name)
+    """標準化球隊名稱（CSV 中的簡稱 → 資料庫完整名稱，見 app/services/team_names.py）."""
+    return team_name_resolver.canonical(name)
 
 def import_csv_file(file_path, league_code):
     """匯入單個 CSV 檔案."""
@@ -4,19 +4,63 @@ import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy import inspect, text
 from app.database import engine, Base
 from app.models.match import Match
 from app.models.team import Team
-from app.models.prediction import Prediction
+from app.models.prediction import Prediction, PredictionStatTotal
+from app.models.rating import EloCheckpoint
+from app.models.feature import MatchFeatures
+from app.database import SessionLocal
+from app.services.feature_store import feature_store
+from app.services.prediction_stats import rebuild_db_totals
 # 匯入其他所有模型...
 
+def add_missing_columns():
+    """create_all 不會修改已存在的表格：補上模型新增的可為空欄位."""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c['name'] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                print(f"   ➕ {table.name}.{column.name}")
+
+
+def add_missing_indexes(tables=None):
+    """create_all 也不會替已存在的表格補索引：建立模型宣告但資料庫尚無的索引."""
+    inspector = inspect(engine)
+    for table in tables if tables is not None else Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=engine)
+                print(f"   🔎 {table.name}: {index.name}")
+
+
 def init_db():
     """Create all tables."""
     print("🗄️  Creating database tables...")
     
-    # 這會根據模型建立所有表格
-    # 如果表格已存在，會自動加入新欄位（在大部分情況下）
+    # 這會根據模型建立所有表格，已存在的表格補上新增的欄位與索引
     Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+    add_missing_indexes()
+    
+    # 重新計算 /api/history/stats 使用的累計統計與每場比賽的特徵向量
+    db = SessionLocal()
+    try:
+        rebuild_db_totals(db)
+        print(f"   🧮 {feature_store.refresh(db)} match feature vectors")
+    finally:
+        db.close()
     
     print("✅ Database tables created successfully!")
 
@@ -0,0 +1,274 @@
+"""Vectorized batch version of predict_match for many fixtures at once."""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.team_names import team_name_resolver
+from app.services.team_stats_store import team_stats_store
+from scripts.predict_match import calculate_form_score, normalize_team_name
+
+HOME_ADVANTAGE = 10
+# strength_diff thresholds and the draw probability below each of them
+DRAW_THRESHOLDS = (5, 10, 15, 20)
+DRAW_PROBS = (35, 30, 25, 20)
+DRAW_PROB_FLOOR = 15
+
+PREDICTIONS = ('home_win', 'draw', 'away_win')
+HOME_WIN, DRAW, AWAY_WIN = 0, 1, 2
+
+
+def py_round(values, ndigits: int) -> np.ndarray:
+    """
+    Elementwise Python ``round(x, ndigits)``.
+
+    np.round scales, rounds and scales back, which can land on the other
+    side of an exact tie; the few values close to a tie are rounded with
+    Python's round() so results are bit-identical to the scalar code.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, ndigits)
+    scaled = values * 10 ** ndigits
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(v, ndigits) for v in values[near_tie].tolist()]
+    return rounded
+
+
+class TeamStrengthTable:
+    """
+    calculate_team_strength for every team, as arrays indexed by team position.
+
+    Attributes:
+        names: Team names; ``index[name]`` is the team's position
+        form_scores: calculate_form_score per team (Python values, 50 for no form)
+        home_*/away_*: Rounded strength components when playing home/away,
+            plus the raw goals-scored (``*_avg_scored``) and goals-conceded
+            averages
+    """
+
+    def __init__(self, team_stats: Dict[str, Dict]):
+        self.names = list(team_stats)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.matcher = team_name_resolver.matcher(self.names)
+        records = [team_stats[name] for name in self.names]
+        self.recent_forms = [r.get('recent_form', 'N/A') for r in records]
+        self.form_scores = [calculate_form_score(r.get('recent_form', '')) for r in records]
+        form = np.array(self.form_scores, dtype=np.float64)
+
+        def column(key):
+            return np.array([r.get(key, 0) for r in records], dtype=np.float64)
+
+        for side in ('home', 'away'):
+            win_rate = column(f'{side}_win_rate') * 100
+            scored = column(f'avg_goals_scored_{side}')
+            conceded = column(f'avg_goals_conceded_{side}')
+            attack = np.minimum(scored / 3.0 * 100, 100)
+            defense = np.maximum(0, (1 - conceded / 3.0) * 100)
+            total = form * 0.30 + win_rate * 0.30 + attack * 0.20 + defense * 0.20
+            setattr(self, f'{side}_total', py_round(total, 1))
+            setattr(self, f'{side}_win_rate', py_round(win_rate, 1))
+            setattr(self, f'{side}_avg_goals', py_round(scored, 2))
+            setattr(self, f'{side}_avg_scored', scored)
+            setattr(self, f'{side}_avg_conceded', conceded)
+
+    def __len__(self):
+        return len(self.names)
+
+    def lookup(self, team: str) -> Optional[int]:
+        """Position of a team (any known spelling), or None if unknown."""
+        name = self.matcher.resolve(team)
+        return self.index[name] if name is not None else None
+
+
+def _draw_probability(strength_diff: np.ndarray) -> np.ndarray:
+    conditions = [strength_diff < t for t in DRAW_THRESHOLDS]
+    return np.select(conditions, DRAW_PROBS, DRAW_PROB_FLOOR).astype(np.float64)
+
+
+def _expected_goals(prediction, confidence, home_avg, away_avg) -> Tuple[np.ndarray, np.ndarray]:
+    """predict_score_improved for every fixture."""
+    high = confidence > 70
+    mid = ~high & (confidence > 60)
+
+    # 主隊贏
+    home_base = np.maximum(1, np.rint(home_avg * 1.2))
+    away_base = np.maximum(0, np.rint(away_avg * 0.7))
+    hw_home = np.select([high, mid], [np.minimum(4, home_base + 1), home_base], np.maximum(1, home_base - 1))
+    hw_away = np.select([high, mid], [np.maximum(0, away_base - 1), away_base], np.maximum(0, away_base))
+    hw_home = np.where(hw_home <= hw_away, hw_away + 1, hw_home)
+
+    # 客隊贏
+    home_base = np.maximum(0, np.rint(home_avg * 0.7))
+    away_base = np.maximum(1, np.rint(away_avg * 1.2))
+    aw_away = np.select([high, mid], [np.minimum(4, away_base + 1), away_base], np.maximum(1, away_base - 1))
+    aw_home = np.select([high, mid], [np.maximum(0, home_base - 1), home_base], np.maximum(0, home_base))
+    aw_away = np.where(aw_away <= aw_home, aw_home + 1, aw_away)
+
+    # 平局
+    avg_total = (home_avg + away_avg) / 2
+    draw_goals = np.select([avg_total < 1.0, avg_total < 2.5], [0, 1], 2)
+
+    home_goals = np.select([prediction == HOME_WIN, prediction == AWAY_WIN], [hw_home, aw_home], draw_goals)
+    away_goals = np.select([prediction == HOME_WIN, prediction == AWAY_WIN], [hw_away, aw_away], draw_goals)
+    return np.clip(home_goals, 0, 5).astype(np.int64), np.clip(away_goals, 0, 5).astype(np.int64)
+
+
+def predict_batch(table: TeamStrengthTable, home_idx, away_idx) -> Dict[str, np.ndarray]:
+    """
+    Predict every (home_idx[i], away_idx[i]) fixture at once.
+
+    Args:
+        table: Team strengths the indices refer to
+        home_idx: Home team positions in ``table``
+        away_idx: Away team positions in ``table``
+
+    Returns:
+        Dict of arrays: prediction (HOME_WIN/DRAW/AWAY_WIN), confidence,
+        home_win, draw, away_win, home_total, away_total, home_goals, away_goals
+    """
+    home_idx = np.asarray(home_idx, dtype=np.intp)
+    away_idx = np.asarray(away_idx, dtype=np.intp)
+
+    home_total = table.home_total[home_idx] + HOME_ADVANTAGE
+    away_total = table.away_total[away_idx]
+    total_strength = home_total + away_total
+
+    positive = total_strength > 0
+    safe_total = np.where(positive, total_strength, 1.0)
+    home_base_prob = np.where(positive, (home_total / safe_total) * 100, 50.0)
+    away_base_prob = np.where(positive, (away_total / safe_total) * 100, 50.0)
+
+    draw_prob = _draw_probability(np.abs(home_total - away_total))
+    remaining = 100 - draw_prob
+    home_win_prob = (home_base_prob / (home_base_prob + away_base_prob)) * remaining
+    away_win_prob = remaining - home_win_prob
+
+    home_win_prob = py_round(home_win_prob, 1)
+    away_win_prob = py_round(away_win_prob, 1)
+    draw_prob = py_round(100 - home_win_prob - away_win_prob, 1)
+
+    is_home = (home_win_prob > away_win_prob) & (home_win_prob > draw_prob)
+    is_away = ~is_home & (away_win_prob > home_win_prob) & (away_win_prob > draw_prob)
+    prediction = np.select([is_home, is_away], [HOME_WIN, AWAY_WIN], DRAW)
+    confidence = np.select([is_home, is_away], [home_win_prob, away_win_prob], draw_prob)
+
+    home_goals, away_goals = _expected_goals(
+        prediction, confidence, table.home_avg_goals[home_idx], table.away_avg_goals[away_idx]
+    )
+    return {
+        'prediction': prediction,
+        'confidence': py_round(confidence, 1),
+        'home_win': home_win_prob,
+        'draw': draw_prob,
+        'away_win': away_win_prob,
+        'home_total': table.home_total[home_idx],
+        'away_total': table.away_total[away_idx],
+        'home_goals': home_goals,
+        'away_goals': away_goals,
+    }
+
+
+def _result(table: TeamStrengthTable, cells: Dict[str, list], k: int, h: int, a: int) -> Dict:
+    """predict_match's dict for fixture ``k`` of a batch (``cells`` from ndarray.tolist())."""
+    return {
+        'prediction': PREDICTIONS[cells['prediction'][k]],
+        'confidence': cells['confidence'][k],
+        'probabilities': {
+            'home_win': cells['home_win'][k],
+            'draw': cells['draw'][k],
+            'away_win': cells['away_win'][k],
+        },
+        'expected_score': f"{cells['home_goals'][k]}-{cells['away_goals'][k]}",
+        'analysis': {
+            'home_team': table.names[h],
+            'away_team': table.names[a],
+            'home_form': table.recent_forms[h],
+            'away_form': table.recent_forms[a],
+            'home_form_score': table.form_scores[h],
+            'away_form_score': table.form_scores[a],
+            'home_win_rate': table.home_win_rate[h].item(),
+            'away_win_rate': table.away_win_rate[a].item(),
+            'home_avg_goals': table.home_avg_goals[h].item(),
+            'away_avg_goals': table.away_avg_goals[a].item(),
+            'home_total_score': cells['home_total'][k],
+            'away_total_score': cells['away_total'][k],
+        },
+    }
+
+
+class MatchupMatrix:
+    """
+    Every home/away pairing of a TeamStrengthTable, predicted once.
+
+    ``arrays[field]`` is an N x N array (row = home team, column = away
+    team) of each predict_batch output; ``lookup`` returns the
+    predict_match dict of one pairing without computing anything.
+    """
+
+    def __init__(self, table: TeamStrengthTable):
+        n = len(table)
+        home_idx, away_idx = np.divmod(np.arange(n * n), n)
+        batch = predict_batch(table, home_idx, away_idx)
+        self.table = table
+        self.size = n
+        self.arrays = {field: values.reshape(n, n) for field, values in batch.items()}
+        self._cells = {field: values.tolist() for field, values in batch.items()}
+
+    def lookup(self, home_idx: int, away_idx: int) -> Dict:
+        """predict_match result for one pairing of team positions."""
+        return _result(self.table, self._cells, home_idx * self.size + away_idx, home_idx, away_idx)
+
+
+def predict_fixture(home_team: str, away_team: str) -> Dict:
+    """
+    predict_match via the shared matchup matrix: a lookup, not a computation.
+
+    The matrix is built once per version of data/team_stats.json.
+    """
+    stats = team_stats_store.get()
+    if stats is None:
+        return {'error': '找不到球隊統計檔案'}
+    home, away = stats.resolve(home_team), stats.resolve(away_team)
+    if home is None:
+        return {'error': f'找不到球隊統計: {normalize_team_name(home_team)}'}
+    if away is None:
+        return {'error': f'找不到球隊統計: {normalize_team_name(away_team)}'}
+    matrix = stats.matchup_matrix()
+    return matrix.lookup(matrix.table.index[home.name], matrix.table.index[away.name])
+
+
+def predict_matches(fixtures: Iterable[Tuple[str, str]], team_stats: Optional[Dict[str, Dict]] = None) -> List[Dict]:
+    """
+    predict_match for a list of (home_team, away_team) fixtures in one batch.
+
+    Returns one dict per fixture, identical to what predict_match returns
+    (including the error dicts for unknown teams or a missing stats file).
+    Without ``team_stats`` every fixture is looked up in the shared
+    matchup matrix.
+    """
+    if team_stats is None:
+        return [predict_fixture(h, a) for h, a in fixtures]
+
+    fixtures = list(fixtures)
+    table = TeamStrengthTable(team_stats)
+    results: List[Optional[Dict]] = [None] * len(fixtures)
+    valid, home_idx, away_idx = [], [], []
+    for i, (home, away) in enumerate(fixtures):
+        h, a = table.lookup(home), table.lookup(away)
+        if h is None:
+            results[i] = {'error': f'找不到球隊統計: {normalize_team_name(home)}'}
+        elif a is None:
+            results[i] = {'error': f'找不到球隊統計: {normalize_team_name(away)}'}
+        else:
+            valid.append(i)
+            home_idx.append(h)
+            away_idx.append(a)
+
+    cells = {k: v.tolist() for k, v in predict_batch(table, home_idx, away_idx).items()}
+    for j, i in enumerate(valid):
+        results[i] = _result(table, cells, j, home_idx[j], away_idx[j])
+    return results
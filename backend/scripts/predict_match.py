@@ -3,23 +3,11 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import json
-
-TEAM_NAME_MAPPING = {
-    'Man City': 'Manchester City',
-    'Man United': 'Manchester United',
-    'Man Utd': 'Manchester United',
-    'AC Milan': 'Milan',
-    'AS Roma': 'Roma',
-    'Paris Saint Germain': 'Paris SG',
-    'PSG': 'Paris SG',
-    'Stade Brestois 29': 'Brest',
-    'Ath Madrid': 'Atletico Madrid',
-    'Ath Bilbao': 'Athletic Bilbao',
-}
+from app.services.team_names import team_name_resolver
+from app.services.team_stats_store import team_stats_store
 
 def normalize_team_name(name):
-    return TEAM_NAME_MAPPING.get(name, name)
+    return team_name_resolver.canonical(name)
 
 def calculate_form_score(form_string):
     if not form_string:
@@ -137,25 +125,39 @@ def predict_score_improved(home_strength, away_strength, confidence, prediction)
     
     return f"{home_goals}-{away_goals}"
 
-def predict_match(home_team, away_team):
-    """預測比賽結果（修正版）."""
+def predict_match(home_team, away_team, window=None):
+    """
+    預測比賽結果（修正版）.
     
-    home_team = normalize_team_name(home_team)
-    away_team = normalize_team_name(away_team)
+    window 指定使用哪個統計視窗（如 'last_10'、'last_30_days'，
+    見 calculate_team_stats.WINDOWS）；預設為整個賽季的統計。
+    """
     
-    try:
-        with open('data/team_stats.json', 'r', encoding='utf-8') as f:
-            team_stats = json.load(f)
-    except FileNotFoundError:
+    # 球隊統計只在檔案變更時重新載入，別名已預先解析
+    team_stats = team_stats_store.get()
+    if team_stats is None:
         return {'error': '找不到球隊統計檔案'}
     
-    if home_team not in team_stats:
-        return {'error': f'找不到球隊統計: {home_team}'}
-    if away_team not in team_stats:
-        return {'error': f'找不到球隊統計: {away_team}'}
+    home_stats = team_stats.resolve(home_team)
+    away_stats = team_stats.resolve(away_team)
+    
+    if home_stats is None:
+        return {'error': f'找不到球隊統計: {normalize_team_name(home_team)}'}
+    if away_stats is None:
+        return {'error': f'找不到球隊統計: {normalize_team_name(away_team)}'}
+    home_team = home_stats.name
+    away_team = away_stats.name
+    
+    if window is not None:
+        home_stats = (home_stats.get('windows') or {}).get(window)
+        away_stats = (away_stats.get('windows') or {}).get(window)
+        if home_stats is None:
+            return {'error': f'找不到球隊 {window} 統計: {home_team}'}
+        if away_stats is None:
+            return {'error': f'找不到球隊 {window} 統計: {away_team}'}
     
-    home_strength = calculate_team_strength(team_stats[home_team], is_home=True)
-    away_strength = calculate_team_strength(team_stats[away_team], is_home=False)
+    home_strength = calculate_team_strength(home_stats, is_home=True)
+    away_strength = calculate_team_strength(away_stats, is_home=False)
     
     home_advantage = 10
     home_total = home_strength['total'] + home_advantage
@@ -215,8 +217,8 @@ def predict_match(home_team, away_team):
         'analysis': {
             'home_team': home_team,
             'away_team': away_team,
-            'home_form': team_stats[home_team].get('recent_form', 'N/A'),
-            'away_form': team_stats[away_team].get('recent_form', 'N/A'),
+            'home_form': home_stats.get('recent_form', 'N/A'),
+            'away_form': away_stats.get('recent_form', 'N/A'),
             'home_form_score': home_strength['form'],
             'away_form_score': away_strength['form'],
             'home_win_rate': home_strength['win_rate'],
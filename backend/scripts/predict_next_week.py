@@ -4,7 +4,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import json
-from scripts.predict_match import predict_match
+from scripts.predict_batch import predict_matches
 
 # 手動輸入未來賽程（使用正確的球隊名稱）
 NEXT_WEEK_FIXTURES = [
@@ -121,13 +121,13 @@ def predict_next_week():
     failed = 0
     failed_matches = []
     
-    for fixture in NEXT_WEEK_FIXTURES:
+    results = predict_matches([(f['home_team'], f['away_team']) for f in NEXT_WEEK_FIXTURES])
+    
+    for fixture, result in zip(NEXT_WEEK_FIXTURES, results):
         print(f"\n📅 {fixture['date']} | {fixture['league']}")
         print(f"⚽ {fixture['home_team']} vs {fixture['away_team']}")
         print("-"*70)
         
-        result = predict_match(fixture['home_team'], fixture['away_team'])
-        
         if 'error' in result:
             print(f"   ❌ {result['error']}")
             failed += 1
@@ -4,6 +4,7 @@ import os
 import sys
 import logging
 from app.services.logging_config import configure_logging
+from app.services.snapshot_format import write_snapshot
 
 # Ensure centralized logging configured
 configure_logging()
@@ -11,7 +12,8 @@ logger = logging.getLogger(__name__)
 
 sys.path.insert(0, 'scripts')
 
-from predict_match import predict_match
+from predict_batch import predict_matches
+from score_grid import predict_markets
 
 # 嘗試載入 AI 模組
 try:
@@ -38,16 +40,18 @@ def predict_all_fixtures():
     
     logger.info(f"🤖 開始預測 {total} 場比賽（包含 AI 分析）...\n")
     
-    for idx, fixture in enumerate(fixtures, 1):
+    # 基礎預測與比分盤口（波膽、大小球、兩隊皆進球）一次批次計算，AI 分析仍逐場進行
+    pairs = [(f['home_team'], f['away_team']) for f in fixtures]
+    basic_preds = predict_matches(pairs)
+    markets = predict_markets(pairs)
+    
+    for idx, (fixture, basic_pred, fixture_markets) in enumerate(zip(fixtures, basic_preds, markets), 1):
         home_team = fixture['home_team']
         away_team = fixture['away_team']
         
         logger.info(f"[{idx}/{total}] {home_team} vs {away_team}")
         
         try:
-            # 取得基礎預測
-            basic_pred = predict_match(home_team, away_team)
-            
             if "error" in basic_pred:
                 logger.warning(f"  ⚠️  跳過")
                 continue
@@ -77,15 +81,24 @@ def predict_all_fixtures():
                 "home_team": home_team,
                 "away_team": away_team,
                 "prediction": basic_pred,
+                "markets": fixture_markets,
                 "ai_analysis": ai_analysis
             })
             
         except Exception as e:
             logger.exception(f"  ❌ 錯誤: {e}")
     
-    # 儲存
-    with open('data/final_predictions.json', 'w', encoding='utf-8') as f:
+    # 儲存（先寫入暫存檔再原子替換，API 的快照重新載入不會讀到寫到一半的檔案）
+    tmp_path = 'data/final_predictions.json.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
         json.dump(predictions, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, 'data/final_predictions.json')
+    
+    # 同步寫出可 memory-map 的二進位快照，API 優先讀取此檔
+    try:
+        write_snapshot('data/final_predictions.bin', predictions)
+    except ValueError as e:
+        logger.warning(f"⚠️  無法寫出二進位快照，API 將改讀 JSON: {e}")
     
     logger.info(f"\n✅ 完成！成功: {len(predictions)}/{total}, AI: {ai_count}/{len(predictions)}")
 
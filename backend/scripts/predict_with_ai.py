@@ -5,7 +5,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import json
 from groq import Groq
-from scripts.predict_match import predict_match
+from scripts.predict_batch import predict_fixture
 
 def get_ai_analysis(home_team, away_team, basic_prediction):
     """
@@ -107,8 +107,8 @@ def predict_match_with_ai(home_team, away_team):
     print(f"🔍 分析比賽: {home_team} vs {away_team}")
     print("📊 執行基礎數據分析...")
     
-    # 1. 基礎預測
-    basic_result = predict_match(home_team, away_team)
+    # 1. 基礎預測（查詢預先計算的對戰矩陣）
+    basic_result = predict_fixture(home_team, away_team)
     
     if 'error' in basic_result:
         return basic_result
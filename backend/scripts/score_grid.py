@@ -0,0 +1,152 @@
+"""Correct-score probability grids and the betting markets derived from them."""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from scripts.predict_batch import TeamStrengthTable
+
+MAX_GOALS = 10
+TOTAL_LINES = (0.5, 1.5, 2.5, 3.5, 4.5)
+# Total-goals lines kept in the predictions export
+EXPORT_LINES = (1.5, 2.5, 3.5)
+
+
+def expected_goals(table: TeamStrengthTable, home_idx, away_idx) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Expected goals per fixture from attack/defence averages.
+
+    The home side's rate is the mean of its home scoring average and the
+    away side's away conceding average (and vice versa for the away side),
+    both unrounded.
+    """
+    home_idx = np.asarray(home_idx, dtype=np.intp)
+    away_idx = np.asarray(away_idx, dtype=np.intp)
+    home_xg = (table.home_avg_scored[home_idx] + table.away_avg_conceded[away_idx]) / 2
+    away_xg = (table.away_avg_scored[away_idx] + table.home_avg_conceded[home_idx]) / 2
+    return home_xg, away_xg
+
+
+def poisson_pmf(rates, max_goals: int = MAX_GOALS) -> np.ndarray:
+    """P(goals = k) for k = 0..max_goals, one row per rate (rates of 0 are fine)."""
+    rates = np.asarray(rates, dtype=np.float64)
+    k = np.arange(1, max_goals + 1)
+    steps = rates[:, None] / k
+    pmf = np.empty((len(rates), max_goals + 1))
+    pmf[:, 0] = 1.0
+    pmf[:, 1:] = np.cumprod(steps, axis=1)
+    return pmf * np.exp(-rates)[:, None]
+
+
+def score_grid(home_xg, away_xg, max_goals: int = MAX_GOALS) -> np.ndarray:
+    """
+    Score-probability grids of shape (fixtures, max_goals + 1, max_goals + 1).
+
+    ``grid[f, i, j]`` is the probability fixture ``f`` ends i-j, with home
+    and away goals independent Poisson. Each grid is renormalized so the
+    mass beyond ``max_goals`` is spread over the cells that are kept.
+    """
+    grid = np.einsum('fi,fj->fij', poisson_pmf(home_xg, max_goals), poisson_pmf(away_xg, max_goals))
+    return grid / grid.sum(axis=(1, 2), keepdims=True)
+
+
+def grid_markets(grid: np.ndarray, lines: Sequence[float] = TOTAL_LINES) -> Dict[str, np.ndarray]:
+    """
+    Markets for every grid in one pass.
+
+    Returns:
+        Dict of arrays over fixtures: home_win, draw, away_win, btts,
+        over_<line>/under_<line> per total-goals line, and the most likely
+        score as most_likely_home, most_likely_away, most_likely_prob
+    """
+    n = grid.shape[1]
+    home_goals, away_goals = np.indices((n, n))
+    total = home_goals + away_goals
+    markets = {
+        'home_win': (grid * (home_goals > away_goals)).sum(axis=(1, 2)),
+        'draw': np.trace(grid, axis1=1, axis2=2),
+        'away_win': (grid * (home_goals < away_goals)).sum(axis=(1, 2)),
+        'btts': grid[:, 1:, 1:].sum(axis=(1, 2)),
+    }
+    for line in lines:
+        over = (grid * (total > line)).sum(axis=(1, 2))
+        markets[f'over_{line}'] = over
+        markets[f'under_{line}'] = 1 - over
+    flat = grid.reshape(len(grid), -1)
+    best = flat.argmax(axis=1)
+    markets['most_likely_home'], markets['most_likely_away'] = np.divmod(best, n)
+    markets['most_likely_prob'] = flat[np.arange(len(flat)), best]
+    return markets
+
+
+def slate_markets(table: TeamStrengthTable, home_idx, away_idx, max_goals: int = MAX_GOALS) -> Dict[str, np.ndarray]:
+    """Expected goals, score grids and markets for a whole slate of fixtures at once."""
+    home_xg, away_xg = expected_goals(table, home_idx, away_idx)
+    markets = grid_markets(score_grid(home_xg, away_xg, max_goals))
+    markets['home_xg'] = home_xg
+    markets['away_xg'] = away_xg
+    return markets
+
+
+def fixture_markets(markets: Dict[str, np.ndarray], i: int) -> Dict:
+    """Markets of fixture ``i`` of a slate as the predictions export stores them (probabilities in %)."""
+    exported = {
+        'home_xg': round(float(markets['home_xg'][i]), 2),
+        'away_xg': round(float(markets['away_xg'][i]), 2),
+        'most_likely_score': f"{int(markets['most_likely_home'][i])}-{int(markets['most_likely_away'][i])}",
+        'most_likely_prob': round(float(markets['most_likely_prob'][i]) * 100, 1),
+        'btts': round(float(markets['btts'][i]) * 100, 1),
+    }
+    for line in EXPORT_LINES:
+        exported[f'over_{line}'] = round(float(markets[f'over_{line}'][i]) * 100, 1)
+    return exported
+
+
+def predict_markets(fixtures: Sequence[Tuple[str, str]], stats=None) -> List[Optional[Dict]]:
+    """
+    fixture_markets for (home_team, away_team) fixtures, computed as one slate.
+
+    Uses the shared team stats (``team_stats_store``) unless ``stats`` is
+    given; a fixture with a team that has no stats gets None.
+    """
+    if stats is None:
+        from app.services.team_stats_store import team_stats_store
+        stats = team_stats_store.get()
+    results: List[Optional[Dict]] = [None] * len(fixtures)
+    if stats is None:
+        return results
+    table = stats.strength_table()
+    valid, home_idx, away_idx = [], [], []
+    for i, (home_team, away_team) in enumerate(fixtures):
+        home, away = stats.resolve(home_team), stats.resolve(away_team)
+        if home is not None and away is not None:
+            valid.append(i)
+            home_idx.append(table.index[home.name])
+            away_idx.append(table.index[away.name])
+    if valid:
+        markets = slate_markets(table, home_idx, away_idx)
+        for j, i in enumerate(valid):
+            results[i] = fixture_markets(markets, j)
+    return results
+
+
+if __name__ == "__main__":
+    import json
+    from app.services.team_stats_store import team_stats_store
+
+    if team_stats_store.get() is None:
+        sys.exit('找不到球隊統計檔案')
+    with open('data/real_fixtures.json', 'r', encoding='utf-8') as f:
+        fixtures = json.load(f)
+
+    markets = predict_markets([(f['home_team'], f['away_team']) for f in fixtures])
+    for fixture, fixture_market in zip(fixtures, markets):
+        if fixture_market is None:
+            continue
+        print(f"⚽ {fixture['home_team']} vs {fixture['away_team']}")
+        print(f"   最可能比分: {fixture_market['most_likely_score']} ({fixture_market['most_likely_prob']:.1f}%)")
+        print(f"   大 2.5: {fixture_market['over_2.5']:.1f}% | "
+              f"兩隊皆進球: {fixture_market['btts']:.1f}%")
@@ -0,0 +1,218 @@
+"""Monte Carlo simulation of the remaining season for the top 5 leagues."""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import csv
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.team_stats_store import TeamStats, team_stats_store
+
+# Same league names as fetch_top5_leagues_fixtures_sofascore.py
+LEAGUES = ("Premier League", "LaLiga", "Bundesliga", "Serie A", "Ligue 1")
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+# Sofascore statuses of fixtures that will not be (re)played
+PLAYED_STATUSES = ("finished", "canceled")
+# Used when a team has no stats, like the uniform odds fallback
+FALLBACK_PROBS = (0.33, 0.34, 0.33)
+TOP_N = 4
+# Direct relegation places; the relegation play-off spot (Bundesliga, Ligue 1) is not counted
+RELEGATED = 3
+RELEGATION_PLACES = {"Premier League": 3, "LaLiga": 3, "Bundesliga": 2, "Serie A": 3, "Ligue 1": 2}
+CHUNK_SIZE = 10_000
+
+
+def fixtures_csv(league_name: str) -> Path:
+    """Path written by save_fixtures_to_csv for a league."""
+    return DATA_DIR / f"{league_name.replace(' ', '_').lower()}_fixtures_sofascore.csv"
+
+
+class LeagueSeason:
+    """
+    One league's teams, starting table and remaining fixtures as arrays.
+
+    Attributes:
+        teams: Team names as written in the fixtures CSV
+        points: Current points per team (from team_stats.json, 0 if unknown)
+        tiebreak: Rank of the current goal difference (higher is better)
+        home/away: Team positions of each remaining fixture
+        home_incidence/away_incidence: (fixtures, teams) one-hot matrices
+        probs: (fixtures, 3) home win / draw / away win probabilities
+        relegated: Number of bottom places that are relegated
+    """
+
+    def __init__(self, name: str, rows: List[Dict], stats: Optional[TeamStats], relegated: int = RELEGATED):
+        self.name = name
+        self.relegated = relegated
+        self.teams: List[str] = []
+        index: Dict[str, int] = {}
+        for row in rows:
+            for team in (row["home"], row["away"]):
+                if team not in index:
+                    index[team] = len(self.teams)
+                    self.teams.append(team)
+
+        records = [stats.resolve(t) if stats is not None else None for t in self.teams]
+        self.points = np.array([r.get("points", 0) if r is not None else 0 for r in records], dtype=np.int64)
+        goal_diff = np.array([r.get("goal_difference", 0) if r is not None else 0 for r in records])
+        self.tiebreak = np.argsort(np.argsort(goal_diff, kind="stable"), kind="stable")
+
+        remaining = [row for row in rows if row["status"] not in PLAYED_STATUSES]
+        self.home = np.array([index[row["home"]] for row in remaining], dtype=np.intp)
+        self.away = np.array([index[row["away"]] for row in remaining], dtype=np.intp)
+        self.home_incidence = np.zeros((len(remaining), len(self.teams)))
+        self.home_incidence[np.arange(len(remaining)), self.home] = 1
+        self.away_incidence = np.zeros((len(remaining), len(self.teams)))
+        self.away_incidence[np.arange(len(remaining)), self.away] = 1
+        self.probs = np.array(
+            [self._probabilities(stats, row["home"], row["away"]) for row in remaining], dtype=np.float64
+        ).reshape(-1, 3)
+
+    @staticmethod
+    def _probabilities(stats: Optional[TeamStats], home: str, away: str) -> Tuple[float, float, float]:
+        """Outcome probabilities from the matchup matrix (predict_match), normalized to 1."""
+        if stats is None:
+            return FALLBACK_PROBS
+        home_record, away_record = stats.resolve(home), stats.resolve(away)
+        if home_record is None or away_record is None:
+            return FALLBACK_PROBS
+        matrix = stats.matchup_matrix()
+        h, a = matrix.table.index[home_record.name], matrix.table.index[away_record.name]
+        p = np.array([matrix.arrays[k][h, a] for k in ("home_win", "draw", "away_win")])
+        return tuple(p / p.sum())
+
+    @classmethod
+    def from_csv(cls, name: str, stats: Optional[TeamStats]) -> Optional["LeagueSeason"]:
+        path = fixtures_csv(name)
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        return cls(name, rows, stats, RELEGATION_PLACES.get(name, RELEGATED)) if rows else None
+
+
+def simulate_chunk(season: LeagueSeason, n_sims: int, seed: np.random.SeedSequence) -> np.ndarray:
+    """
+    Play the remaining fixtures ``n_sims`` times.
+
+    Returns:
+        (teams, teams) array: how often each team finished in each position
+    """
+    rng = np.random.default_rng(seed)
+    n_teams = len(season.teams)
+
+    # Every fixture of every simulation drawn at once
+    u = rng.random((n_sims, len(season.home)))
+    home_win = u < season.probs[:, 0]
+    draw = ~home_win & (u < season.probs[:, 0] + season.probs[:, 1])
+    away_win = ~home_win & ~draw
+    home_points = (3 * home_win + draw).astype(np.float64)
+    away_points = (3 * away_win + draw).astype(np.float64)
+
+    # (sims, fixtures) @ (fixtures, teams) one-hot incidence sums each team's points
+    points = season.points + home_points @ season.home_incidence + away_points @ season.away_incidence
+
+    # Points first, then current goal difference, then a random draw
+    key = points + (season.tiebreak + rng.random((n_sims, n_teams))) / (n_teams + 1)
+    order = np.argsort(-key, axis=1)
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(n_teams)[None, :], axis=1)
+
+    cells = np.arange(n_teams) * n_teams + positions
+    return np.bincount(cells.ravel(), minlength=n_teams * n_teams).reshape(n_teams, n_teams)
+
+
+def _run_task(task):
+    season, n_sims, seed = task
+    return season.name, simulate_chunk(season, n_sims, seed)
+
+
+def simulate_leagues(
+    seasons: List[LeagueSeason],
+    n_sims: int,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Dict[str, Dict]:
+    """
+    Simulate every league ``n_sims`` times in a process pool.
+
+    Work is split by league and by chunks of ``chunk_size`` simulations.
+    Each chunk gets its own child of ``SeedSequence(seed)`` assigned in
+    task order, so a given seed yields the same result for any number of
+    workers.
+
+    Returns:
+        Dict of league name to {team: position/title/top-4/relegation probabilities}
+    """
+    root = np.random.SeedSequence(seed)
+    tasks = []
+    for season in seasons:
+        for start in range(0, n_sims, chunk_size):
+            tasks.append([season, min(chunk_size, n_sims - start)])
+    for task, child in zip(tasks, root.spawn(len(tasks))):
+        task.append(child)
+
+    totals = {season.name: np.zeros((len(season.teams), len(season.teams)), dtype=np.int64) for season in seasons}
+    if workers == 1:
+        for name, counts in map(_run_task, tasks):
+            totals[name] += counts
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for name, counts in pool.map(_run_task, tasks):
+                totals[name] += counts
+
+    report = {}
+    for season in seasons:
+        probs = totals[season.name] / n_sims
+        n_teams = len(season.teams)
+        report[season.name] = {
+            team: {
+                "current_points": int(season.points[i]),
+                "position_probabilities": [round(p, 4) for p in probs[i].tolist()],
+                "expected_position": round(float((probs[i] * np.arange(1, n_teams + 1)).sum()), 2),
+                "title": round(float(probs[i, 0]), 4),
+                "top4": round(float(probs[i, :TOP_N].sum()), 4),
+                "relegation": round(float(probs[i, n_teams - season.relegated:].sum()), 4),
+            }
+            for i, team in enumerate(season.teams)
+        }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="模擬剩餘賽季，計算各隊最終排名機率")
+    parser.add_argument("--simulations", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    stats = team_stats_store.get()
+    if stats is None:
+        print("⚠️  找不到球隊統計檔案，所有比賽使用平均機率")
+    seasons = [s for s in (LeagueSeason.from_csv(name, stats) for name in LEAGUES) if s is not None]
+    if not seasons:
+        sys.exit("找不到任何聯賽賽程 CSV，請先執行 fetch_top5_leagues_fixtures_sofascore.py")
+
+    started = time.time()
+    report = simulate_leagues(seasons, args.simulations, seed=args.seed, workers=args.workers)
+    print(f"✅ {len(seasons)} 個聯賽 × {args.simulations} 次模擬，耗時 {time.time() - started:.1f} 秒")
+
+    for league, teams in report.items():
+        print(f"\n=== {league} ===")
+        ranked = sorted(teams.items(), key=lambda t: t[1]["expected_position"])
+        for team, r in ranked:
+            print(f"{team:<28} 預期名次 {r['expected_position']:>5}  冠軍 {r['title'] * 100:5.1f}%  "
+                  f"前四 {r['top4'] * 100:5.1f}%  降級 {r['relegation'] * 100:5.1f}%")
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    with open(DATA_DIR / "season_simulation.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n📁 已儲存到 {DATA_DIR / 'season_simulation.json'}")
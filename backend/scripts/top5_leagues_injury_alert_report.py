@@ -1,6 +1,10 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import csv
 from pathlib import Path
-import unidecode
+from app.services.team_names import fold_name
 
 LEAGUES = [
     "epl",
@@ -11,8 +15,8 @@ LEAGUES = [
 ]
 
 def norm_name(name):
-    """轉小寫 + 去空白 + 去 accent（重音）"""
-    return unidecode.unidecode(name or "").lower().strip()
+    """轉小寫 + 去空白 + 去 accent（重音），與球隊名稱解析共用同一套規則"""
+    return fold_name(name)
 
 def load_csv(filepath):
     rows = []
@@ -28,7 +32,7 @@ def build_injury_lookup(injuries):
     # 還支援沒 player_id 的情況
     lookup_by_name_team = {}
     for row in injuries:
-        key = (norm_name(row.get("player", "")), row.get("team_std", "").lower().strip())
+        key = (norm_name(row.get("player", "")), norm_name(row.get("team_std", "")))
         lookup_by_name_team[key] = row
     return lookup_by_pid, lookup_by_name_team
 
@@ -41,7 +45,7 @@ def generate_alerts(top_players, injury_lookup_by_pid, injury_lookup_by_name_tea
         if pid and pid in injury_lookup_by_pid:
             found = injury_lookup_by_pid[pid]
         else:
-            key = (norm_name(player.get("player_name", "")), player.get("team_std","").lower().strip())
+            key = (norm_name(player.get("player_name", "")), norm_name(player.get("team_std", "")))
             found = injury_lookup_by_name_team.get(key, None)
         if found:
             alerts.append({
@@ -1,18 +1,16 @@
-import json
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import pandas as pd
 from pathlib import Path
+from app.services.team_names import team_name_resolver
 
 data_dir = Path(__file__).resolve().parents[1] / "data"
 
-_map_file = data_dir / "team_name_map.json"
-if _map_file.exists():
-    with open(_map_file, "r", encoding="utf-8") as f:
-        team_name_map = json.load(f)
-else:
-    team_name_map = {}
-
 def map_team_name(team_name):
-    return team_name_map.get(team_name, team_name)
+    # data/team_name_map.json 與其他別名來源合併後的標準名稱
+    return team_name_resolver.standardize(team_name)
 
 for csv_file in data_dir.glob("*_team_top_players_sofascore.csv"):
     std_csv = csv_file.with_name(csv_file.stem + "_std.csv")
@@ -1,13 +1,19 @@
 """API endpoint tests."""
+import json
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker
+import app.main as main_module
 from app.main import app
 from app.database import Base, get_db
 from app.models.team import Team
 from app.models.match import Match, MatchStatus
 from app.models.prediction import Prediction, PredictionResult
+from app.models.feature import MatchFeatures
+from app.schemas.prediction import MAX_BATCH_SIZE
+from app.services.prediction_store import PredictionSnapshotStore
 from datetime import datetime, timedelta, timezone
 
 # Setup test database
@@ -197,6 +203,107 @@ def test_create_prediction():
     assert response2.status_code == 200
     data2 = response2.json()
     assert data["id"] == data2["id"]
+    assert data2["prediction"]["model_version"] == data["prediction"]["model_version"] is not None
+    
+    # The prediction was made from the stored feature vector, with the team statistics
+    db = TestingSessionLocal()
+    features = db.query(MatchFeatures).filter(MatchFeatures.match_id == match_id).one()
+    db.close()
+    assert json.loads(features.vector)[3:7] == [60, 55, 35, 25]
+
+
+def test_create_predictions_batch():
+    """Test predicting several matches in one request."""
+    db = TestingSessionLocal()
+    
+    team1 = Team(name="Inter", league="ITA_SA", current_points=50, current_gd=20)
+    team2 = Team(name="Napoli", league="ITA_SA", current_points=48, current_gd=15)
+    db.add_all([team1, team2])
+    db.commit()
+    
+    matches = [
+        Match(
+            league="ITA_SA",
+            match_date=datetime.now(timezone.utc) + timedelta(days=days),
+            status=MatchStatus.SCHEDULED.value,
+            home_team_id=team1.id,
+            away_team_id=team2.id,
+            odds_home=2.0,
+            odds_draw=3.2,
+            odds_away=3.6
+        )
+        for days in (1, 2, 3)
+    ]
+    db.add_all(matches)
+    db.commit()
+    match_ids = [m.id for m in matches]
+    db.close()
+    
+    # One match already has a prediction (two, in fact: the oldest one is served)
+    first = client.get(f"/api/predictions/{match_ids[0]}").json()
+    db = TestingSessionLocal()
+    db.add(Prediction(
+        match_id=match_ids[0], predicted_result=PredictionResult.AWAY_WIN,
+        confidence_home=0.2, confidence_draw=0.3, confidence_away=0.5,
+        ai_score=5.0, betting_advice="", value_rating=1.0
+    ))
+    db.commit()
+    db.close()
+    assert client.get(f"/api/predictions/{match_ids[0]}").json()["id"] == first["id"]
+    
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.split()))
+    
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.post(
+            "/api/predictions/batch",
+            json={"match_ids": [match_ids[0], 9999, match_ids[1], match_ids[2], match_ids[1]]}
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert response.status_code == 200
+    data = response.json()
+    assert [p["match_id"] for p in data["predictions"]] == match_ids
+    assert data["missing"] == [9999]
+    assert data["predictions"][0]["id"] == first["id"]
+    # A fixed set of statements, however many matches are predicted:
+    # predictions, matches, stored vectors and teams are read once, each
+    # table is written with a single (executemany) statement, and the
+    # predictions are reloaded once after the commit
+    tables = [s.split(" FROM ")[1].split()[0] if s.startswith("SELECT") else s.split()[2] for s in statements]
+    assert tables == [
+        "predictions", "matches", "match_features", "teams",
+        "match_features", "predictions", "matches", "prediction_stats",
+        "predictions",
+    ]
+    # New predictions look like a fresh GET; the one that already existed like a stored one
+    assert "is_correct" in data["predictions"][0]
+    assert all("is_correct" not in p for p in data["predictions"][1:])
+    assert set(data["predictions"][1]) == set(first) - {"actual_result", "is_correct"}
+    for p in data["predictions"]:
+        probs = p["prediction"]["probabilities"]
+        assert abs(probs["home"] + probs["draw"] + probs["away"] - 1) < 1e-6
+        assert p["prediction"]["model_version"] is not None
+    
+    # The bulk insert is counted in the running totals
+    from app.services.prediction_stats import PredictionStats
+    db = TestingSessionLocal()
+    assert PredictionStats.from_db_totals(db).leagues == {"ITA_SA": 4}
+    db.close()
+    
+    # Predictions made in the batch are reused afterwards
+    single = client.get(f"/api/predictions/{match_ids[2]}").json()
+    assert single["id"] == data["predictions"][2]["id"]
+
+
+def test_create_predictions_batch_validates_size():
+    """Test the batch request limits."""
+    assert client.post("/api/predictions/batch", json={"match_ids": []}).status_code == 422
+    too_many = list(range(1, MAX_BATCH_SIZE + 2))
+    assert client.post("/api/predictions/batch", json={"match_ids": too_many}).status_code == 422
 
 
 def test_get_prediction_not_found():
@@ -304,3 +411,191 @@ def test_matches_filter_by_league():
     assert isinstance(data, list)
     assert len(data) == 1
     assert data[0]["league"] == "ENG_PL"
+
+
+def test_get_history_only_completed_joins_match():
+    """Test history joins match fields and filters completed predictions in SQL."""
+    db = TestingSessionLocal()
+    
+    match = Match(
+        league="ITA_SA",
+        match_date=datetime.now(timezone.utc) - timedelta(days=2),
+        status=MatchStatus.FINISHED.value,
+        home_team="Inter",
+        away_team="Milan",
+        home_score=0,
+        away_score=1
+    )
+    upcoming = Match(
+        league="ITA_SA",
+        match_date=datetime.now(timezone.utc) + timedelta(days=2),
+        status=MatchStatus.SCHEDULED.value,
+        home_team="Roma",
+        away_team="Lazio"
+    )
+    db.add_all([match, upcoming])
+    db.commit()
+    
+    db.add_all([
+        Prediction(
+            match_id=match.id,
+            predicted_result=PredictionResult.HOME_WIN,
+            confidence_home=0.5, confidence_draw=0.3, confidence_away=0.2,
+            ai_score=5.0, betting_advice="", value_rating=1.0,
+            actual_result=PredictionResult.AWAY_WIN,
+            is_correct=False
+        ),
+        Prediction(
+            match_id=upcoming.id,
+            predicted_result=PredictionResult.DRAW,
+            confidence_home=0.3, confidence_draw=0.4, confidence_away=0.3,
+            ai_score=4.0, betting_advice="", value_rating=1.0
+        ),
+    ])
+    db.commit()
+    db.close()
+    
+    response = client.get("/api/history/")
+    assert response.json()["total"] == 2
+    
+    response = client.get("/api/history/?only_completed=true")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 1
+    assert data["correct"] == 0
+    assert data["accuracy"] == 0
+    record = data["records"][0]
+    assert record["home_team"] == "Inter"
+    assert record["away_team"] == "Milan"
+    assert record["league"] == "ITA_SA"
+    assert record["actual_result"] == "A"
+
+
+def test_history_stats_totals_follow_writes():
+    """Test prediction totals are kept up to date on insert, settlement and delete."""
+    from app.services.prediction_stats import PredictionStats, rebuild_db_totals
+    db = TestingSessionLocal()
+    
+    match = Match(
+        league="ESP_LL",
+        match_date=datetime.now(timezone.utc) - timedelta(days=1),
+        status=MatchStatus.FINISHED.value,
+        home_team="Barcelona",
+        away_team="Sevilla",
+        home_score=2,
+        away_score=0
+    )
+    db.add(match)
+    db.commit()
+    
+    hit = Prediction(
+        match_id=match.id,
+        predicted_result=PredictionResult.HOME_WIN,
+        confidence_home=0.6, confidence_draw=0.25, confidence_away=0.15,
+        ai_score=7.0, betting_advice="", value_rating=1.0
+    )
+    miss = Prediction(
+        match_id=match.id,
+        predicted_result=PredictionResult.DRAW,
+        confidence_home=0.3, confidence_draw=0.4, confidence_away=0.3,
+        ai_score=4.0, betting_advice="", value_rating=1.0
+    )
+    db.add_all([hit, miss])
+    db.commit()
+    
+    stats = PredictionStats.from_db_totals(db)
+    assert stats.total == 2
+    assert stats.results == {"home_wins": 1, "draws": 1, "away_wins": 0}
+    assert stats.leagues == {"ESP_LL": 2}
+    assert stats.as_response()["average_confidence"] == 50.0
+    assert stats.accuracy_rate() is None
+    
+    hit.actual_result = PredictionResult.HOME_WIN
+    hit.is_correct = True
+    miss.actual_result = PredictionResult.HOME_WIN
+    miss.is_correct = False
+    db.commit()
+    assert PredictionStats.from_db_totals(db).accuracy_rate() == 50.0
+    
+    db.delete(miss)
+    db.commit()
+    stats = PredictionStats.from_db_totals(db)
+    assert (stats.total, stats.settled, stats.correct) == (1, 1, 1)
+    
+    rebuild_db_totals(db)
+    rebuilt = PredictionStats.from_db_totals(db)
+    assert rebuilt.as_response() == stats.as_response()
+    db.close()
+    
+    response = client.get("/api/history/stats")
+    assert response.status_code == 200
+    assert response.json()["accuracy_rate"] == 100.0
+
+
+def test_history_stats_totals_are_written_once_per_flush():
+    """Test a multi-row flush updates the totals with one query and one upsert."""
+    from app.services.prediction_stats import PredictionStats
+    db = TestingSessionLocal()
+    
+    matches = [
+        Match(league=league, match_date=datetime.now(timezone.utc), status=MatchStatus.SCHEDULED.value,
+              home_team="Home", away_team="Away")
+        for league in ("ENG_PL", "ENG_PL", "GER_BL", "GER_BL", "GER_BL")
+    ]
+    db.add_all(matches)
+    db.commit()
+    predictions = [
+        Prediction(
+            match_id=m.id, predicted_result=PredictionResult.HOME_WIN,
+            confidence_home=0.5, confidence_draw=0.3, confidence_away=0.2,
+            ai_score=5.0, betting_advice="", value_rating=1.0
+        )
+        for m in matches
+    ]
+    
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.split()))
+    
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        db.add_all(predictions)
+        db.flush()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    db.commit()
+    
+    # Besides the predictions' own INSERT: one league lookup and one upsert
+    others = [s for s in statements if not s.startswith("INSERT INTO predictions ")]
+    assert len(others) == 2
+    assert others[0].startswith("SELECT") and "FROM matches" in others[0]
+    assert others[1].startswith("INSERT INTO prediction_stats") and "ON CONFLICT" in others[1]
+    
+    stats = PredictionStats.from_db_totals(db)
+    assert stats.leagues == {"ENG_PL": 2, "GER_BL": 3}
+    assert stats.results["home_wins"] == 5
+    db.close()
+
+
+def test_history_stats_without_db_totals(tmp_path, monkeypatch):
+    """Test /api/history/stats when the prediction_stats table cannot be read."""
+    def unavailable(db):
+        raise OperationalError("SELECT", {}, Exception("no such table: prediction_stats"))
+    
+    monkeypatch.setattr(main_module.PredictionStats, "from_db_totals", unavailable)
+    snapshot_file = tmp_path / "final_predictions.json"
+    monkeypatch.setattr(main_module, "prediction_store", PredictionSnapshotStore(str(snapshot_file)))
+    
+    # No snapshot either: nothing to report
+    response = client.get("/api/history/stats")
+    assert response.status_code == 404
+    
+    snapshot_file.write_text(json.dumps([
+        {"league": "Premier League", "prediction": {"prediction": "home_win", "confidence": 60.0}},
+    ]), encoding="utf-8")
+    response = client.get("/api/history/stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_predictions"] == 1
+    assert data["accuracy_rate"] is None
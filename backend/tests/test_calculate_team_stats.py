@@ -0,0 +1,162 @@
+import json
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models.match import Match
+from collections import defaultdict
+from scripts.calculate_team_stats import (
+    WINDOWS, _new_counters, apply_match, calculate_current_season_stats, calculate_current_season_stats_sql,
+    match_entry, rolling_windows, rolling_windows_sql, summarize_counters, summarize_team, update_team_stats_incremental,
+)
+from scripts.predict_match import predict_match
+
+TEAMS = ["Arsenal", "Chelsea", "Liverpool", "Everton", "Fulham", "Brentford"]
+START = datetime(2025, 8, 2)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _add_matches(db, first_day, n):
+    for day in range(first_day, first_day + n):
+        home, away = TEAMS[day % 6], TEAMS[(day + 1 + day // 6) % 6]
+        if home == away:
+            away = TEAMS[(day + 2) % 6]
+        db.add(Match(league="ENG_PL", match_date=START + timedelta(days=day), status="finished",
+                     home_team=home, away_team=away, home_score=day % 3, away_score=(day * 7) % 4))
+    db.commit()
+
+
+def _full(db, tmp_path):
+    return calculate_current_season_stats(db, str(tmp_path / "full.json"), str(tmp_path / "full_state.json"))
+
+
+def test_incremental_update_matches_full_recompute(db, tmp_path):
+    stats_path, state_path = str(tmp_path / "team_stats.json"), str(tmp_path / "state.json")
+    _add_matches(db, 0, 30)
+    calculate_current_season_stats(db, stats_path, state_path)
+
+    # 新比賽、比分修正、取消的比賽、上賽季的比賽
+    _add_matches(db, 30, 8)
+    matches = db.query(Match).order_by(Match.id).all()
+    matches[3].home_score = 5
+    matches[10].status = "canceled"
+    matches[20].match_date = datetime(2025, 5, 1)
+    db.add(Match(league="ENG_PL", match_date=START + timedelta(days=40), status="scheduled",
+                 home_team="Arsenal", away_team="Fulham"))
+    db.commit()
+
+    result = update_team_stats_incremental(db, stats_path, state_path)
+    expected = _full(db, tmp_path)
+    assert result == expected
+    with open(stats_path, encoding="utf-8") as f:
+        assert json.load(f) == expected
+
+    # 再跑一次不應改變任何結果
+    assert update_team_stats_incremental(db, stats_path, state_path) == expected
+
+
+def test_recent_form_follows_corrections(db, tmp_path):
+    stats_path, state_path = str(tmp_path / "team_stats.json"), str(tmp_path / "state.json")
+    for day, score in enumerate([(1, 0), (1, 0), (0, 1)]):
+        db.add(Match(league="ENG_PL", match_date=START + timedelta(days=day), status="finished",
+                     home_team="Arsenal", away_team="Chelsea", home_score=score[0], away_score=score[1]))
+    db.commit()
+    assert calculate_current_season_stats(db, stats_path, state_path)["Arsenal"]["recent_form"] == "LWW"
+
+    latest = db.query(Match).order_by(Match.match_date.desc()).first()
+    latest.home_score = 2
+    db.commit()
+    stats = update_team_stats_incremental(db, stats_path, state_path)
+    assert stats["Arsenal"]["recent_form"] == "WWW"
+    assert stats["Chelsea"]["recent_form"] == "LLL"
+    assert stats == _full(db, tmp_path)
+
+
+def test_missing_state_falls_back_to_full(db, tmp_path):
+    _add_matches(db, 0, 6)
+    stats = update_team_stats_incremental(db, str(tmp_path / "team_stats.json"), str(tmp_path / "state.json"))
+    assert stats == _full(db, tmp_path)
+
+
+def test_sql_backend_matches_python_backend(db, tmp_path):
+    _add_matches(db, 0, 40)
+    # 同日兩場、未完賽、上賽季與缺比分的比賽都要與逐場累計一致
+    db.add(Match(league="ENG_PL", match_date=START + timedelta(days=39), status="finished",
+                 home_team="Arsenal", away_team="Everton", home_score=2, away_score=2))
+    db.add(Match(league="ENG_PL", match_date=START + timedelta(days=41), status="scheduled",
+                 home_team="Arsenal", away_team="Fulham"))
+    db.add(Match(league="ENG_PL", match_date=datetime(2025, 3, 1), status="finished",
+                 home_team="Arsenal", away_team="Fulham", home_score=4, away_score=0))
+    db.add(Match(league="ENG_PL", match_date=START, status="finished", home_team="Chelsea", away_team="Fulham"))
+    db.commit()
+
+    stats = calculate_current_season_stats_sql(db, str(tmp_path / "team_stats.json"))
+    expected = _full(db, tmp_path)
+    assert stats == expected
+    assert list(stats["Everton"]) == list(expected["Everton"])
+
+
+def _brute_force_window(entries, team, window, as_of):
+    played = sorted((e for e in entries if team in e[1:3]), key=lambda e: (e[5], -e[0]))
+    if window.endswith("_days"):
+        cutoff = (as_of - timedelta(days=int(window.split("_")[1]))).isoformat()
+        played = [e for e in played if e[5] > cutoff]
+    elif window != "season":
+        played = played[-int(window.split("_")[1]):]
+    if not played:
+        return summarize_counters(_new_counters(), "")
+    stats = defaultdict(_new_counters)
+    for entry in played:
+        apply_match(stats, entry)
+    return summarize_team(stats[team])
+
+
+def test_rolling_windows_match_brute_force(db):
+    _add_matches(db, 0, 60)
+    db.add(Match(league="ENG_PL", match_date=START + timedelta(days=59), status="finished",
+                 home_team="Arsenal", away_team="Fulham", home_score=1, away_score=3))
+    db.commit()
+    entries = [match_entry(m) for m in db.query(Match)]
+    as_of = max(datetime.fromisoformat(e[5]) for e in entries)
+
+    windows = rolling_windows(entries)
+    assert set(windows) == set(TEAMS)
+    for team in TEAMS:
+        assert list(windows[team]) == list(WINDOWS)
+        for window in WINDOWS:
+            assert windows[team][window] == _brute_force_window(entries, team, window, as_of), (team, window)
+
+    # The SQL backend aggregates the same windows without reading match rows
+    statements = []
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.get_bind(), "before_cursor_execute", record)
+    try:
+        assert rolling_windows_sql(db) == windows
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", record)
+    assert len(statements) == 3
+    earlier = START + timedelta(days=20)
+    assert rolling_windows_sql(db, earlier) == rolling_windows(entries, earlier)
+
+
+def test_stats_output_exposes_windows_for_predict_match(db, tmp_path, monkeypatch):
+    _add_matches(db, 0, 60)
+    monkeypatch.chdir(tmp_path)
+    stats = calculate_current_season_stats(db, "data/team_stats.json", "data/state.json")
+    season = {k: v for k, v in stats["Arsenal"].items() if k != "windows"}
+    assert stats["Arsenal"]["windows"]["season"] == season
+    assert stats["Arsenal"]["windows"]["last_5"]["total_matches"] == 5
+
+    by_window = predict_match("Arsenal", "Chelsea", window="last_5")
+    assert by_window["analysis"]["home_win_rate"] == round(stats["Arsenal"]["windows"]["last_5"]["home_win_rate"] * 100, 1)
+    assert predict_match("Arsenal", "Chelsea", window="season") == predict_match("Arsenal", "Chelsea")
+    assert "error" in predict_match("Arsenal", "Chelsea", window="last_99")
@@ -0,0 +1,118 @@
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier, VotingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from app.services import model_registry as registry_module
+from app.services.compiled_model import CompiledModel, compile_model
+from app.services.model_registry import ModelRegistry
+from scripts.export_model import export_model
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _training_data(n_classes=3):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 9))
+    score = X[:, 0] - X[:, 1] + 0.5 * X[:, 3] + rng.normal(scale=0.5, size=400)
+    labels = np.array(['A', 'D', 'H'][:n_classes])
+    y = labels[np.digitize(score, np.quantile(score, np.linspace(0, 1, n_classes + 1)[1:-1]))]
+    return X, y
+
+
+def _ensemble():
+    return VotingClassifier([
+        ('lr', make_pipeline(StandardScaler(), LogisticRegression())),
+        ('rf', RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0)),
+        ('gb', GradientBoostingClassifier(n_estimators=20, random_state=0)),
+    ], voting='soft', weights=[2, 1, 1])
+
+
+@pytest.mark.parametrize('n_classes', [2, 3])
+def test_compiled_probabilities_match_sklearn(tmp_path, n_classes):
+    X, y = _training_data(n_classes)
+    model = _ensemble().fit(X, y)
+    path = str(tmp_path / 'model.npz')
+    compile_model(model).save(path)
+    compiled = CompiledModel.load(path)
+
+    X_new = np.random.default_rng(1).normal(scale=2.0, size=(500, 9))
+    np.testing.assert_allclose(compiled.predict_proba(X_new), model.predict_proba(X_new), rtol=0, atol=1e-12)
+    assert list(compiled.classes_) == list(model.classes_)
+    with pytest.raises(ValueError):
+        compiled.predict_proba(X_new[:, :5])
+
+
+def test_unsupported_model_is_rejected():
+    X, y = _training_data()
+    with pytest.raises(TypeError):
+        compile_model(KNeighborsClassifier().fit(X, y))
+
+
+def test_exported_model_served_by_registry(tmp_path):
+    X, y = _training_data()
+    pickled = tmp_path / 'ensemble_model.pkl'
+    joblib.dump(LogisticRegression().fit(X, y), pickled)
+    compiled_path = tmp_path / 'ensemble_model.npz'
+    assert export_model(str(pickled), str(compiled_path), check_rows=200) < 1e-9
+
+    service = ModelRegistry(str(compiled_path)).get()
+    assert isinstance(service.model, CompiledModel)
+    match = SimpleNamespace(odds_home=2.0, odds_draw=3.2, odds_away=4.0, home_team=None, away_team=None)
+    result = service.predict_match(match)
+    assert result['model_version'].startswith('ensemble_model-')
+    assert abs(sum(result['probabilities'].values()) - 1) < 1e-9
+
+
+def test_registry_serves_the_newer_of_pickle_and_export(tmp_path, monkeypatch, caplog):
+    pickled = tmp_path / 'ensemble_model.pkl'
+    compiled_path = tmp_path / 'ensemble_model.npz'
+    monkeypatch.setattr(registry_module, 'DEFAULT_MODEL_FILE', str(pickled))
+    monkeypatch.setattr(registry_module, 'COMPILED_MODEL_FILE', str(compiled_path))
+    X, y = _training_data()
+
+    def train(mtime_ns):
+        joblib.dump(LogisticRegression().fit(X, y), pickled)
+        os.utime(pickled, ns=(mtime_ns, mtime_ns))
+
+    def export(mtime_ns):
+        export_model(str(pickled), str(compiled_path), check_rows=50)
+        os.utime(compiled_path, ns=(mtime_ns, mtime_ns))
+
+    train(1_000_000_000)
+    export(2_000_000_000)
+    registry = ModelRegistry()
+    assert isinstance(registry.get().model, CompiledModel)
+
+    # Retrained without re-exporting: the pickle is served, with a warning
+    train(3_000_000_000)
+    with caplog.at_level('WARNING', logger=registry_module.__name__):
+        service = registry.get()
+        registry.get()
+    assert isinstance(service.model, LogisticRegression)
+    assert len([r for r in caplog.records if 'export_model.py' in r.getMessage()]) == 1
+
+    export(4_000_000_000)
+    assert isinstance(registry.get().model, CompiledModel)
+
+
+def test_compiled_model_loads_without_sklearn(tmp_path):
+    X, y = _training_data()
+    path = str(tmp_path / 'model.npz')
+    compile_model(_ensemble().fit(X, y)).save(path)
+    code = (
+        "import sys, numpy as np\n"
+        "from app.services.model_registry import ModelRegistry\n"
+        f"service = ModelRegistry({path!r}).get()\n"
+        "assert service.model.predict_proba(np.zeros((3, 9))).shape == (3, 3)\n"
+        "assert not any(m.split('.')[0] == 'sklearn' for m in sys.modules), 'sklearn imported'\n"
+    )
+    subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR, check=True)
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models.match import Match
+from app.models.rating import EloCheckpoint
+from app.services.elo import EloEngine, EloRatingStore
+
+TEAMS = ["Arsenal", "Chelsea", "Liverpool", "Everton"]
+START = datetime(2024, 8, 1)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _add_matches(db, first_day, n):
+    for day in range(first_day, first_day + n):
+        home, away = TEAMS[day % 4], TEAMS[(day + 1 + day // 4) % 4]
+        if home == away:
+            away = TEAMS[(day + 2) % 4]
+        db.add(Match(league="ENG_PL", match_date=START + timedelta(days=day), status="finished",
+                     home_team=home, away_team=away, home_score=day % 3, away_score=(day * 7) % 4))
+    db.commit()
+
+
+def _replay(db, until=None):
+    engine = EloEngine()
+    query = db.query(Match).order_by(Match.match_date, Match.id)
+    for m in query:
+        if until is None or m.match_date <= until:
+            engine.update(m.home_team, m.away_team, m.home_score, m.away_score)
+    return engine.ratings
+
+
+def _close(a, b):
+    return a.keys() == b.keys() and all(abs(a[k] - b[k]) < 1e-9 for k in a)
+
+
+def test_engine_update_is_zero_sum():
+    engine = EloEngine()
+    engine.update("Arsenal", "Chelsea", 3, 0)
+    assert engine.rating("Arsenal") > 1500 > engine.rating("Chelsea")
+    assert abs(engine.rating("Arsenal") + engine.rating("Chelsea") - 3000) < 1e-9
+
+
+def test_incremental_update_matches_full_replay(db):
+    store = EloRatingStore(checkpoint_every=10)
+    _add_matches(db, 0, 25)
+    assert _close(store.update(db).ratings, _replay(db))
+    assert db.query(EloCheckpoint).count() == 2
+
+    _add_matches(db, 25, 12)
+    assert _close(store.update(db).ratings, _replay(db))
+    assert db.query(EloCheckpoint).count() == 3
+
+
+def test_ratings_as_of_past_date(db):
+    store = EloRatingStore(checkpoint_every=10)
+    _add_matches(db, 0, 40)
+    store.update(db)
+    when = START + timedelta(days=23)
+    assert _close(store.ratings_as_of(db, when), _replay(db, until=when))
+
+
+def test_corrected_result_rewinds_checkpoints(db):
+    store = EloRatingStore(checkpoint_every=10)
+    _add_matches(db, 0, 30)
+    store.update(db)
+    match = db.query(Match).order_by(Match.match_date).offset(5).first()
+    match.home_score, match.away_score = 5, 0
+    db.commit()
+    assert _close(store.update(db).ratings, _replay(db))
+
+
+def test_only_finished_status_counts(db):
+    # Same rule as the team stats: status must be exactly FINISHED_STATUS
+    _add_matches(db, 0, 4)
+    db.add(Match(league="ENG_PL", match_date=START + timedelta(days=10), status="FINISHED",
+                 home_team="Arsenal", away_team="Chelsea", home_score=5, away_score=0))
+    db.commit()
+    counted = [m for m in db.query(Match).order_by(Match.match_date, Match.id) if m.status == "finished"]
+    engine = EloEngine()
+    for m in counted:
+        engine.update(m.home_team, m.away_team, m.home_score, m.away_score)
+    assert _close(EloRatingStore().update(db).ratings, engine.ratings)
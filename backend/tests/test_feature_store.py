@@ -0,0 +1,160 @@
+import json
+from datetime import datetime
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models.feature import MatchFeatures
+from app.models.match import Match
+from app.models.team import Team
+from app.services import feature_store as feature_store_module
+from app.services.feature_store import FeatureStore
+from app.services.ml_service import MLService
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def matches(db):
+    db.add_all([
+        Team(name="Manchester City", league="ENG_PL", current_points=48, current_gd=18, home_win_rate=0.68, away_win_rate=0.52),
+        Team(name="Arsenal", league="ENG_PL", current_points=52, current_gd=22, home_win_rate=0.72, away_win_rate=0.58),
+    ])
+    db.commit()
+    arsenal = db.query(Team).filter(Team.name == "Arsenal").one()
+    rows = [
+        # Team names only, stored as plain strings (and as an alias)
+        Match(league="ENG_PL", match_date=datetime(2025, 9, 1), home_team="Man City", away_team="Arsenal",
+              odds_home=2.1, odds_draw=3.4, odds_away=3.3, home_score=2, away_score=1),
+        # Team ids only
+        Match(league="ENG_PL", match_date=datetime(2025, 9, 8), home_team_id=arsenal.id, away_team="Unknown FC",
+              odds_home=1.5, home_score=0, away_score=0),
+        Match(league="ENG_PL", match_date=datetime(2025, 9, 15), home_team="Arsenal", away_team="Manchester City"),
+    ]
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+
+def _stored(db):
+    return {(row.match_id, row.feature_version): json.loads(row.vector) for row in db.query(MatchFeatures)}
+
+
+def test_vectors_use_team_statistics(db, matches):
+    X = FeatureStore().vectors(db, matches)
+    db.commit()
+    np.testing.assert_allclose(X, [
+        [2.1, 3.4, 3.3, 48, 52, 18, 22, 0.68, 0.58],
+        [1.5, 0, 0, 52, 0, 22, 0, 0.72, 0],
+        [0, 0, 0, 52, 48, 22, 18, 0.72, 0.52],
+    ])
+    assert set(_stored(db)) == {(m.id, 1) for m in matches}
+
+
+def test_stored_vectors_are_reused_until_the_match_changes(db, matches):
+    store = FeatureStore()
+    store.vectors(db, matches)
+    db.commit()
+
+    # A stored row is returned as is, without looking at the teams again
+    row = db.get(MatchFeatures, (matches[0].id, 1))
+    row.vector = json.dumps([9.0] * 9)
+    db.commit()
+    assert store.vectors(db, [matches[0]])[0].tolist() == [9.0] * 9
+
+    matches[0].odds_home = 2.5
+    db.commit()
+    assert store.vectors(db, [matches[0], matches[0]])[:, 0].tolist() == [2.5, 2.5]
+    db.commit()
+    assert _stored(db)[(matches[0].id, 1)][0] == 2.5
+
+
+def test_team_update_drops_its_vectors(db, matches):
+    store = FeatureStore()
+    store.vectors(db, matches)
+    db.commit()
+
+    city = db.query(Team).filter(Team.name == "Manchester City").one()
+    city.current_points = 51
+    db.commit()
+    assert set(_stored(db)) == {(matches[1].id, 1)}
+    assert store.vectors(db, [matches[2]])[0][4] == 51
+
+
+def test_team_insert_drops_only_vectors_it_resolves(db, matches):
+    store = FeatureStore()
+    store.vectors(db, matches)
+    db.commit()
+
+    db.add(Team(name="Everton", league="ENG_PL", current_points=30))
+    db.commit()
+    assert len(_stored(db)) == 3
+
+    db.add(Team(name="Unknown FC", league="ENG_PL", current_points=12))
+    db.commit()
+    assert set(_stored(db)) == {(matches[0].id, 1), (matches[2].id, 1)}
+    assert store.vectors(db, [matches[1]])[0][4] == 12
+
+    # Stored under another spelling of the new team
+    forest = Match(league="ENG_PL", match_date=datetime(2025, 9, 22), home_team="Arsenal", away_team="Nott'm Forest")
+    db.add(forest)
+    db.commit()
+    assert store.vectors(db, [forest])[0][4] == 0
+    db.commit()
+    db.add(Team(name="Nottm Forest", league="ENG_PL", current_points=20))
+    db.commit()
+    assert (forest.id, 1) not in _stored(db)
+    assert store.vectors(db, [forest])[0][4] == 20
+
+
+def test_conflicting_insert_keeps_the_rest_of_the_batch(db, matches, monkeypatch):
+    real_load = feature_store_module.TeamIndex.load
+
+    def load_after_concurrent_insert(session):
+        # Another request stores the first match's vector in the meantime
+        session.execute(MatchFeatures.__table__.insert(), [{
+            "match_id": matches[0].id, "feature_version": 1, "vector": json.dumps([7.0] * 9),
+            "match_updated_at": matches[0].updated_at,
+        }])
+        return real_load(session)
+
+    monkeypatch.setattr(feature_store_module.TeamIndex, "load", load_after_concurrent_insert)
+    X = FeatureStore().vectors(db, matches)
+    db.commit()
+    assert X[0][3] == 48
+    stored = _stored(db)
+    assert stored[(matches[0].id, 1)] == [7.0] * 9
+    assert set(stored) == {(m.id, 1) for m in matches}
+
+
+def test_refresh_and_training_set(db, matches):
+    store = FeatureStore()
+    assert store.refresh(db) == 3
+    assert store.refresh(db, [matches[1].id]) == 1
+    assert len(_stored(db)) == 3
+
+    ids, X, y = store.training_set(db)
+    assert ids == [matches[0].id, matches[1].id]
+    assert X.shape == (2, 9) and X[0][3] == 48
+    assert y.tolist() == ["H", "D"]
+
+
+def test_predictions_read_stored_vectors(db, matches):
+    class RecordingModel:
+        def predict_proba(self, X):
+            self.X = X
+            return np.tile([0.5, 0.3, 0.2], (len(X), 1))
+
+    model = RecordingModel()
+    features = FeatureStore().vectors(db, matches)
+    results = MLService(model=model, version="test").predict_matches(matches, features)
+    np.testing.assert_array_equal(model.X, features)
+    assert [r["prediction"] for r in results] == ["H", "H", "H"]
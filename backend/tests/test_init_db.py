@@ -0,0 +1,19 @@
+from sqlalchemy import create_engine, inspect, text
+import scripts.init_db as init_db
+
+
+def test_existing_tables_get_new_columns_and_indexes(monkeypatch):
+    engine = create_engine("sqlite://")
+    monkeypatch.setattr(init_db, "engine", engine)
+    # matches as an older release created it: no updated_at column, no indexes
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE matches (id INTEGER PRIMARY KEY, league VARCHAR, home_team VARCHAR)"))
+
+    init_db.add_missing_columns()
+    init_db.add_missing_indexes()
+    indexes = {index["name"] for index in inspect(engine).get_indexes("matches")}
+    assert "ix_matches_updated_at" in indexes
+    assert {c["name"] for c in inspect(engine).get_columns("matches")} >= {"updated_at", "home_team_id"}
+
+    # Nothing left to create the second time
+    init_db.add_missing_indexes()
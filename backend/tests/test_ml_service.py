@@ -16,3 +16,31 @@ def test_predict_from_dataframe_odds_fallback():
     # probabilities should sum close to 1
     s = out['predicted_home_win_prob'] + out['predicted_draw_prob'] + out['predicted_away_win_prob']
     assert all(abs(v - 1.0) < 0.01 for v in s)
+
+
+def test_predict_from_dataframe_odds_fallback_coalesces_columns():
+    svc = MLService(model_path='nonexistent_model.pkl')
+    df = pd.DataFrame({
+        'match_id': ['m1', 'm2', 'm3', 'm4'],
+        'odds_home': [None, 0.0, 'n/a', None],
+        'home_odds': [2.0, None, 2.5, None],
+        'home_price': [9.0, 2.0, None, None],
+        'draw_odds': [4.0, 4.0, 3.0, -1.0],
+        'away_odds': [4.0, 4.0, 3.0, None],
+    })
+    out = svc.predict_from_dataframe(df)
+    expected = [
+        svc._odds_to_probs(2.0, 4.0, 4.0),
+        svc._odds_to_probs(2.0, 4.0, 4.0),
+        svc._odds_to_probs(2.5, 3.0, 3.0),
+        [0.33, 0.34, 0.33],
+    ]
+    got = out[['predicted_home_win_prob', 'predicted_draw_prob', 'predicted_away_win_prob']].to_numpy()
+    assert abs(got - expected).max() < 1e-9
+    assert (out['model_version'] == 'odds-fallback').all()
+
+
+def test_predict_from_dataframe_empty():
+    svc = MLService(model_path='nonexistent_model.pkl')
+    out = svc.predict_from_dataframe(pd.DataFrame({'match_id': [], 'odds_home': []}))
+    assert out.shape[0] == 0
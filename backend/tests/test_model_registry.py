@@ -0,0 +1,80 @@
+import os
+from types import SimpleNamespace
+import joblib
+import numpy as np
+import pytest
+from app.services import model_registry as registry_module
+from app.services.ml_service import FALLBACK_VERSION
+from app.services.model_registry import ModelRegistry
+
+
+class ConstantModel:
+    def __init__(self, probs):
+        self.probs = probs
+
+    def predict_proba(self, X):
+        return np.tile(np.array(self.probs), (len(X), 1))
+
+
+MATCH = SimpleNamespace(odds_home=2.0, odds_draw=3.2, odds_away=4.0, home_team=None, away_team=None)
+
+
+def _dump(path, probs, mtime_ns):
+    joblib.dump(ConstantModel(probs), path)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    calls = []
+    real_load = joblib.load
+    monkeypatch.setattr(registry_module.joblib, "load", lambda path: calls.append(path) or real_load(path))
+    return calls
+
+
+def test_model_loaded_once_and_shared(tmp_path, loads):
+    path = tmp_path / "ensemble_model.pkl"
+    _dump(path, [0.6, 0.3, 0.1], 1_000_000_000)
+    registry = ModelRegistry(str(path))
+    service = registry.warm()
+    assert registry.get() is service and registry.get() is service
+    assert len(loads) == 1
+
+    result = service.predict_match(MATCH)
+    assert result["prediction"] == "H"
+    assert result["model_version"] == registry.version == service.version
+    assert service.version.startswith("ensemble_model-")
+
+
+def test_rewritten_model_swaps_in_and_bad_file_keeps_previous(tmp_path, loads):
+    path = tmp_path / "ensemble_model.pkl"
+    _dump(path, [0.6, 0.3, 0.1], 1_000_000_000)
+    registry = ModelRegistry(str(path))
+    first = registry.get()
+
+    _dump(path, [0.1, 0.2, 0.7], 2_000_000_000)
+    second = registry.get()
+    assert second is not first and second.version != first.version
+    assert second.predict_match(MATCH)["prediction"] == "A"
+    # 舊的服務物件仍可完成進行中的預測
+    assert first.predict_match(MATCH)["prediction"] == "H"
+
+    path.write_bytes(b"not a pickle")
+    assert registry.get() is second
+    assert registry.get() is second
+    assert len(loads) == 3
+
+
+def test_activate_other_file_and_missing_model(tmp_path):
+    registry = ModelRegistry(str(tmp_path / "missing.pkl"))
+    fallback = registry.get()
+    assert fallback.model is None and fallback.version == FALLBACK_VERSION
+    assert fallback.predict_match(MATCH)["model_version"] == FALLBACK_VERSION
+
+    other = tmp_path / "model_v2.pkl"
+    _dump(other, [0.2, 0.5, 0.3], 1_000_000_000)
+    service = registry.activate(str(other))
+    assert registry.get() is service and service.version.startswith("model_v2-")
+    with pytest.raises(FileNotFoundError):
+        registry.activate(str(tmp_path / "nope.pkl"))
+    assert registry.get() is service
@@ -0,0 +1,89 @@
+import json
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+from app.services.prediction_store import PredictionSnapshot
+from app.utils.pagination import decode_cursor, encode_cursor, predictions_list_response
+
+
+def _snapshot():
+    predictions = [
+        {"date": f"2026-03-{14 + i % 3}", "league": "Premier League" if i % 2 else "La Liga",
+         "home_team": f"Home {i}", "away_team": f"Away {i}"}
+        for i in range(7)
+    ]
+    return PredictionSnapshot(predictions, version="v1", mtime_ns=0, size=0)
+
+
+def _client(snapshot):
+    app = FastAPI()
+
+    @app.get("/predictions")
+    def predictions(request: Request, league: str = None, limit: int = None, cursor: str = None):
+        return predictions_list_response(request, snapshot, {"league": league}, cursor=cursor, limit=limit)
+
+    return TestClient(app)
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor("v1", 42), "v1") == 42
+
+
+def test_cursor_from_other_version_rejected():
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(encode_cursor("v1", 3), "v2")
+    assert exc.value.status_code == 400
+    with pytest.raises(HTTPException):
+        decode_cursor("not-a-cursor", "v1")
+
+
+def test_walk_pages_returns_every_record_once():
+    snapshot = _snapshot()
+    client = _client(snapshot)
+    seen, cursor = [], None
+    while True:
+        params = {"league": "Premier League", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/predictions", params=params).json()
+        assert body["total"] == 3
+        seen.extend(body["predictions"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == snapshot.query(league="Premier League")
+
+
+def test_ndjson_stream():
+    snapshot = _snapshot()
+    client = _client(snapshot)
+    response = client.get("/predictions", params={"limit": 5}, headers={"Accept": "application/x-ndjson"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == snapshot.predictions[:5]
+    assert response.headers["X-Total-Count"] == "7"
+    assert "X-Next-Cursor" in response.headers
+
+
+def test_unfiltered_list_precompressed_and_conditional():
+    snapshot = _snapshot()
+    client = _client(snapshot)
+    response = client.get("/predictions", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["total"] == 7
+    etag = response.headers["etag"]
+    again = client.get("/predictions", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert snapshot.encoded_views[None] is not None
+
+
+def test_etag_changes_with_snapshot_version():
+    first = _client(_snapshot()).get("/predictions", params={"league": "La Liga", "limit": 2})
+    other = _snapshot()
+    other.version = "v2"
+    second = _client(other).get(
+        "/predictions", params={"league": "La Liga", "limit": 2}, headers={"If-None-Match": first.headers["etag"]}
+    )
+    assert second.status_code == 200
+    assert second.headers["etag"] != first.headers["etag"]
@@ -0,0 +1,69 @@
+import json
+import random
+from scripts.predict_batch import predict_matches, py_round
+from scripts.predict_match import predict_match
+
+
+def _random_stats(rng, n):
+    def goals():
+        return round(rng.choice([rng.random() * 3.5, rng.randint(0, 6) / 2]), 2)
+    return {
+        f"Team {i}": {
+            "home_win_rate": rng.choice([round(rng.random(), 3), 0.0, 0.5, 1.0]),
+            "away_win_rate": round(rng.random(), 3),
+            "avg_goals_scored_home": goals(), "avg_goals_conceded_home": goals(),
+            "avg_goals_scored_away": goals(), "avg_goals_conceded_away": goals(),
+            "recent_form": "".join(rng.choice("WDL") for _ in range(rng.randint(0, 6))),
+        }
+        for i in range(n)
+    }
+
+
+def test_batch_matches_scalar_predict_match(tmp_path, monkeypatch):
+    rng = random.Random(7)
+    stats = _random_stats(rng, 40)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "team_stats.json").write_text(json.dumps(stats), encoding="utf-8")
+
+    names = list(stats) + ["Unknown FC"]
+    fixtures = [(rng.choice(names), rng.choice(names)) for _ in range(500)]
+    batch = predict_matches(fixtures)
+    for (home, away), result in zip(fixtures, batch):
+        # Compare serialized output so int/float differences are caught too
+        assert json.dumps(result) == json.dumps(predict_match(home, away))
+
+
+def test_missing_stats_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert predict_matches([("A", "B")]) == [predict_match("A", "B")]
+
+
+def test_py_round_matches_builtin_on_ties():
+    values = [0.05, 0.15, 0.25, 2.675, 1.005, 12.345, 47.25, 52.75, -0.35]
+    for ndigits in (1, 2):
+        assert py_round(values, ndigits).tolist() == [round(v, ndigits) for v in values]
+
+
+def test_matchup_matrix_rebuilt_when_stats_change(tmp_path, monkeypatch):
+    from app.services.team_stats_store import team_stats_store
+    from scripts.predict_batch import predict_fixture
+    import os
+
+    rng = random.Random(11)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    path = tmp_path / "data" / "team_stats.json"
+    path.write_text(json.dumps(_random_stats(rng, 6)), encoding="utf-8")
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+
+    matrix = team_stats_store.get().matchup_matrix()
+    assert matrix.arrays["home_win"].shape == (6, 6)
+    assert team_stats_store.get().matchup_matrix() is matrix
+    assert predict_fixture("Team 1", "Team 2") == predict_match("Team 1", "Team 2")
+
+    path.write_text(json.dumps(_random_stats(rng, 6)), encoding="utf-8")
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    assert team_stats_store.get().matchup_matrix() is not matrix
+    assert predict_fixture("Team 1", "Team 2") == predict_match("Team 1", "Team 2")
+    assert predict_fixture("Team 1", "Nobody") == {"error": "找不到球隊統計: Nobody"}
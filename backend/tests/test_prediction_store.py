@@ -0,0 +1,123 @@
+import json
+import os
+from app.services.prediction_store import PredictionSnapshotStore
+
+
+def _write(path, predictions, mtime_ns=None):
+    path.write_text(json.dumps(predictions), encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_missing_file_returns_none(tmp_path):
+    store = PredictionSnapshotStore(str(tmp_path / "final_predictions.json"))
+    assert store.get() is None
+
+
+def test_snapshot_loaded_once_and_reused(tmp_path):
+    p = tmp_path / "final_predictions.json"
+    _write(p, [{"league": "Premier League"}])
+    store = PredictionSnapshotStore(str(p))
+    first = store.get()
+    assert len(first) == 1
+    assert store.get() is first
+
+
+def test_snapshot_reloads_when_file_changes(tmp_path):
+    p = tmp_path / "final_predictions.json"
+    _write(p, [{"league": "Premier League"}], mtime_ns=1_000_000_000)
+    store = PredictionSnapshotStore(str(p))
+    first = store.get()
+    _write(p, [{"league": "La Liga"}, {"league": "Serie A"}], mtime_ns=2_000_000_000)
+    second = store.get()
+    assert second is not first
+    assert second.version != first.version
+    assert len(second) == 2
+
+
+def test_unreadable_rewrite_keeps_previous_snapshot(tmp_path):
+    p = tmp_path / "final_predictions.json"
+    _write(p, [{"league": "Premier League"}], mtime_ns=1_000_000_000)
+    store = PredictionSnapshotStore(str(p))
+    first = store.get()
+    p.write_text("[{\"league\": ", encoding="utf-8")
+    os.utime(p, ns=(2_000_000_000, 2_000_000_000))
+    loads = []
+    real_load = store._load
+    store._load = lambda stat: loads.append(stat) or real_load(stat)
+    assert store.get() is first
+    assert store.get() is first
+    # The broken file is parsed once, not on every request
+    assert len(loads) == 1
+
+    _write(p, [{"league": "La Liga"}, {"league": "Serie A"}], mtime_ns=3_000_000_000)
+    assert len(store.get()) == 2
+
+
+def _fixtures():
+    return [
+        {"date": "2026-03-14", "league": "Premier League", "home_team": "Manchester City", "away_team": "Liverpool"},
+        {"date": "2026-03-15", "league": "La Liga", "home_team": "Barcelona", "away_team": "Real Madrid"},
+        {"date": "2026-03-15", "league": "Premier League", "home_team": "Arsenal", "away_team": "Manchester United"},
+        {"date": "2026-03-16", "league": "Ligue 1", "home_team": "Lyon", "away_team": "Monaco"},
+    ]
+
+
+def _linear(predictions, league=None, team=None, date=None, date_from=None, date_to=None):
+    out = predictions
+    if league:
+        out = [p for p in out if p["league"].lower() == league.lower()]
+    if team:
+        out = [p for p in out if team.lower() in p["home_team"].lower() or team.lower() in p["away_team"].lower()]
+    if date:
+        out = [p for p in out if p["date"] == date]
+    if date_from:
+        out = [p for p in out if p["date"] >= date_from]
+    if date_to:
+        out = [p for p in out if p["date"] <= date_to]
+    return out
+
+
+def test_query_matches_linear_filters(tmp_path):
+    p = tmp_path / "final_predictions.json"
+    _write(p, _fixtures())
+    snapshot = PredictionSnapshotStore(str(p)).get()
+    cases = [
+        {},
+        {"league": "premier league"},
+        {"team": "manchester"},
+        {"team": "man", "league": "Premier League"},
+        {"date": "2026-03-15"},
+        {"date_from": "2026-03-15"},
+        {"date_from": "2026-03-14", "date_to": "2026-03-15", "team": "a"},
+        {"league": "Serie A"},
+    ]
+    for kwargs in cases:
+        assert snapshot.query(**kwargs) == _linear(snapshot.predictions, **kwargs), kwargs
+
+
+def test_facets_materialized_per_snapshot(tmp_path):
+    p = tmp_path / "final_predictions.json"
+    _write(p, _fixtures())
+    facets = PredictionSnapshotStore(str(p)).get().facets
+    assert json.loads(facets.leagues_body) == {"leagues": ["La Liga", "Ligue 1", "Premier League"], "count": 3}
+    assert json.loads(facets.teams_body)["count"] == 8
+    assert json.loads(facets.teams_body_for("Ligue 1")) == {"teams": ["Lyon", "Monaco"], "count": 2}
+    assert json.loads(facets.teams_body_for("Serie A")) == {"teams": [], "count": 0}
+
+
+
+def test_snapshot_stats_match_linear_pass(tmp_path):
+    predictions = [
+        {"league": "Premier League", "prediction": {"prediction": "home_win", "confidence": 62.5}},
+        {"league": "La Liga", "prediction": {"prediction": "draw", "confidence": 41.0}},
+        {"league": "Premier League", "prediction": {"prediction": "away_win", "confidence": 55.0}},
+        {"league": "Premier League", "prediction": {"prediction": "home_win", "confidence": 70.0}},
+    ]
+    p = tmp_path / "final_predictions.json"
+    _write(p, predictions)
+    stats = PredictionSnapshotStore(str(p)).get().stats.as_response()
+    assert stats["total_predictions"] == 4
+    assert stats["result_distribution"] == {"home_wins": 2, "draws": 1, "away_wins": 1}
+    assert stats["average_confidence"] == round(sum(x["prediction"]["confidence"] for x in predictions) / 4, 2)
+    assert stats["league_distribution"] == {"Premier League": 3, "La Liga": 1}
@@ -0,0 +1,86 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.database import Base, get_db
+from app.models.match import Match
+from app.utils import cache as cache_module
+from app.utils.cache import CacheService
+from datetime import datetime, timezone
+
+engine = create_engine("sqlite:///./test.db", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+class FakeRedis:
+    """In-memory stand-in for the few Redis commands CacheService uses."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, expire, value):
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+
+    def incr(self, key):
+        value = int(self.data.get(key, b"0")) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    store = CacheService()
+    store.client, store.enabled = FakeRedis(), True
+    monkeypatch.setattr(cache_module, "cache", store)
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    Base.metadata.create_all(bind=engine)
+    yield TestClient(app)
+    Base.metadata.drop_all(bind=engine)
+
+
+def _add_match(home, away):
+    db = TestingSessionLocal()
+    db.add(Match(league="ENG_PL", match_date=datetime.now(timezone.utc), status="upcoming",
+                 home_team=home, away_team=away))
+    db.commit()
+    db.close()
+
+
+def test_repeated_query_served_from_cache(client):
+    _add_match("Arsenal", "Chelsea")
+    first = client.get("/api/matches/?league=ENG_PL&limit=10")
+    assert first.headers["X-Cache"] == "MISS"
+    # Same query with parameters reordered hits the same entry
+    second = client.get("/api/matches/?limit=10&league=ENG_PL")
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+
+
+def test_commit_invalidates_matches(client):
+    _add_match("Arsenal", "Chelsea")
+    assert len(client.get("/api/matches/").json()) == 1
+    _add_match("Liverpool", "Everton")
+    response = client.get("/api/matches/")
+    assert response.headers["X-Cache"] == "MISS"
+    assert len(response.json()) == 2
+
+
+def test_errors_not_cached(client):
+    assert client.get("/api/matches/999").status_code == 404
+    response = client.get("/api/matches/999")
+    assert "X-Cache" not in response.headers
@@ -0,0 +1,77 @@
+import json
+import math
+import numpy as np
+import scripts.predict_real_fixtures as predict_real_fixtures
+from app.services.snapshot_format import MappedPredictions
+from scripts.predict_batch import TeamStrengthTable
+from scripts.score_grid import grid_markets, poisson_pmf, score_grid, slate_markets
+
+
+def test_poisson_pmf_matches_formula():
+    pmf = poisson_pmf([0.0, 1.3, 2.7], max_goals=6)
+    for row, rate in zip(pmf, [0.0, 1.3, 2.7]):
+        expected = [math.exp(-rate) * rate ** k / math.factorial(k) for k in range(7)]
+        assert np.allclose(row, expected)
+
+
+def test_markets_match_per_cell_sums():
+    grid = score_grid([1.6, 0.4], [1.1, 2.2], max_goals=8)
+    assert np.allclose(grid.sum(axis=(1, 2)), 1)
+    markets = grid_markets(grid)
+    for f in range(2):
+        cells = [(i, j, grid[f, i, j]) for i in range(9) for j in range(9)]
+        assert np.isclose(markets['btts'][f], sum(p for i, j, p in cells if i > 0 and j > 0))
+        assert np.isclose(markets['over_2.5'][f], sum(p for i, j, p in cells if i + j >= 3))
+        assert np.isclose(markets['home_win'][f] + markets['draw'][f] + markets['away_win'][f], 1)
+        i, j, p = max(cells, key=lambda c: c[2])
+        assert (markets['most_likely_home'][f], markets['most_likely_away'][f]) == (i, j)
+        assert np.isclose(markets['most_likely_prob'][f], p)
+
+
+def test_slate_uses_attack_and_defence():
+    table = TeamStrengthTable({
+        "Strong": {"avg_goals_scored_home": 2.604, "avg_goals_conceded_home": 0.6,
+                   "avg_goals_scored_away": 2.0, "avg_goals_conceded_away": 0.9},
+        "Weak": {"avg_goals_scored_home": 0.8, "avg_goals_conceded_home": 2.1,
+                 "avg_goals_scored_away": 0.5, "avg_goals_conceded_away": 2.5},
+    })
+    markets = slate_markets(table, [0, 1], [1, 0])
+    # Scoring and conceding averages are both used unrounded
+    assert np.allclose(markets['home_xg'], [(2.604 + 2.5) / 2, (0.8 + 0.9) / 2])
+    assert markets['home_win'][0] > markets['away_win'][0]
+    assert markets['away_win'][1] > markets['home_win'][1]
+
+
+def test_markets_in_predictions_export(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "team_stats.json").write_text(json.dumps({
+        "Arsenal": {"home_win_rate": 0.7, "away_win_rate": 0.5, "recent_form": "WWDWL",
+                    "avg_goals_scored_home": 2.3, "avg_goals_conceded_home": 0.8,
+                    "avg_goals_scored_away": 1.7, "avg_goals_conceded_away": 1.1},
+        "Chelsea": {"home_win_rate": 0.5, "away_win_rate": 0.3, "recent_form": "DLWDW",
+                    "avg_goals_scored_home": 1.6, "avg_goals_conceded_home": 1.2,
+                    "avg_goals_scored_away": 1.2, "avg_goals_conceded_away": 1.5},
+    }), encoding="utf-8")
+    (tmp_path / "data" / "real_fixtures.json").write_text(json.dumps([
+        {"date": "2026-03-14", "time": "20:00", "league": "Premier League",
+         "home_team": "Arsenal", "away_team": "Chelsea"},
+        {"date": "2026-03-15", "time": "17:30", "league": "Premier League",
+         "home_team": "Unknown FC", "away_team": "Chelsea"},
+    ]), encoding="utf-8")
+    monkeypatch.setattr(predict_real_fixtures, "HAS_AI", False)
+    predict_real_fixtures.predict_all_fixtures()
+
+    with open(tmp_path / "data" / "final_predictions.json", encoding="utf-8") as f:
+        exported = json.load(f)
+    assert len(exported) == 1
+    markets = exported[0]["markets"]
+    assert list(markets) == [
+        "home_xg", "away_xg", "most_likely_score", "most_likely_prob", "btts", "over_1.5", "over_2.5", "over_3.5",
+    ]
+    assert markets["home_xg"] == round((2.3 + 1.5) / 2, 2)
+    assert markets["away_xg"] == round((1.2 + 0.8) / 2, 2)
+    assert markets["over_1.5"] > markets["over_2.5"] > markets["over_3.5"]
+    assert 0 < markets["most_likely_prob"] < 100
+    # The binary snapshot the API serves carries the same markets
+    assert list(MappedPredictions(str(tmp_path / "data" / "final_predictions.bin"))) == exported
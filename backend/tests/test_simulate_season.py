@@ -0,0 +1,57 @@
+import numpy as np
+import scripts.simulate_season as simulate_season
+from scripts.simulate_season import LeagueSeason, simulate_leagues
+
+
+def _rows(teams, played=()):
+    rows = []
+    for home in teams:
+        for away in teams:
+            if home != away:
+                status = "finished" if (home, away) in played else "notstarted"
+                rows.append({"home": home, "away": away, "status": status})
+    return rows
+
+
+def _season(relegated=3):
+    season = LeagueSeason("Test League", _rows(["A", "B", "C", "D", "E"], played={("A", "B")}), None, relegated)
+    # A wins every remaining fixture it plays
+    for f, (h, a) in enumerate(zip(season.home, season.away)):
+        if season.teams[h] == "A":
+            season.probs[f] = (1.0, 0.0, 0.0)
+        elif season.teams[a] == "A":
+            season.probs[f] = (0.0, 0.0, 1.0)
+    return season
+
+
+def test_remaining_fixtures_only():
+    season = _season()
+    assert len(season.home) == 19
+    assert np.allclose(season.probs.sum(axis=1), 1)
+
+
+def test_probabilities_are_consistent():
+    report = simulate_leagues([_season()], 2_000, seed=1, workers=1, chunk_size=500)["Test League"]
+    assert report["A"]["title"] == 1.0
+    for team in report.values():
+        assert abs(sum(team["position_probabilities"]) - 1) < 1e-3
+        assert team["top4"] >= team["title"]
+    assert abs(sum(t["relegation"] for t in report.values()) - 3) < 1e-3
+
+
+def test_relegation_places_per_league(tmp_path, monkeypatch):
+    report = simulate_leagues([_season(relegated=2)], 1_000, seed=1, workers=1)["Test League"]
+    assert abs(sum(t["relegation"] for t in report.values()) - 2) < 1e-3
+
+    monkeypatch.setattr(simulate_season, "DATA_DIR", tmp_path)
+    for name in ("Bundesliga", "Serie A"):
+        with open(simulate_season.fixtures_csv(name), "w", encoding="utf-8") as f:
+            f.write("home,away,status\nA,B,notstarted\nB,A,notstarted\n")
+    assert LeagueSeason.from_csv("Bundesliga", None).relegated == 2
+    assert LeagueSeason.from_csv("Serie A", None).relegated == 3
+
+
+def test_seeded_runs_do_not_depend_on_workers():
+    serial = simulate_leagues([_season()], 3_000, seed=42, workers=1, chunk_size=1_000)
+    pooled = simulate_leagues([_season()], 3_000, seed=42, workers=2, chunk_size=1_000)
+    assert serial == pooled
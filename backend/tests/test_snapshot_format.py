@@ -0,0 +1,70 @@
+import json
+import os
+import pytest
+from app.services.prediction_store import PredictionSnapshotStore
+from app.services.snapshot_format import MappedPredictions, write_snapshot
+
+
+def _prediction(home, away, league, ai_analysis):
+    return {
+        "date": "2026-03-14",
+        "time": "20:00",
+        "league": league,
+        "home_team": home,
+        "away_team": away,
+        "prediction": {
+            "prediction": "home_win",
+            "confidence": 47.3,
+            "probabilities": {"home_win": 47.3, "draw": 25.0, "away_win": 27.7},
+            "expected_score": "2-1",
+            "analysis": {
+                "home_team": home, "away_team": away,
+                "home_form": "WWDLW", "away_form": "N/A",
+                "home_form_score": 73.3, "away_form_score": 50,
+                "home_win_rate": 60.0, "away_win_rate": 33.3,
+                "home_avg_goals": 1.85, "away_avg_goals": 1.2,
+                "home_total_score": 61.4, "away_total_score": 44.9,
+            },
+        },
+        "ai_analysis": ai_analysis,
+    }
+
+
+PREDICTIONS = [
+    _prediction("Arsenal", "Chelsea", "Premier League", "【AI 深度分析】主隊近況較佳"),
+    _prediction("Barcelona", "Real Madrid", "La Liga", None),
+    _prediction("Chelsea", "Arsenal", "Premier League", ""),
+]
+
+
+def test_round_trip_matches_json(tmp_path):
+    path = str(tmp_path / "final_predictions.bin")
+    write_snapshot(path, PREDICTIONS)
+    mapped = MappedPredictions(path)
+    assert len(mapped) == 3
+    assert list(mapped) == PREDICTIONS
+    assert mapped[1:] == PREDICTIONS[1:]
+    # ints stay ints so the JSON rendering is unchanged
+    assert json.dumps(mapped[0]) == json.dumps(PREDICTIONS[0])
+    assert list(mapped.index_rows())[1] == ("La Liga", "Barcelona", "Real Madrid", "2026-03-14")
+
+
+def test_unsupported_layout_rejected(tmp_path):
+    bad = dict(PREDICTIONS[0], extra="field")
+    with pytest.raises(ValueError):
+        write_snapshot(str(tmp_path / "final_predictions.bin"), [bad])
+
+
+def test_store_prefers_newer_binary(tmp_path):
+    json_path = tmp_path / "final_predictions.json"
+    json_path.write_text(json.dumps(PREDICTIONS[:1]), encoding="utf-8")
+    os.utime(json_path, ns=(1_000_000_000, 1_000_000_000))
+    store = PredictionSnapshotStore(str(json_path))
+    assert store.get().source == str(json_path)
+
+    bin_path = str(tmp_path / "final_predictions.bin")
+    write_snapshot(bin_path, PREDICTIONS)
+    snapshot = store.get()
+    assert snapshot.source == bin_path
+    assert snapshot.query(league="premier league") == [PREDICTIONS[0], PREDICTIONS[2]]
+    assert snapshot.facets.teams["count"] == 4
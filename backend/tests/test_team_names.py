@@ -0,0 +1,51 @@
+from app.services.team_names import TEAM_ALIASES, TeamNameResolver, fold_name, name_key
+
+SOFASCORE = {"Atletico": "Atlético Madrid", "Nottm Forest": "Nottingham Forest", "Wolves": "Wolverhampton Wanderers"}
+
+
+def _resolver():
+    return TeamNameResolver(TEAM_ALIASES, [SOFASCORE])
+
+
+def test_keys_ignore_accents_case_and_punctuation():
+    assert fold_name("  Atlético  MADRID ") == "atletico madrid"
+    assert fold_name("Bodø/Glimt") == "bodo/glimt"
+    assert name_key("Nott'm Forest") == name_key("Nottm Forest") == "nottm forest"
+    assert name_key("Paris Saint-Germain") == name_key("Paris Saint Germain")
+
+
+def test_aliases_from_every_source_reach_the_known_name():
+    matcher = _resolver().matcher(["Atletico Madrid", "Nottm Forest", "Wolves", "Paris SG"])
+    assert matcher.resolve("Ath Madrid") == "Atletico Madrid"
+    assert matcher.resolve("Atlético Madrid") == "Atletico Madrid"
+    assert matcher.resolve("Nottingham Forest") == "Nottm Forest"
+    assert matcher.resolve("Wolverhampton Wanderers") == "Wolves"
+    assert matcher.resolve("Paris Saint-Germain") == "Paris SG"
+
+    sofascore = _resolver().matcher(SOFASCORE.values())
+    assert sofascore.resolve("Ath Madrid") == "Atlético Madrid"
+
+
+def test_canonical_only_follows_database_aliases():
+    resolver = _resolver()
+    assert resolver.canonical(" Nott'm Forest ") == "Nottm Forest"
+    assert resolver.canonical("Atlético Madrid") == "Atletico Madrid"
+    # Sofascore 對照不改變資料庫名稱
+    assert resolver.canonical("Wolves") == "Wolves"
+    assert resolver.canonical("Arsenal") == "Arsenal"
+    assert resolver.standardize("Wolves") == "Wolverhampton Wanderers"
+    assert resolver.standardize("Arsenal") == "Arsenal"
+
+
+def test_fuzzy_fallback_is_memoized_and_guards_numbers(monkeypatch):
+    matcher = _resolver().matcher(["Manchester City", "Manchester United", "VfL Wolfsburg", "Team 40"])
+    calls = []
+    fuzzy = matcher._fuzzy
+    monkeypatch.setattr(matcher, "_fuzzy", lambda key: calls.append(key) or fuzzy(key))
+
+    assert matcher.resolve("Manchestr City") == "Manchester City"
+    assert matcher.resolve("Manchestr City") == "Manchester City"
+    assert matcher.resolve("Wolfsburg") == "VfL Wolfsburg"
+    assert matcher.resolve("Manchester") is None
+    assert matcher.resolve("Team 4") is None
+    assert calls.count("manchestr city") == 1
@@ -0,0 +1,61 @@
+import json
+from app.services.prediction_store import PredictionSnapshotStore
+from app.services.team_profiles import TeamProfileStore
+from app.services.team_stats_store import TeamStatsStore
+from scripts.predict_match import predict_match
+
+TEAM_STATS = {
+    "Arsenal": {"home_win_rate": 0.7, "away_win_rate": 0.5, "avg_goals_scored_home": 2.1,
+                "avg_goals_conceded_home": 0.8, "avg_goals_scored_away": 1.6,
+                "avg_goals_conceded_away": 1.1, "recent_form": "WWDWL"},
+    "Chelsea": {"home_win_rate": 0.5, "away_win_rate": 0.3, "avg_goals_scored_home": 1.7,
+                "avg_goals_conceded_home": 1.2, "avg_goals_scored_away": 1.2,
+                "avg_goals_conceded_away": 1.5, "recent_form": "DLWDW"},
+    "Liverpool": {"home_win_rate": 0.8, "away_win_rate": 0.6, "avg_goals_scored_home": 2.4,
+                  "avg_goals_conceded_home": 0.7, "avg_goals_scored_away": 2.0,
+                  "avg_goals_conceded_away": 0.9, "recent_form": "WWWDW"},
+}
+
+
+def _setup(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "team_stats.json").write_text(json.dumps(TEAM_STATS), encoding="utf-8")
+    fixtures = [("Arsenal", "Chelsea"), ("Liverpool", "Arsenal")]
+    predictions = [
+        {"date": "2026-03-14", "time": "15:00", "league": "Premier League",
+         "home_team": h, "away_team": a, "prediction": predict_match(h, a)}
+        for h, a in fixtures
+    ]
+    (tmp_path / "data" / "final_predictions.json").write_text(json.dumps(predictions), encoding="utf-8")
+    snapshots = PredictionSnapshotStore("data/final_predictions.json")
+    return TeamProfileStore(snapshots, TeamStatsStore("data/team_stats.json"))
+
+
+def test_profile_matches_predict_match_analysis(tmp_path, monkeypatch):
+    store = _setup(tmp_path, monkeypatch)
+    profile = store.get()["Arsenal"]
+    home = predict_match("Arsenal", "Chelsea")["analysis"]
+    away = predict_match("Chelsea", "Arsenal")["analysis"]
+    assert profile["recent_form"] == "WWDWL"
+    assert profile["home_score"] == home["home_total_score"]
+    assert profile["away_score"] == away["away_total_score"]
+    assert profile["home_win_rate"] == home["home_win_rate"]
+    assert profile["away_win_rate"] == away["away_win_rate"]
+    assert profile["avg_goals"] == round((home["home_avg_goals"] + away["away_avg_goals"]) / 2, 2)
+    assert profile["upcoming_matches"] == 2
+    assert profile["total_teams"] == 3
+
+
+def test_rankings_follow_strength(tmp_path, monkeypatch):
+    store = _setup(tmp_path, monkeypatch)
+    profiles = store.get()
+    ranks = sorted(profiles.values(), key=lambda p: p["overall_ranking"])
+    assert [p["team_name"] for p in ranks][0] == "Liverpool"
+    assert sorted(p["overall_ranking"] for p in ranks) == [1, 2, 3]
+
+
+def test_table_reused_until_data_changes(tmp_path, monkeypatch):
+    store = _setup(tmp_path, monkeypatch)
+    first = store.get()
+    assert store.get() is first
@@ -0,0 +1,66 @@
+import json
+import os
+from app.services.team_stats_store import TeamStatsStore
+
+STATS = {
+    "Manchester City": {"home_win_rate": 0.8, "avg_goals_scored_home": 2.5, "recent_form": "WWWDW"},
+    "Milan": {"home_win_rate": 0.6, "recent_form": "WDLWW", "elo": 1712},
+}
+
+
+def _write(path, stats, mtime_ns):
+    path.write_text(json.dumps(stats), encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_loaded_once_and_reloaded_on_change(tmp_path):
+    p = tmp_path / "team_stats.json"
+    _write(p, STATS, 1_000_000_000)
+    store = TeamStatsStore(str(p))
+    first = store.get()
+    assert store.get() is first
+    _write(p, {"Milan": STATS["Milan"]}, 2_000_000_000)
+    second = store.get()
+    assert second is not first and len(second) == 1
+
+
+def test_records_behave_like_dicts(tmp_path):
+    p = tmp_path / "team_stats.json"
+    _write(p, STATS, 1_000_000_000)
+    milan = TeamStatsStore(str(p)).get()["Milan"]
+    assert milan.get("recent_form") == "WDLWW"
+    assert milan.get("away_win_rate", 0) == 0
+    assert milan["elo"] == 1712
+    assert "avg_goals_scored_home" not in milan
+    assert milan.to_dict() == STATS["Milan"]
+
+
+def test_aliases_resolved_once(tmp_path):
+    p = tmp_path / "team_stats.json"
+    _write(p, STATS, 1_000_000_000)
+    stats = TeamStatsStore(str(p)).get()
+    assert stats.resolve("Man City") is stats["Manchester City"]
+    assert stats.resolve("AC Milan") is stats["Milan"]
+    assert stats.resolve("manchester  city") is stats["Manchester City"]
+    # Alias whose canonical team has no stats
+    assert stats.resolve("PSG") is None
+    assert stats.resolve("Unknown") is None
+
+
+def test_unreadable_rewrite_keeps_previous_stats(tmp_path):
+    p = tmp_path / "team_stats.json"
+    _write(p, STATS, 1_000_000_000)
+    store = TeamStatsStore(str(p))
+    first = store.get()
+    p.write_text("{\"Milan\": ", encoding="utf-8")
+    os.utime(p, ns=(2_000_000_000, 2_000_000_000))
+    loads = []
+    real_load = store._load
+    store._load = lambda stat: loads.append(stat) or real_load(stat)
+    assert store.get() is first
+    assert store.get() is first
+    # The broken file is parsed once, not on every lookup
+    assert len(loads) == 1
+
+    _write(p, {"Milan": STATS["Milan"]}, 3_000_000_000)
+    assert len(store.get()) == 1